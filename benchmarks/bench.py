@@ -0,0 +1,403 @@
+"""
+Reproducible benchmarks for the task API and the notifier.
+
+For each requested size, a fresh temporary database is seeded with
+synthetic tasks, every /api/v1 route is driven by a pool of keep-alive
+client threads, and send_notification_email is timed against the stub
+SES client. Results are written as JSON and can be compared to a
+previous run.
+
+Usage:
+    python -m benchmarks.bench --sizes 1000,100000 --output results.json
+    python -m benchmarks.bench --server gunicorn --workers 4 --concurrency 32
+    python -m benchmarks.bench --baseline baseline.json --fail-threshold 10
+
+The in-process server shares the GIL with the load generator, so its
+numbers are only comparable with other in-process runs. Use --server
+gunicorn to measure the production serving mode.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from urllib.parse import quote
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# Read by the notifier when it first sends.
+os.environ.setdefault("SES_BACKEND", "stub")
+os.environ.setdefault("RECIPIENT_EMAILS", "bench@example.com")
+
+from server.python.database import db_manager
+from server.python.database.model import Task
+
+WORDS = (
+    "report invoice meeting review deploy release budget design draft email "
+    "client server backup migrate refactor schedule call plan audit update "
+    "renew contract hire onboard sprint roadmap bug fix test launch"
+).split()
+PRIORITIES = ("low", "medium", "high")
+STATUSES = ("pending",) * 7 + ("in_progress",) + ("completed",) * 2
+SEED_BATCH_SIZE = 50000
+
+def make_task(rng, today):
+    words = rng.sample(WORDS, 6)
+    due = today + timedelta(days=rng.randint(-30, 60)) if rng.random() < 0.6 else None
+    return Task(
+        title=" ".join(words[:3]).capitalize(),
+        description=" ".join(words),
+        due_date=due.isoformat() if due else None,
+        priority=rng.choice(PRIORITIES),
+        status=rng.choice(STATUSES),
+    )
+
+def seed_database(path, size, seed):
+    """Create a fresh database at path holding `size` synthetic tasks."""
+    db_manager.close_connections()
+    db_manager.DB_PATH = path
+    db_manager.task_cache.invalidate()
+    db_manager.init_db()
+    rng = random.Random(seed)
+    today = date.today()
+    remaining = size
+    while remaining:
+        count = min(remaining, SEED_BATCH_SIZE)
+        db_manager.insert_tasks([make_task(rng, today) for _ in range(count)])
+        remaining -= count
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("ANALYZE")
+
+@dataclass
+class Scenario:
+    """One benchmarked request shape; build(ctx, rng) returns (method, path, body, headers)."""
+    name: str
+    build: object
+    heavy: bool = False
+
+def _json(method, path, payload):
+    return method, path, json.dumps(payload), {"Content-Type": "application/json"}
+
+def _task_payload(rng):
+    words = rng.sample(WORDS, 5)
+    return {"description": " ".join(words), "priority": rng.choice(PRIORITIES),
+            "dueDate": (date.today() + timedelta(days=rng.randint(0, 30))).isoformat()}
+
+def _import_body(rng, count=100):
+    today = date.today()
+    lines = []
+    for _ in range(count):
+        task = make_task(rng, today)
+        lines.append(json.dumps({"title": task.title, "description": task.description,
+                                 "priority": task.priority, "status": task.status,
+                                 "dueDate": task.due_date}))
+    return "\n".join(lines)
+
+def _batch_payload(ctx, rng, count=50):
+    operations = []
+    for _ in range(count):
+        op = rng.choice(("create", "update", "complete", "incomplete"))
+        item = {"op": op}
+        if op != "create":
+            item["id"] = rng.randint(1, ctx["size"])
+        if op in ("create", "update"):
+            item.update(_task_payload(rng))
+        operations.append(item)
+    return {"operations": operations}
+
+# Reads run before writes, and deletes run last so they cannot skew the others.
+SCENARIOS = [
+    Scenario("list", lambda ctx, rng: ("GET", "/api/v1/tasks?limit=100", None, {})),
+    Scenario("list_page", lambda ctx, rng: (
+        "GET", f"/api/v1/tasks?limit=100&after_id={rng.randint(0, ctx['size'])}", None, {})),
+    Scenario("list_filtered", lambda ctx, rng: (
+        "GET", f"/api/v1/tasks?limit=100&completed=false&priority={rng.choice(PRIORITIES)}", None, {})),
+    Scenario("list_ordered", lambda ctx, rng: ("GET", "/api/v1/tasks?limit=100&order=position", None, {})),
+    Scenario("list_not_modified", lambda ctx, rng: (
+        "GET", "/api/v1/tasks?limit=100", None, {"If-None-Match": ctx["etag"]})),
+    Scenario("search", lambda ctx, rng: (
+        "GET", f"/api/v1/tasks/search?limit=50&q={quote(' '.join(rng.sample(WORDS, 2)))}", None, {})),
+    Scenario("due_week", lambda ctx, rng: ("GET", "/api/v1/tasks/due?days=7&limit=100", None, {})),
+    Scenario("overdue", lambda ctx, rng: ("GET", "/api/v1/tasks/due?overdue=true&limit=100", None, {})),
+    Scenario("export", lambda ctx, rng: ("GET", "/api/v1/tasks/export", None, {}), heavy=True),
+    Scenario("add", lambda ctx, rng: _json("POST", "/api/v1/add/tasks", _task_payload(rng))),
+    Scenario("update", lambda ctx, rng: _json(
+        "PUT", f"/api/v1/update/{rng.randint(1, ctx['size'])}", _task_payload(rng))),
+    Scenario("complete", lambda ctx, rng: ("PUT", f"/api/v1/complete/{rng.randint(1, ctx['size'])}", None, {})),
+    Scenario("incomplete", lambda ctx, rng: ("PUT", f"/api/v1/incomplete/{rng.randint(1, ctx['size'])}", None, {})),
+    Scenario("reorder", lambda ctx, rng: _json(
+        "PUT", f"/api/v1/reorder/{rng.randint(1, ctx['size'])}", {"after_id": rng.randint(1, ctx["size"])})),
+    Scenario("batch", lambda ctx, rng: _json("POST", "/api/v1/tasks/batch", _batch_payload(ctx, rng))),
+    Scenario("import", lambda ctx, rng: (
+        "POST", "/api/v1/tasks/import", _import_body(rng), {"Content-Type": "application/x-ndjson"})),
+    Scenario("delete", lambda ctx, rng: ("DELETE", f"/api/v1/delete/{next(ctx['delete_ids'])}", None, {})),
+]
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies, errors, elapsed):
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else None,
+    }
+
+def run_scenario(host, port, scenario, ctx, total, concurrency, seed):
+    """Issue `total` requests from `concurrency` keep-alive clients; return the summary."""
+    issued = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def client(worker_id):
+        rng = random.Random(f"{seed}:{scenario.name}:{worker_id}")
+        conn = http.client.HTTPConnection(host, port, timeout=300)
+        local, failed = [], 0
+        while next(issued) < total:
+            method, path, body, headers = scenario.build(ctx, rng)
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=300)
+                ok = False
+            local.append(time.perf_counter() - start)
+            failed += not ok
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(min(concurrency, total))]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, sum(errors), time.perf_counter() - started)
+
+def fetch_etag(host, port):
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    conn.request("GET", "/api/v1/tasks?limit=100")
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.getheader("ETag", "")
+
+class InProcessServer:
+    """The Flask app on a threaded werkzeug server inside this process."""
+
+    def __init__(self, db_path, args):
+        import logging
+        from werkzeug.serving import make_server
+        from server.python.scripts.app import app
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        self._server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.host, self.port = "127.0.0.1", self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._thread.join()
+
+class GunicornServer:
+    """gunicorn -c gunicorn.conf.py wsgi:app against the benchmark database."""
+
+    def __init__(self, db_path, args):
+        self.host, self.port = "127.0.0.1", args.port
+        env = dict(os.environ, TASKS_DB_PATH=db_path, PORT=str(args.port),
+                   WEB_WORKERS=str(args.workers), WEB_ACCESS_LOG="", NOTIFY_IN_SERVER="false")
+        self._proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{args.port}", "wsgi:app"],
+            cwd=project_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                fetch_etag(self.host, self.port)
+                return
+            except OSError:
+                if self._proc.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("gunicorn did not start")
+                time.sleep(0.2)
+
+    def stop(self):
+        self._proc.terminate()
+        self._proc.wait(timeout=60)
+
+SERVERS = {"inprocess": InProcessServer, "gunicorn": GunicornServer}
+
+def bench_notify(recipients, ses_latency, size):
+    """Time a cold digest, an unchanged rerun (all skipped) and a rerun after one edit."""
+    from notify import notify as notifier
+    from notify.dispatcher import SESDispatcher
+    from notify.stub_ses import StubSESClient
+
+    ses = StubSESClient(latency=ses_latency)
+    notifier.RECIPIENT_EMAILS = [f"user{i}@example.com" for i in range(recipients)]
+    notifier.dispatcher = SESDispatcher(ses, send_rate=float(recipients) * 10,
+                                        workers=notifier.SES_WORKERS, max_retries=notifier.SES_MAX_RETRIES)
+    phases = {}
+    for phase in ("cold", "unchanged", "one_change"):
+        if phase == "one_change":
+            db_manager.update_task(random.randint(1, size), "benchmark edit", "high")
+        calls_before = ses.calls
+        started = time.perf_counter()
+        notifier.send_notification_email()
+        phases[phase] = {
+            "seconds": round(time.perf_counter() - started, 4),
+            "emails_sent": ses.calls - calls_before,
+        }
+    return {"recipients": recipients, "ses_latency_s": ses_latency, "phases": phases}
+
+def run_size(size, args, workdir):
+    db_path = os.path.join(workdir, f"bench-{size}.db")
+    started = time.perf_counter()
+    seed_database(db_path, size, args.seed)
+    result = {"seed_seconds": round(time.perf_counter() - started, 2),
+              "db_bytes": os.path.getsize(db_path), "routes": {}}
+    print(f"[{size}] seeded in {result['seed_seconds']}s", file=sys.stderr)
+
+    server = SERVERS[args.server](db_path, args)
+    try:
+        ctx = {"size": size, "etag": fetch_etag(server.host, server.port),
+               "delete_ids": itertools.count(size, -1)}
+        for scenario in SCENARIOS:
+            if args.routes and scenario.name not in args.routes:
+                continue
+            total = args.heavy_requests if scenario.heavy else args.requests
+            if scenario.name == "delete":
+                total = min(total, size)
+            summary = run_scenario(server.host, server.port, scenario, ctx, total, args.concurrency, args.seed)
+            result["routes"][scenario.name] = summary
+            print(f"[{size}] {scenario.name:18} {summary['throughput_rps']:>9} rps  "
+                  f"p50 {summary['p50_ms']}ms  p95 {summary['p95_ms']}ms  p99 {summary['p99_ms']}ms  "
+                  f"errors {summary['errors']}", file=sys.stderr)
+    finally:
+        server.stop()
+
+    if args.recipients:
+        result["notify"] = bench_notify(args.recipients, args.ses_latency, size)
+        print(f"[{size}] notify {result['notify']['phases']}", file=sys.stderr)
+    db_manager.close_connections()
+    return result
+
+def environment_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+def compare(results, baseline, threshold):
+    """Print per-route changes against a baseline run; return the list of regressions."""
+    regressions = []
+    for size, current in results["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size)
+        if not previous:
+            continue
+        for name, now in current["routes"].items():
+            before = previous["routes"].get(name)
+            if not before or not before["p95_ms"] or not before["throughput_rps"]:
+                continue
+            p95_change = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            rps_change = (now["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100
+            flag = ""
+            if p95_change > threshold or rps_change < -threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{size}/{name}")
+            print(f"[{size}] {name:18} p95 {before['p95_ms']} -> {now['p95_ms']}ms ({p95_change:+.1f}%)  "
+                  f"rps {before['throughput_rps']} -> {now['throughput_rps']} ({rps_change:+.1f}%){flag}")
+        for phase, now in current.get("notify", {}).get("phases", {}).items():
+            before = previous.get("notify", {}).get("phases", {}).get(phase)
+            if before and before["seconds"]:
+                change = (now["seconds"] - before["seconds"]) / before["seconds"] * 100
+                print(f"[{size}] notify/{phase:11} {before['seconds']} -> {now['seconds']}s ({change:+.1f}%)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the task API and notifier")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated task counts to seed (e.g. 1000,1000000)")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per route")
+    parser.add_argument("--heavy-requests", type=int, default=5, help="Requests for whole-table routes such as export")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client connections")
+    parser.add_argument("--routes", type=lambda s: s.split(","), help="Only run these scenarios (comma-separated)")
+    parser.add_argument("--server", choices=sorted(SERVERS), default="inprocess")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers (--server gunicorn)")
+    parser.add_argument("--port", type=int, default=7900, help="gunicorn port (--server gunicorn)")
+    parser.add_argument("--recipients", type=int, default=50, help="Digest recipients; 0 skips the notifier benchmark")
+    parser.add_argument("--ses-latency", type=float, default=0.05, help="Stub SES round trip in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for data and request mix")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON results file")
+    parser.add_argument("--fail-threshold", type=float, default=None,
+                        help="Exit 1 if any route's p95 or throughput is this many percent worse than the baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {"environment": environment_info(), "config": vars(args), "sizes": {}}
+    workdir = tempfile.mkdtemp(prefix="task-bench-")
+    try:
+        for size in sizes:
+            results["sizes"][str(size)] = run_size(size, args, workdir)
+    finally:
+        db_manager.close_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.fail_threshold or 10.0)
+        if regressions and args.fail_threshold is not None:
+            print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Cold-start benchmark for the server and the notifier.
+
+Each target is run in a fresh interpreter (`python -X importtime -c ...`)
+against a temporary database. The wall-clock time of the whole process and
+the time spent in the target's own code are recorded per run, and the
+importtime output is summed by top-level package to show where import time
+goes. Results are written as JSON and can be compared to a previous run.
+
+Usage:
+    python -m benchmarks.startup --runs 20 --output startup.json
+    python -m benchmarks.startup --targets server_import,notifier_import --top 10
+    python -m benchmarks.startup --baseline startup.json --fail-threshold 15
+
+python_baseline is an empty interpreter start; subtract it from the other
+targets to get the cost this project adds.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.bench import environment_info, percentile, project_root
+
+# name -> (code run in the child, extra environment)
+TARGETS = {
+    "python_baseline": ("pass", {}),
+    "server_import": ("import wsgi", {}),
+    "server_first_request": (
+        "import wsgi\n"
+        "client = wsgi.app.test_client()\n"
+        "assert client.get('/api/v1/tasks?limit=1').status_code == 200",
+        {},
+    ),
+    "notifier_import": ("import notify.notify", {}),
+    "notifier_stub_dispatcher": (
+        "from notify import notify\nnotify.get_dispatcher()",
+        {"SES_BACKEND": "stub"},
+    ),
+    # Builds a real boto3 SES client; no request is sent.
+    "notifier_ses_client": (
+        "from notify import notify\nnotify.get_dispatcher()",
+        {"SES_BACKEND": "aws", "AWS_REGION": "us-east-1",
+         "AWS_ACCESS_KEY_ID": "bench", "AWS_SECRET_ACCESS_KEY": "bench"},
+    ),
+}
+
+CHILD_TEMPLATE = """import time as _bench_time
+_bench_started = _bench_time.perf_counter()
+{code}
+print("BENCH_SECONDS", _bench_time.perf_counter() - _bench_started)
+"""
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+def parse_importtime(stderr):
+    """Sum self time (microseconds) by top-level package from -X importtime output."""
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            packages[match.group(4).split(".")[0]] += int(match.group(1))
+    return packages
+
+def run_once(code, env):
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD_TEMPLATE.format(code=code)],
+                          cwd=project_root, env=env, capture_output=True, text=True, timeout=120)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup target failed:\n{proc.stderr[-2000:]}")
+    own = next(float(line.split()[1]) for line in proc.stdout.splitlines() if line.startswith("BENCH_SECONDS"))
+    return wall, own, parse_importtime(proc.stderr)
+
+def _ms_summary(values):
+    ordered = sorted(values)
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+        "min_ms": round(ordered[0] * 1000, 1),
+    }
+
+def bench_target(name, runs, warmup, top, db_path):
+    code, extra_env = TARGETS[name]
+    env = dict(os.environ, TASKS_DB_PATH=db_path, **extra_env)
+    for _ in range(warmup):
+        run_once(code, env)
+
+    walls, owns = [], []
+    packages = defaultdict(int)
+    for _ in range(runs):
+        wall, own, imported = run_once(code, env)
+        walls.append(wall)
+        owns.append(own)
+        for package, micros in imported.items():
+            packages[package] += micros
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "runs": runs,
+        "process": _ms_summary(walls),
+        "target_code": _ms_summary(owns),
+        "import_self_ms_by_package": {package: round(micros / runs / 1000, 1) for package, micros in heaviest},
+    }
+
+def compare(results, baseline, threshold):
+    """Print per-target changes against a baseline run; return the list of regressions."""
+    regressions = []
+    for name, now in results["targets"].items():
+        before = baseline.get("targets", {}).get(name)
+        if not before or not before["process"]["median_ms"]:
+            continue
+        change = (now["process"]["median_ms"] - before["process"]["median_ms"]) / before["process"]["median_ms"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:26} {before['process']['median_ms']} -> {now['process']['median_ms']}ms ({change:+.1f}%){flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark server and notifier cold start")
+    parser.add_argument("--targets", type=lambda s: s.split(","), default=list(TARGETS),
+                        help=f"Comma-separated targets (default: all of {','.join(TARGETS)})")
+    parser.add_argument("--runs", type=int, default=10, help="Measured runs per target")
+    parser.add_argument("--warmup", type=int, default=1, help="Discarded runs per target (bytecode, page cache, schema)")
+    parser.add_argument("--top", type=int, default=12, help="Packages to list in the import profile")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON results file")
+    parser.add_argument("--fail-threshold", type=float, default=None,
+                        help="Exit 1 if any target's median start time is this many percent worse than the baseline")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+
+    results = {"environment": environment_info(), "config": vars(args), "targets": {}}
+    workdir = tempfile.mkdtemp(prefix="task-startup-")
+    try:
+        db_path = os.path.join(workdir, "startup.db")
+        for name in args.targets:
+            result = bench_target(name, args.runs, args.warmup, args.top, db_path)
+            results["targets"][name] = result
+            print(f"{name:26} process median {result['process']['median_ms']}ms  "
+                  f"p95 {result['process']['p95_ms']}ms  target code {result['target_code']['median_ms']}ms",
+                  file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.fail_threshold or 10.0)
+        if regressions and args.fail_threshold is not None:
+            print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Gunicorn settings for production serving.
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden from the environment. `kill -HUP <master>`
+reloads the code gracefully: new workers start before old ones finish their
+in-flight requests.
+"""
+
+import glob
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+bind = f"0.0.0.0:{os.getenv('PORT', 7000)}"
+workers = int(os.getenv('WEB_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+# The memory backend keeps every task in one process that owns its data files
+# (see server/python/database/memory_store.py), so it always gets one worker.
+if os.getenv('STORAGE_BACKEND', 'sqlite').lower() == 'memory' and workers != 1:
+    print(f"STORAGE_BACKEND=memory needs a single worker; starting 1 instead of {workers}", file=sys.stderr)
+    workers = 1
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', 8))
+# Each SSE stream pins a thread; leave at least half for ordinary requests.
+os.environ.setdefault('SSE_MAX_STREAMS', str(max(1, threads // 2)))
+keepalive = int(os.getenv('WEB_KEEPALIVE', 5))
+timeout = int(os.getenv('WEB_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+# Recycle workers now and then to bound slow leaks; jitter avoids all restarting at once.
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.getenv('WEB_MAX_REQUESTS_JITTER', 1000))
+# The app is imported in each worker, never in the master, so HUP picks up new code.
+preload_app = False
+# An empty WEB_ACCESS_LOG turns the access log off.
+accesslog = os.getenv('WEB_ACCESS_LOG', '-') or None
+
+# Workers share metrics through snapshot files so /metrics covers all of them.
+# Set before anything imports server.python.metrics, which reads it once.
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), f"task-reminder-metrics-{os.getpid()}"))
+
+def init_schema(server):
+    """Create or migrate the schema in a short-lived child process.
+
+    Importing db_manager in the master would pin the code that HUP is meant
+    to reload. The memory backend is skipped: its worker holds the store
+    and loads it itself.
+    """
+    if os.getenv('STORAGE_BACKEND', 'sqlite').lower() == 'memory':
+        return
+    server.log.info("Initializing the database schema")
+    subprocess.run([sys.executable, '-c', 'from server.python.database.db_manager import init_db; init_db()'],
+                   cwd=project_root, check=True)
+
+def on_starting(server):
+    """Reset the metrics directory and set up the schema once, before any worker starts."""
+    metrics_dir = os.environ['METRICS_DIR']
+    os.makedirs(metrics_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(metrics_dir, '*.json')):
+        os.remove(stale)
+    init_schema(server)
+
+def on_reload(server):
+    """Apply schema migrations from the new code before HUP starts its workers."""
+    init_schema(server)
+
+def post_fork(server, worker):
+    # SQLite connections must never cross a fork.
+    from server.python.database.db_manager import close_connections
+    close_connections()
+
+def post_worker_init(worker):
+    """Run the reminder scheduler in exactly one worker when NOTIFY_IN_SERVER is set."""
+    if os.getenv('NOTIFY_IN_SERVER', 'false').lower() not in ('true', '1', 'yes'):
+        return
+    try:
+        from notify.notify import NOTIFY_LOCK_PATH, build_reminder_scheduler
+        from notify.reminders import run_as_leader
+    except Exception:
+        worker.log.exception("Notifications disabled: could not load the notifier")
+        return
+    # The same lock as the notifier daemon (python -m notify.daemon), so only one of them runs.
+    run_as_leader(NOTIFY_LOCK_PATH, lambda: build_reminder_scheduler().run())
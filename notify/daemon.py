@@ -0,0 +1,178 @@
+"""
+Resident notifier: runs due-date reminders, the digests at DIGEST_TIME and
+task archiving in one long-lived process, instead of a cron job that
+bootstraps Python, boto3 and SQLite for every digest.
+
+The SES client and database connections are created once at start and
+reused by every run. Only one notifier runs at a time: the daemon holds
+NOTIFY_LOCK_PATH, the same lock as the in-server scheduler
+(NOTIFY_IN_SERVER), and exits if another process has it (or, with --wait,
+stands by and takes over when that process exits). Every run is added to
+the run history; GET /health and GET /runs on NOTIFY_HEALTH_PORT report on
+the daemon.
+
+Usage:
+    python -m notify.daemon [run] [--wait]
+    python -m notify.daemon history [--limit N] [--kind digest|reminder|archive]
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from notify.notify import NOTIFY_LOCK_PATH, build_reminder_scheduler, get_dispatcher, last_runs
+from notify.reminders import acquire_lock
+from server.python.database.db_manager import (
+    init_db,
+    close_connections,
+    get_tasks_version,
+    load_notifier_runs,
+    STORAGE_BACKEND
+)
+
+logger = logging.getLogger(__name__)
+
+# 0 turns the health server off; it listens on localhost unless told otherwise.
+NOTIFY_HEALTH_HOST = os.getenv("NOTIFY_HEALTH_HOST", "127.0.0.1")
+NOTIFY_HEALTH_PORT = int(os.getenv("NOTIFY_HEALTH_PORT", 7001))
+RUN_KINDS = ("digest", "reminder", "archive")
+
+def health_report(scheduler, started_at):
+    """(HTTP status, body) for GET /health: the scheduler thread is running and the database answers."""
+    try:
+        get_tasks_version()
+        database = "ok"
+    except Exception as e:
+        database = f"{type(e).__name__}: {e}"
+    healthy = scheduler.alive and database == "ok"
+    return (200 if healthy else 503), {
+        "status": "ok" if healthy else "error",
+        "pid": os.getpid(),
+        "uptime": round(time.time() - started_at, 3),
+        "scheduler": "running" if scheduler.alive else "stopped",
+        "database": database,
+        "next_digest": scheduler.next_digest_time(datetime.now()).isoformat(timespec="minutes")
+        if scheduler.daily_digest else None,
+        "last_runs": dict(last_runs),
+    }
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """GET /health and GET /runs?limit=N&kind=K for the daemon's HealthServer."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            status, body = health_report(self.server.scheduler, self.server.started_at)
+        elif url.path == "/runs":
+            query = parse_qs(url.query)
+            kind = query.get("kind", [None])[0]
+            try:
+                limit = int(query.get("limit", ["50"])[0])
+            except ValueError:
+                limit = 0
+            if not 1 <= limit <= 1000:
+                status, body = 400, {"status": "error", "message": "limit must be between 1 and 1000"}
+            elif kind is not None and kind not in RUN_KINDS:
+                status, body = 400, {"status": "error", "message": f"kind must be one of {', '.join(RUN_KINDS)}"}
+            else:
+                status, body = 200, {"runs": load_notifier_runs(limit, kind)}
+        else:
+            status, body = 404, {"status": "error", "message": "Not found"}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug("health %s - %s", self.address_string(), format % args)
+
+class HealthServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, scheduler):
+        super().__init__(address, HealthHandler)
+        self.scheduler = scheduler
+        self.started_at = time.time()
+
+def run(wait=False):
+    """Run the notifier until SIGTERM or SIGINT; returns the process exit status."""
+    if STORAGE_BACKEND == "memory":
+        logger.error("The memory storage backend belongs to the server process; "
+                     "run the notifier there with NOTIFY_IN_SERVER=true")
+        return 1
+    lock = acquire_lock(NOTIFY_LOCK_PATH, blocking=False)
+    if lock is None:
+        if not wait:
+            logger.error("Another notifier holds %s; exiting", NOTIFY_LOCK_PATH)
+            return 1
+        logger.info("Another notifier holds %s; waiting to take over", NOTIFY_LOCK_PATH)
+        lock = acquire_lock(NOTIFY_LOCK_PATH)
+
+    with lock:
+        started = time.perf_counter()
+        try:
+            init_db()
+            get_tasks_version()  # opens the first pooled connection
+            get_dispatcher()  # imports boto3 and creates the SES client now rather than at the first send
+        except Exception as e:
+            # Misconfiguration (no region, unreadable database, ...) shows up here, not at the first digest.
+            logger.error("Notifier could not start: %s: %s", type(e).__name__, e)
+            return 1
+        logger.info("Notifier ready in %.3fs (lock %s)", time.perf_counter() - started, NOTIFY_LOCK_PATH)
+
+        scheduler = build_reminder_scheduler()
+        health = None
+        if NOTIFY_HEALTH_PORT:
+            health = HealthServer((NOTIFY_HEALTH_HOST, NOTIFY_HEALTH_PORT), scheduler)
+            threading.Thread(target=health.serve_forever, name="notifier-health", daemon=True).start()
+            logger.info("Notifier health check on http://%s:%d/health", NOTIFY_HEALTH_HOST, NOTIFY_HEALTH_PORT)
+
+        stopping = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stopping.set())
+        scheduler.start()
+        status = 0
+        while not stopping.wait(1):
+            if not scheduler.alive:
+                # e.g. the database went away during a resync; let the supervisor restart us.
+                logger.error("Reminder scheduler stopped unexpectedly")
+                status = 1
+                break
+
+        logger.info("Stopping notifier")
+        scheduler.stop()  # lets a run in progress finish
+        if health is not None:
+            health.shutdown()
+            health.server_close()
+        close_connections()
+    return status
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident notifier: reminders, digests and archiving")
+    sub = parser.add_subparsers(dest="command")
+    run_cmd = sub.add_parser("run", help="Run the notifier until stopped (the default)")
+    run_cmd.add_argument("--wait", action="store_true",
+                         help="If another notifier is running, wait and take over when it exits")
+    history_cmd = sub.add_parser("history", help="Print recent notifier runs, newest first")
+    history_cmd.add_argument("--limit", type=int, default=20)
+    history_cmd.add_argument("--kind", choices=RUN_KINDS)
+    args = parser.parse_args(argv)
+
+    if args.command == "history":
+        init_db()
+        for entry in load_notifier_runs(args.limit, args.kind):
+            print(json.dumps(entry))
+        return 0
+    return run(wait=getattr(args, "wait", False))
+
+if __name__ == "__main__":
+    raise SystemExit(main())
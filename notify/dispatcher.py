@@ -0,0 +1,153 @@
+"""
+Concurrent, rate-limited email dispatch through AWS SES.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from server.python.metrics import SES_SEND_SECONDS, SES_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# SES error codes that mean "slow down" rather than "this message is bad".
+THROTTLING_CODES = {"Throttling", "ThrottlingException", "TooManyRequestsException"}
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+@dataclass
+class SendResult:
+    """Outcome of sending one message."""
+    recipient: str
+    message_id: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+@dataclass
+class DispatchSummary:
+    """Per-run totals for a dispatch."""
+    results: List[SendResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for r in self.results if r.ok)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.sent
+
+    @property
+    def retries(self) -> int:
+        return sum(max(0, r.attempts - 1) for r in self.results)
+
+    def to_dict(self) -> dict:
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'elapsed': round(self.elapsed, 3),
+            'rate': round(self.sent / self.elapsed, 2) if self.elapsed else 0.0,
+        }
+
+def is_throttling_error(error: "ClientError") -> bool:
+    err = error.response.get('Error', {})
+    return err.get('Code') in THROTTLING_CODES or 'Maximum sending rate exceeded' in err.get('Message', '')
+
+class SESDispatcher:
+    """Sends messages from a bounded worker pool, paced by a token bucket.
+
+    Throttling errors and transient client-side failures (BotoCoreError:
+    timeouts, dropped connections) are retried with full-jitter exponential
+    backoff; any other ClientError fails that message immediately.
+    """
+
+    def __init__(self, ses_client, send_rate: float = 14.0, workers: int = 8,
+                 max_retries: int = 5, base_delay: float = 0.2, max_delay: float = 10.0):
+        self.ses_client = ses_client
+        self.bucket = TokenBucket(send_rate)
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _backoff(self, attempts: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+
+    def _send_one(self, recipient: str, kwargs: dict) -> SendResult:
+        # Imported here so importing the notifier does not load botocore.
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        result = SendResult(recipient=recipient)
+        start = time.monotonic()
+        while True:
+            self.bucket.acquire()
+            result.attempts += 1
+            call_start = time.perf_counter()
+            try:
+                response = self.ses_client.send_email(**kwargs)
+                SES_SEND_SECONDS.observe(time.perf_counter() - call_start, outcome="ok")
+                result.message_id = response['MessageId']
+                break
+            except ClientError as e:
+                SES_SEND_SECONDS.observe(time.perf_counter() - call_start, outcome="error")
+                SES_ERRORS.inc(code=e.response.get('Error', {}).get('Code', 'Unknown'))
+                if is_throttling_error(e) and result.attempts <= self.max_retries:
+                    delay = self._backoff(result.attempts)
+                    logger.warning("SES throttled sending to %s, retrying in %.2fs", recipient, delay)
+                    time.sleep(delay)
+                    continue
+                result.error = e.response.get('Error', {}).get('Message', str(e))
+                break
+            except BotoCoreError as e:
+                SES_SEND_SECONDS.observe(time.perf_counter() - call_start, outcome="error")
+                SES_ERRORS.inc(code=type(e).__name__)
+                if result.attempts <= self.max_retries:
+                    delay = self._backoff(result.attempts)
+                    logger.warning("SES call failed sending to %s (%s), retrying in %.2fs", recipient, e, delay)
+                    time.sleep(delay)
+                    continue
+                result.error = str(e)
+                break
+        result.latency = time.monotonic() - start
+        return result
+
+    def send_all(self, messages) -> DispatchSummary:
+        """Send (recipient, send_email kwargs) pairs; results keep input order."""
+        messages = list(messages)
+        summary = DispatchSummary()
+        start = time.monotonic()
+        if messages:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(messages))) as pool:
+                summary.results = list(pool.map(lambda m: self._send_one(*m), messages))
+        summary.elapsed = time.monotonic() - start
+        return summary
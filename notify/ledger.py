@@ -0,0 +1,43 @@
+"""
+Task-state fingerprints and per-recipient deltas for incremental digests.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from server.python.database.model import Task
+
+def task_hash(task: Task) -> str:
+    """Short hash of the fields a recipient sees for one task."""
+    data = f"{task.description}\x1f{task.priority}".encode('utf-8')
+    return hashlib.sha1(data).hexdigest()[:16]
+
+def snapshot(tasks) -> Dict[str, str]:
+    """Map str(task id) -> task_hash for a recipient's current view."""
+    return {str(task.id): task_hash(task) for task in tasks}
+
+def fingerprint(view: Dict[str, str]) -> str:
+    """Order-independent fingerprint of a whole view."""
+    digest = hashlib.sha256()
+    for task_id in sorted(view, key=int):
+        digest.update(f"{task_id}:{view[task_id]};".encode('ascii'))
+    return digest.hexdigest()
+
+def combine_fingerprints(*fingerprints: str) -> str:
+    """Fingerprint of a view made of disjoint parts, from the parts' fingerprints."""
+    return hashlib.sha256(";".join(fingerprints).encode('ascii')).hexdigest()
+
+@dataclass
+class Delta:
+    """Changes in a recipient's view since their last delivery."""
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+def compute_delta(previous: Optional[Dict[str, str]], current: Dict[str, str]) -> Delta:
+    """Return new/edited task ids and ids no longer pending. No ledger means everything is new."""
+    if previous is None:
+        return Delta(changed=sorted(current, key=int))
+    changed = [task_id for task_id, h in current.items() if previous.get(task_id) != h]
+    removed = [task_id for task_id in previous if task_id not in current]
+    return Delta(changed=sorted(changed, key=int), removed=sorted(removed, key=int))
@@ -1,87 +1,128 @@
 import os
 import sys
+import json
+import time
 import logging
+import threading
+from datetime import timedelta
 from dotenv import load_dotenv
-import boto3
-from botocore.exceptions import ClientError
 
 # Dynamically determine project root and add to sys.path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from server.python.database.db_manager import load_tasks
+from server.python.database.db_manager import (
+    init_db,
+    get_task_stats,
+    iter_digest_groups,
+    get_ledger_entries,
+    record_deliveries,
+    record_notifier_run,
+    DB_PATH,
+    SQL_PARAM_CHUNK
+)
+from notify.dispatcher import SESDispatcher, DispatchSummary
+from notify.ledger import snapshot, fingerprint, combine_fingerprints, compute_delta
+from notify.reminders import ReminderScheduler
+from server.python.database.archive import ARCHIVE_AFTER_DAYS, ARCHIVE_INTERVAL_SECONDS, archive_due_tasks
+from server.python.logging_config import configure_logging
 
 # Load environment variables
 load_dotenv()
 
 # Configure logging
-LOGS_DIR = os.path.join(project_root, 'logs')
-LOG_FILE = os.path.join(LOGS_DIR, 'task_reminder.log')
-if not os.path.exists(LOGS_DIR):
-    os.makedirs(LOGS_DIR)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # AWS SES configuration
 AWS_REGION = os.getenv("AWS_REGION")
 SENDER_EMAIL = os.getenv("SENDER_EMAIL")
-RECIPIENT_EMAILS = os.getenv("RECIPIENT_EMAILS").split(',')
+# None means "read RECIPIENT_EMAILS on first use"; see get_recipients()
+RECIPIENT_EMAILS = None
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 
-# Initialize SES client
-try:
-    ses_client = boto3.client(
-        'ses',
-        region_name=AWS_REGION,
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-    )
+# Dispatch tuning: SES_MAX_SEND_RATE should match the account's send quota
+SES_BACKEND = os.getenv("SES_BACKEND", "aws")
+SES_MAX_SEND_RATE = float(os.getenv("SES_MAX_SEND_RATE", 14))
+SES_WORKERS = int(os.getenv("SES_WORKERS", 8))
+SES_MAX_RETRIES = int(os.getenv("SES_MAX_RETRIES", 5))
+
+# Reminder scheduling
+REMINDER_LEAD_MINUTES = int(os.getenv("REMINDER_LEAD_MINUTES", 60))
+# How often the scheduler reads task_events for writes made by other processes
+REMINDER_POLL_SECONDS = float(os.getenv("REMINDER_POLL_SECONDS", 5))
+# First retry delay for a reminder no recipient received; doubles on each failure
+REMINDER_RETRY_SECONDS = int(os.getenv("REMINDER_RETRY_SECONDS", 60))
+# One HH:MM time, or several separated by commas (e.g. "10:00,12:00,18:00")
+DIGEST_TIME = os.getenv("DIGEST_TIME", "08:00")
+# Held by whichever process runs the scheduler: the notifier daemon or one
+# gunicorn worker (NOTIFY_IN_SERVER), so two schedulers never run at once.
+NOTIFY_LOCK_PATH = os.getenv("NOTIFY_LOCK_PATH") or DB_PATH + ".scheduler.lock"
+
+# The SES client and dispatcher are built on first send: importing boto3
+# (or even botocore) and creating a client dominates this module's import
+# time, and processes that only serve HTTP never need them.
+dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def create_ses_client():
+    if SES_BACKEND == "stub":
+        from notify.stub_ses import StubSESClient
+        logger.info("Using stub SES client (SES_BACKEND=stub)")
+        return StubSESClient()
+    import boto3
+    try:
+        ses_client = boto3.client(
+            'ses',
+            region_name=AWS_REGION,
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY
+        )
+    except Exception as e:
+        logger.error("Failed to initialize AWS SES client: %s", str(e))
+        raise
     logger.info("Initialized AWS SES client for region")
-except Exception as e:
-    logger.error("Failed to initialize AWS SES client: %s", str(e))
-    raise
+    return ses_client
 
-# Send email notification via AWS SES
-def send_notification_email():
-    tasks = load_tasks()
-    incomplete = [task for task in tasks if not getattr(task, 'completed', False)]
-    if not incomplete:
-        logger.info("No incomplete tasks to notify")
-        return "No incomplete tasks Ascertain the task details for each incomplete task"
-    task_details = "\n".join([f"Task Name: {getattr(task, 'description', 'No description')}\nPriority: {getattr(task, 'priority', 'N/A')}" for task in incomplete])
+def get_dispatcher():
+    """The process-wide SESDispatcher, created once on first use."""
+    global dispatcher
+    if dispatcher is None:
+        with _dispatcher_lock:
+            if dispatcher is None:
+                dispatcher = SESDispatcher(
+                    create_ses_client(),
+                    send_rate=SES_MAX_SEND_RATE,
+                    workers=SES_WORKERS,
+                    max_retries=SES_MAX_RETRIES,
+                )
+    return dispatcher
 
-    # Filter out empty or invalid emails
-    valid_recipients = [email.strip() for email in RECIPIENT_EMAILS if email.strip() and '@' in email]
-    if not valid_recipients:
-        logger.error("No valid recipient emails provided")
-        return "Error: No valid recipient emails provided"
+def get_recipients():
+    """Valid addresses from RECIPIENT_EMAILS, read on first use."""
+    global RECIPIENT_EMAILS
+    if RECIPIENT_EMAILS is None:
+        RECIPIENT_EMAILS = (os.getenv("RECIPIENT_EMAILS") or "").split(',')
+    return [email.strip() for email in RECIPIENT_EMAILS if email.strip() and '@' in email]
 
-    results = []
-    for email in valid_recipients:
-        # Extract username from email for personalization
-        username = email.split('@')[0].split('.')[0] if '.' in email.split('@')[0] else email.split('@')[0]
-        username = username.capitalize()
+def render_digest(username, tasks, removed_count):
+    """Build (subject, text, html) for the tasks that changed for one recipient."""
+    subject = "Daily Task Reminder"
+    task_details = "\n".join([f"Task Name: {task.description}\nPriority: {task.priority}" for task in tasks])
+    removed_note = f"{removed_count} task(s) are no longer pending since your last reminder." if removed_count else ""
 
-        subject = "Daily Task Reminder"
-        body_text = f"""Hi {username},
+    body_text = f"""Hi {username},
 
 We hope this message finds you well.
-This is a friendly reminder of your incomplete tasks as of today. 
+This is a friendly reminder of the incomplete tasks that are new or updated since your last reminder.
 
 Please find the details below
 
 Your Incomplete Tasks
 {task_details}
+{removed_note}
 
 Please take a moment to review and update your task status as needed.
 
@@ -90,44 +131,241 @@ Best regards,
 The Task Reminder Team
 """
 
-        body_html = f"""
+    body_html = f"""
         <html>
         <head></head>
         <body>
             <p>Hi {username},</p>
             <p>We hope this message finds you well. 
-            This is a friendly reminder of your incomplete tasks as of today. </p>
+            This is a friendly reminder of the incomplete tasks that are new or updated since your last reminder. </p>
             <p>Please find the details below.</p>
             <h2>Your Incomplete Tasks</h2>
-            {''.join([f"<p>Task Name: {getattr(task, 'description', 'No description')}<br>Priority: {getattr(task, 'priority', 'N/A')}</p>" for task in incomplete])}
+            {''.join([f"<p>Task Name: {task.description}<br>Priority: {task.priority}</p>" for task in tasks])}
+            <p>{removed_note}</p>
             <p>Please take a moment to review and update your task status as needed</p>
             <p>Best regards,<br>The Task Reminder Team</p>
         </body>
         </html>
         """
+    return subject, body_text, body_html
 
-        try:
-            response = ses_client.send_email(
-                Source=SENDER_EMAIL,
-                Destination={'ToAddresses': [email]},  # Send to individual recipient
-                Message={
-                    'Subject': {'Data': subject},
-                    'Body': {
-                        'Text': {'Data': body_text},
-                        'Html': {'Data': body_html}
-                    }
+class _SharedView:
+    """Open tasks with no owner or assignee; every RECIPIENT_EMAILS address gets them."""
+
+    def __init__(self, tasks):
+        self.tasks = {str(task.id): task for task in tasks}
+        self.view = snapshot(tasks)
+        self.fingerprint = fingerprint(self.view)
+
+def _build_digests(batch, shared, configured, messages, views, results):
+    """Queue a digest for each (email, own tasks) in batch whose view changed.
+
+    A recipient's view is their own tasks plus, for configured recipients,
+    the shared tasks. The ledger is read for the whole batch at once, and
+    the fingerprint is combined from the two parts, so an unchanged
+    recipient costs O(own tasks) however many tasks are shared.
+    """
+    ledger = get_ledger_entries([email for email, _ in batch])
+    for email, own in batch:
+        own_view = snapshot(own)
+        gets_shared = email in configured
+        view_fingerprint = (combine_fingerprints(shared.fingerprint, fingerprint(own_view))
+                            if gets_shared else fingerprint(own_view))
+        entry = ledger.get(email)
+        if entry and entry['fingerprint'] == view_fingerprint:
+            results.append(f"Skipped {email}: no changes since last reminder")
+            continue
+
+        tasks_by_id = dict(shared.tasks) if gets_shared else {}
+        tasks_by_id.update((str(task.id), task) for task in own)
+        view = dict(shared.view, **own_view) if gets_shared else own_view
+        delta = compute_delta(entry['task_hashes'] if entry else None, view)
+        views[email] = (view_fingerprint, view)
+        if not delta.changed and not delta.removed:
+            # Same tasks, fingerprinted differently (e.g. ownership changed): nothing to say.
+            continue
+
+        # Extract username from email for personalization
+        username = email.split('@')[0].split('.')[0] if '.' in email.split('@')[0] else email.split('@')[0]
+        username = username.capitalize()
+
+        subject, body_text, body_html = render_digest(
+            username, [tasks_by_id[task_id] for task_id in delta.changed], len(delta.removed)
+        )
+        messages.append((email, {
+            'Source': SENDER_EMAIL,
+            'Destination': {'ToAddresses': [email]},  # Send to individual recipient
+            'Message': {
+                'Subject': {'Data': subject},
+                'Body': {
+                    'Text': {'Data': body_text},
+                    'Html': {'Data': body_html}
                 }
-            )
-            logger.info(f"Email sent successfully to {email}")
-            results.append(f"Email sent to {email}! Message ID: {response['MessageId']}")
-        except ClientError as e:
-            logger.error(f"Failed to send email to {email}: {e.response['Error']['Message']}")
-            results.append(f"Error sending email to {email}: {e.response['Error']['Message']}")
+            }
+        }))
+
+# Send email notification via AWS SES
+def send_notification_email():
+    """Send each recipient a digest of their open tasks that changed since their last one.
+
+    Owners and assignees get the tasks they own or are assigned; addresses
+    in RECIPIENT_EMAILS also get every task nobody owns. All digests come
+    from one grouped query (iter_digest_groups) read as a stream.
+    """
+    # The counters answer "anything open?" without touching the tasks table.
+    if not get_task_stats()["open"]:
+        logger.info("No incomplete tasks to notify")
+        return "No incomplete tasks Ascertain the task details for each incomplete task"
+    configured = set(get_recipients())
+    shared = _SharedView([])
+    seen = set()
+    batch = []
+    messages = []
+    views = {}
+    results = []
+    for recipient, tasks in iter_digest_groups():
+        if recipient is None:
+            shared = _SharedView(tasks)
+            continue
+        seen.add(recipient)
+        batch.append((recipient, tasks))
+        if len(batch) >= SQL_PARAM_CHUNK:
+            _build_digests(batch, shared, configured, messages, views, results)
+            batch = []
+    if not seen and not shared.tasks:
+        logger.info("No incomplete tasks to notify")
+        return "No incomplete tasks Ascertain the task details for each incomplete task"
+    if not seen and not configured:
+        logger.error("No valid recipient emails provided")
+        return "Error: No valid recipient emails provided"
+    batch.extend((email, []) for email in sorted(configured - seen))
+    _build_digests(batch, shared, configured, messages, views, results)
+
+    # Recipients whose view only changed in fingerprint are recorded without an email.
+    messaged = {email for email, _ in messages}
+    delivered = [(email,) + view for email, view in views.items() if email not in messaged]
+    if not messages:
+        record_deliveries(delivered)
+        logger.info("No recipient's tasks changed since the last reminder")
+        return "\n".join(results)
+
+    summary = get_dispatcher().send_all(messages)
+    for result in summary.results:
+        if result.ok:
+            logger.info(f"Email sent successfully to {result.recipient}")
+            results.append(f"Email sent to {result.recipient}! Message ID: {result.message_id}")
+            delivered.append((result.recipient,) + views[result.recipient])
+        else:
+            logger.error(f"Failed to send email to {result.recipient}: {result.error}")
+            results.append(f"Error sending email to {result.recipient}: {result.error}")
+    record_deliveries(delivered)
+    logger.info("Notification run summary: %s", summary.to_dict())
 
     return "\n".join(results)
 
+def send_task_reminder(task):
+    """Email a reminder for one task that is coming due to its owner and assignees.
+
+    Tasks nobody owns go to every RECIPIENT_EMAILS address.
+    """
+    valid_recipients = list(dict.fromkeys(([task.owner] if task.owner else []) + task.assignees)) \
+        or get_recipients()
+    subject = f"Reminder: {task.description} is due {task.due_date}"
+    body_text = f"""Hi,
+
+This is a reminder that the following task is due soon.
+
+Task Name: {task.description}
+Priority: {task.priority}
+Due: {task.due_date}
+
+Best regards,
+
+The Task Reminder Team
+"""
+    body_html = f"""
+        <html>
+        <head></head>
+        <body>
+            <p>Hi,</p>
+            <p>This is a reminder that the following task is due soon.</p>
+            <p>Task Name: {task.description}<br>Priority: {task.priority}<br>Due: {task.due_date}</p>
+            <p>Best regards,<br>The Task Reminder Team</p>
+        </body>
+        </html>
+        """
+    messages = [(email, {
+        'Source': SENDER_EMAIL,
+        'Destination': {'ToAddresses': [email]},
+        'Message': {
+            'Subject': {'Data': subject},
+            'Body': {
+                'Text': {'Data': body_text},
+                'Html': {'Data': body_html}
+            }
+        }
+    }) for email in valid_recipients]
+    summary = get_dispatcher().send_all(messages)
+    logger.info("Reminder for task %s: %s", task.id, summary.to_dict())
+    return summary
+
+# The newest run of each kind in this process, for the daemon's health check.
+last_runs = {}
+
+def _run_outcome(result):
+    """(ok, detail) for the run history, from what a digest, reminder or job returned."""
+    if isinstance(result, DispatchSummary):
+        return result.failed == 0, json.dumps(result.to_dict())
+    if isinstance(result, str):
+        return not any(line.startswith("Error") for line in result.splitlines()), result
+    return True, "" if result is None else str(result)
+
+def _record_run(kind, started, clock, ok, detail, label, args):
+    if label is not None:
+        detail = f"{label(*args)}: {detail}"
+    entry = {"kind": kind, "started_at": started, "duration": round(time.perf_counter() - clock, 6),
+             "ok": ok, "detail": detail}
+    last_runs[kind] = entry
+    try:
+        record_notifier_run(**entry)
+    except Exception:
+        logger.exception("Could not record the %s run", kind)
+
+def recorded(kind, func, label=None):
+    """Wrap func so every call is added to the notifier run history.
+
+    label(*args), if given, prefixes the entry's detail (e.g. the task id).
+    Exceptions are recorded as failed runs and re-raised.
+    """
+    def run(*args):
+        started = time.time()
+        clock = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            _record_run(kind, started, clock, False, f"{type(e).__name__}: {e}", label, args)
+            raise
+        _record_run(kind, started, clock, *_run_outcome(result), label, args)
+        return result
+    return run
+
+def build_reminder_scheduler():
+    """Scheduler for due-date reminders, digests at DIGEST_TIME and task archiving; every run is recorded."""
+    jobs = [("archive", ARCHIVE_INTERVAL_SECONDS, recorded("archive", archive_due_tasks, lambda: "Archived tasks"))] \
+        if ARCHIVE_AFTER_DAYS > 0 else []
+    return ReminderScheduler(
+        send_reminder=recorded("reminder", send_task_reminder, lambda task: f"Task {task.id}"),
+        lead=timedelta(minutes=REMINDER_LEAD_MINUTES),
+        poll_interval=REMINDER_POLL_SECONDS,
+        retry_delay=timedelta(seconds=REMINDER_RETRY_SECONDS),
+        daily_digest=recorded("digest", send_notification_email),
+        digest_time=DIGEST_TIME,
+        jobs=jobs,
+    )
+
 # CLI for notifications
 def notify():
+    init_db()
     result = send_notification_email()
     print(result)
 
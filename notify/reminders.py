@@ -0,0 +1,287 @@
+"""
+Event-driven reminder scheduler driven by task due dates.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from datetime import datetime, timedelta
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from server.python.database.db_manager import (
+    get_task,
+    load_upcoming_due_tasks,
+    get_sent_reminders,
+    record_reminder_sent,
+    get_last_event_id,
+    load_task_events,
+    add_change_listener,
+    remove_change_listener
+)
+from server.python.database.model import due_datetime
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the doubling delay between retries of an undelivered reminder.
+MAX_RETRY_DELAY = timedelta(minutes=30)
+EVENT_BATCH_SIZE = 500
+
+class ReminderScheduler:
+    """Keeps a min-heap of upcoming reminder times and sleeps until the next one.
+
+    Each pending task with a due date gets one reminder at due - lead. The
+    heap uses lazy deletion: `_scheduled` maps task_id to its live
+    (remind_at, due_date), and heap entries that no longer match are skipped
+    when popped. Writes in this process wake the scheduler through a
+    db_manager change listener. Writes from other processes (the web server,
+    for the notifier daemon) are picked up by reading task_events every
+    `poll_interval` seconds; only bulk writes, or a log trimmed past the
+    scheduler's cursor, cause a full resync.
+
+    If `daily_digest` is given, it runs every day at `digest_time` as another
+    heap event; digest_time is an HH:MM time or a comma-separated list of
+    them (e.g. "10:00,12:00,18:00") for several digests a day. Each (name, interval_seconds, func) in `jobs` runs
+    once at start and then every interval_seconds, also as heap events.
+
+    send_reminder(task) returns a DispatchSummary. A reminder that reached
+    nobody (or raised) is not recorded as sent; it is retried after
+    retry_delay, doubling up to MAX_RETRY_DELAY, until the task is due.
+    """
+
+    def __init__(self, send_reminder, lead=timedelta(hours=1), poll_interval=5,
+                 daily_digest=None, digest_time="08:00", jobs=(), retry_delay=timedelta(minutes=1)):
+        self.send_reminder = send_reminder
+        self.lead = lead
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.daily_digest = daily_digest
+        self.digest_times = sorted({datetime.strptime(t.strip(), "%H:%M").time() for t in digest_time.split(",")})
+        self.jobs = {name: (timedelta(seconds=interval), func) for name, interval, func in jobs}
+        # Next run per job; kept across resyncs, which rebuild the heap.
+        self._job_due = {}
+        # task_id -> (failed attempts, next attempt, due_date) for undelivered reminders.
+        self._retries = {}
+        self._heap = []
+        self._scheduled = {}
+        self._pending_ids = set()
+        self._full_resync = True
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._event_id = 0  # last task_events id applied
+        self._thread = None
+
+    # Called from request threads; only records work for the scheduler thread.
+    def on_tasks_changed(self, events):
+        with self._cond:
+            for _, task_id in events:
+                if task_id is None:
+                    self._full_resync = True
+                else:
+                    self._pending_ids.add(task_id)
+            self._cond.notify()
+
+    @property
+    def alive(self):
+        """True while the scheduler thread started by start() is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+
+    def _push(self, when, kind, key):
+        heapq.heappush(self._heap, (when, next(self._seq), kind, key))
+
+    def next_digest_time(self, now):
+        """The first digest time after now."""
+        for digest_time in self.digest_times:
+            when = datetime.combine(now.date(), digest_time)
+            if when > now:
+                return when
+        return datetime.combine(now.date() + timedelta(days=1), self.digest_times[0])
+
+    def _schedule_task(self, task, already_sent):
+        task_id = task.id
+        self._scheduled.pop(task_id, None)
+        due = task.due_date
+        if task.completed or not due or already_sent.get(task_id) == due:
+            return
+        if due_datetime(due) < datetime.now():
+            return  # already past due; too late for a reminder
+        remind_at = due_datetime(due) - self.lead
+        retry = self._retries.get(task_id)
+        if retry and retry[2] == due:
+            remind_at = max(remind_at, retry[1])  # keep the backoff across resyncs
+        self._scheduled[task_id] = (remind_at, due)
+        self._push(remind_at, "task", task_id)
+
+    def _resync(self, now):
+        """Rebuild the heap from pending tasks that are not yet due."""
+        self._event_id = get_last_event_id()  # read first: later events get replayed, none lost
+        tasks = load_upcoming_due_tasks(now.isoformat(timespec='minutes')[:10])
+        sent = get_sent_reminders(task.id for task in tasks)
+        self._heap = []
+        self._scheduled = {}
+        for task in tasks:
+            self._schedule_task(task, sent)
+        if self.daily_digest:
+            self._push(self.next_digest_time(now), "digest", None)
+        for name in self.jobs:
+            self._push(self._job_due.setdefault(name, now), "job", name)
+        logger.info("Reminder scheduler loaded %d upcoming reminders", len(self._scheduled))
+
+    def _apply_changes(self, task_ids):
+        tasks = [get_task(task_id) for task_id in task_ids]
+        sent = get_sent_reminders(task_ids)
+        for task_id, task in zip(task_ids, tasks):
+            if task is None:
+                self._scheduled.pop(task_id, None)
+                self._retries.pop(task_id, None)
+            else:
+                self._schedule_task(task, sent)
+
+    def _read_events(self, pending):
+        """Add task ids from task_events past the cursor to pending; False if a full resync is needed."""
+        while True:
+            events = load_task_events(self._event_id, EVENT_BATCH_SIZE)
+            if not events:
+                return True
+            if events[0][0] > self._event_id + 1 or any(task_id is None for _, _, task_id in events):
+                return False  # the log was trimmed past the cursor, or a bulk write
+            pending.update(task_id for _, _, task_id in events)
+            self._event_id = events[-1][0]
+            if len(events) < EVENT_BATCH_SIZE:
+                return True
+
+    def _fire(self, kind, key, when):
+        if kind == "digest":
+            self._push(self.next_digest_time(datetime.now()), "digest", None)
+            try:
+                self.daily_digest()
+            except Exception:
+                logger.exception("Daily digest failed")
+            return
+        if kind == "job":
+            interval, func = self.jobs[key]
+            try:
+                func()
+            except Exception:
+                logger.exception("Scheduled job %s failed", key)
+            self._job_due[key] = datetime.now() + interval
+            self._push(self._job_due[key], "job", key)
+            return
+        if self._scheduled.get(key, (None,))[0] != when:
+            return  # superseded by a later edit
+        _, due = self._scheduled.pop(key)
+        task = get_task(key)
+        if task is None or task.completed or task.due_date != due:
+            self._retries.pop(key, None)
+            return
+        try:
+            summary = self.send_reminder(task)
+        except Exception:
+            logger.exception("Failed to send reminder for task %s", key)
+        else:
+            if summary.sent or not summary.failed:
+                # A partial failure still counts: retrying would repeat it for those who got it.
+                record_reminder_sent(key, due)
+                self._retries.pop(key, None)
+                return
+            logger.warning("Reminder for task %s reached none of its %d recipients", key, summary.failed)
+        self._retry(key, due)
+
+    def _retry(self, task_id, due):
+        attempts = self._retries.get(task_id, (0,))[0] + 1
+        retry_at = datetime.now() + min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+        if retry_at >= due_datetime(due):
+            self._retries.pop(task_id, None)
+            logger.error("Giving up on the reminder for task %s after %d attempts", task_id, attempts)
+            return
+        self._retries[task_id] = (attempts, retry_at, due)
+        self._scheduled[task_id] = (retry_at, due)
+        self._push(retry_at, "task", task_id)
+
+    def run(self):
+        logger.info("Starting reminder scheduler")
+        add_change_listener(self.on_tasks_changed)
+        try:
+            self._loop()
+        finally:
+            remove_change_listener(self.on_tasks_changed)
+
+    def _loop(self):
+        last_poll = datetime.now()
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                full_resync, self._full_resync = self._full_resync, False
+                pending, self._pending_ids = self._pending_ids, set()
+
+            now = datetime.now()
+            if not full_resync and (now - last_poll).total_seconds() >= self.poll_interval:
+                last_poll = now
+                full_resync = not self._read_events(pending)
+            if full_resync:
+                self._resync(now)
+            elif pending:
+                self._apply_changes(sorted(pending))
+
+            while self._heap and self._heap[0][0] <= datetime.now():
+                when, _, kind, key = heapq.heappop(self._heap)
+                self._fire(kind, key, when)
+
+            timeout = max(0.0, self.poll_interval - (datetime.now() - last_poll).total_seconds())
+            if self._heap:
+                timeout = min(timeout, max(0.0, (self._heap[0][0] - datetime.now()).total_seconds()))
+            with self._cond:
+                if not (self._stopped or self._full_resync or self._pending_ids):
+                    self._cond.wait(timeout)
+
+
+def acquire_lock(lock_path, blocking=True):
+    """Open lock_path and take an exclusive flock on it; the lock lasts until the file is closed.
+
+    Returns the open file, or None when blocking is False and another
+    process holds the lock. Without fcntl (Windows) nothing is locked.
+    """
+    lock_file = open(lock_path, "w")
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def run_as_leader(lock_path, target):
+    """Run target() in only one process at a time, chosen by an exclusive flock.
+
+    Every caller starts a daemon thread that blocks on the lock, so when the
+    holding process exits another one takes over. Without fcntl (Windows)
+    target simply runs in this process.
+    """
+    def wait_and_run():
+        with acquire_lock(lock_path):
+            if fcntl is not None:
+                logger.info("Acquired scheduler lock %s; this process runs notifications", lock_path)
+            target()
+
+    thread = threading.Thread(target=wait_and_run, name="scheduler-leader", daemon=True)
+    thread.start()
+    return thread
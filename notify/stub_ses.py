@@ -0,0 +1,40 @@
+"""
+Offline stand-in for the boto3 SES client, for load tests and local runs.
+"""
+
+import itertools
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+class StubSESClient:
+    """Implements send_email with configurable latency and throttling.
+
+    latency is the simulated round trip in seconds. throttle_rate is the
+    fraction of calls rejected with a Throttling error. Sent messages are
+    recorded in `sent` for inspection.
+    """
+
+    def __init__(self, latency: float = 0.05, throttle_rate: float = 0.0, seed=None):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.sent = []
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send_email(self, Source, Destination, Message, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            if self._random.random() < self.throttle_rate:
+                raise ClientError(
+                    {'Error': {'Code': 'Throttling', 'Message': 'Maximum sending rate exceeded.'}},
+                    'SendEmail',
+                )
+            message_id = f"stub-{next(self._ids)}"
+            self.sent.append({'Source': Source, 'Destination': Destination, 'Message': Message})
+        return {'MessageId': message_id}
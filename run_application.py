@@ -1,10 +1,7 @@
 import os
 import sys
 import threading
-import time
-import schedule
 import logging
-from logging.handlers import RotatingFileHandler
 from dotenv import load_dotenv
 
 # Add the project root directory to sys.path
@@ -12,37 +9,21 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
 
 # Configure logging
-LOGS_DIR = os.path.join(project_root, 'logs')
-LOG_FILE = os.path.join(LOGS_DIR, 'task_reminder.log')
-if not os.path.exists(LOGS_DIR):
-    os.makedirs(LOGS_DIR)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        RotatingFileHandler(LOG_FILE, maxBytes=10*1024*1024, backupCount=5),
-        logging.StreamHandler()
-    ]
-)
+from server.python.logging_config import configure_logging
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Importing the app also initializes the database schema.
 from server.python.scripts.app import app
-from notify.notify_user import notify
-from server.python.database.db_manager import init_db
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize database
-init_db()
-
 def run_notifications():
-    """Run the notify function daily at 8am."""
-    logger.info("Starting notification scheduler (daily at 8am)")
-    schedule.every().day.at("08:00").do(notify)
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+    """Run per-task due-date reminders plus the digests at DIGEST_TIME."""
+    from notify.notify import DIGEST_TIME, build_reminder_scheduler
+    logger.info("Starting notification scheduler (due-date reminders, digests at %s)", DIGEST_TIME)
+    build_reminder_scheduler().run()
 
 if __name__ == '__main__':
     import argparse
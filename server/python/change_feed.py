@@ -0,0 +1,96 @@
+"""
+Server-Sent Events stream of task changes, resumable via Last-Event-ID.
+"""
+
+import json
+import os
+import threading
+import time
+
+from server.python.database.db_manager import (
+    add_change_listener,
+    get_tasks_by_ids,
+    load_task_events
+)
+
+SSE_POLL_SECONDS = float(os.getenv("SSE_POLL_SECONDS", 2))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+# Streams end after this long and the browser reconnects with Last-Event-ID,
+# which spreads long-lived connections across workers.
+SSE_MAX_SECONDS = float(os.getenv("SSE_MAX_SECONDS", 300))
+SSE_RETRY_MS = 2000
+SSE_BATCH_SIZE = 500
+
+class ChangeFeed:
+    """Wakes waiting streams when this process commits a task write.
+
+    Writes from other processes are not signalled; streams still see them
+    within SSE_POLL_SECONDS because they re-read task_events after each wait.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._listening = False
+
+    def _on_change(self, events):
+        with self._cond:
+            self._seq += 1
+            self._cond.notify_all()
+
+    def seq(self) -> int:
+        if not self._listening:
+            with self._cond:
+                if not self._listening:
+                    add_change_listener(self._on_change)
+                    self._listening = True
+        return self._seq
+
+    def wait(self, seq, timeout):
+        """Block until a write after seq, or timeout; return the current seq."""
+        with self._cond:
+            if self._seq == seq:
+                self._cond.wait(timeout)
+            return self._seq
+
+feed = ChangeFeed()
+
+def format_event(event_id, event, data):
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+def event_stream(last_id):
+    """Yield SSE messages for every task event after last_id.
+
+    Each "task" message carries {"op", "id", "task"}, where task is the row's
+    current state or null once it is gone (deleted or archived). A "reset" message means the
+    client must reload its list: a bulk write (an import or a position
+    rebalance) happened, or the client fell further behind than the event
+    log keeps.
+    """
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    started = last_sent = time.monotonic()
+    while time.monotonic() - started < SSE_MAX_SECONDS:
+        seq = feed.seq()
+        events = load_task_events(last_id, SSE_BATCH_SIZE)
+        if events and (events[0][0] > last_id + 1 or any(task_id is None for _, _, task_id in events)):
+            last_id = events[-1][0]
+            yield format_event(last_id, "reset", {})
+            last_sent = time.monotonic()
+            continue
+        if events:
+            tasks = get_tasks_by_ids({task_id for _, op, task_id in events if op not in ("delete", "archive")})
+            for event_id, op, task_id in events:
+                task = tasks.get(task_id)
+                yield format_event(event_id, "task", {
+                    "op": op,
+                    "id": task_id,
+                    "task": task.to_dict() if task else None,
+                })
+            last_id = events[-1][0]
+            last_sent = time.monotonic()
+            if len(events) == SSE_BATCH_SIZE:
+                continue
+        elif time.monotonic() - last_sent >= SSE_HEARTBEAT_SECONDS:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
+        feed.wait(seq, SSE_POLL_SECONDS)
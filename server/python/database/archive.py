@@ -0,0 +1,62 @@
+"""
+Archival of completed tasks: moves them from tasks into tasks_archive so the
+live table and its indexes only hold work that is still relevant.
+
+The reminder scheduler runs archive_due_tasks() every ARCHIVE_INTERVAL_SECONDS
+(see notify.notify.build_reminder_scheduler); the CLI runs it on demand.
+
+Usage:
+    python -m server.python.database.archive run [--older-than-days N] [--no-vacuum]
+    python -m server.python.database.archive vacuum
+    python -m server.python.database.archive convert-vacuum
+    python -m server.python.database.archive stats
+"""
+
+import argparse
+import json
+import os
+
+from server.python.database.db_manager import (
+    init_db,
+    archive_completed_tasks,
+    incremental_vacuum,
+    convert_to_incremental_vacuum,
+    get_archive_stats
+)
+
+# Completed tasks older than this are archived; 0 turns scheduled archiving off.
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", 3600))
+
+def archive_due_tasks():
+    """Archive tasks completed more than ARCHIVE_AFTER_DAYS ago; returns the count."""
+    if ARCHIVE_AFTER_DAYS <= 0:
+        return 0
+    return archive_completed_tasks(ARCHIVE_AFTER_DAYS)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive completed tasks and reclaim space")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_cmd = sub.add_parser("run", help="Archive completed tasks older than the cutoff")
+    run_cmd.add_argument("--older-than-days", type=float, default=ARCHIVE_AFTER_DAYS,
+                         help=f"Age cutoff in days since completion (default: {ARCHIVE_AFTER_DAYS:g})")
+    run_cmd.add_argument("--no-vacuum", action="store_true", help="Skip the incremental vacuum afterwards")
+    sub.add_parser("vacuum", help="Run an incremental vacuum")
+    sub.add_parser("convert-vacuum",
+                   help="Switch an existing database to auto_vacuum=INCREMENTAL (full VACUUM, exclusive lock)")
+    sub.add_parser("stats", help="Print archive and free-space statistics")
+    args = parser.parse_args(argv)
+
+    init_db()
+    if args.command == "run":
+        result = {"archived": archive_completed_tasks(args.older_than_days, vacuum=not args.no_vacuum)}
+    elif args.command == "vacuum":
+        result = {"freed_pages": incremental_vacuum()}
+    elif args.command == "convert-vacuum":
+        result = {"incremental": convert_to_incremental_vacuum()}
+    else:
+        result = get_archive_stats()
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+In-process read-through cache for task queries.
+"""
+
+import threading
+from collections import OrderedDict
+
+class TaskCache:
+    """LRU cache of query results, bounded by entries and by total cached rows.
+
+    Writers call invalidate(), which also bumps a generation counter. Readers
+    capture generation() before querying and pass it to put(), so a result
+    read before a concurrent write is never stored after that write.
+    Readers also call sync() with the table's change version so writes made
+    by other processes invalidate the cache too.
+    """
+
+    def __init__(self, max_entries=256, max_rows=50000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._generation = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, generation: int) -> None:
+        """Store a list result unless the cache was invalidated since generation."""
+        weight = len(value) + 1
+        if weight > self.max_rows:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._rows -= old[1]
+            self._entries[key] = (value, weight)
+            self._rows += weight
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                _, (_, evicted_weight) = self._entries.popitem(last=False)
+                self._rows -= evicted_weight
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def sync(self, version) -> None:
+        """Drop everything if the data version moved since the last sync."""
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    self._clear()
+                self._version = version
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._rows = 0
+        self._generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'rows': self._rows,
+            }
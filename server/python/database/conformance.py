@@ -0,0 +1,494 @@
+"""
+Conformance checks for the storage backends.
+
+Every check starts from an empty store and drives it only through the
+db_manager functions the app calls (db_manager.STORAGE_API), so the same
+checks run unchanged against each backend. STORAGE_BACKEND is read once at
+import, so each backend is checked in its own process.
+
+Usage:
+    python -m server.python.database.conformance
+    python -m server.python.database.conformance --backends memory --verbose
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from datetime import date, datetime, timedelta
+
+BACKENDS = ("sqlite", "memory")
+
+def expect(actual, expected, what):
+    if actual != expected:
+        raise AssertionError(f"{what}: expected {expected!r}, got {actual!r}")
+
+def _ids(tasks):
+    return [task.id for task in tasks]
+
+def check_crud(db):
+    task_id = db.add_task("Write the report", "high", "2030-01-02", owner="o@example.com",
+                          assignees=["b@example.com", "a@example.com"])
+    task = db.get_task(task_id)
+    expect((task.title, task.description, task.priority, task.due_date, task.status),
+           ("Write the report", "Write the report", "high", "2030-01-02", "pending"), "created task")
+    expect((task.owner, task.assignees), ("o@example.com", ["a@example.com", "b@example.com"]), "ownership")
+    expect(db.update_task(task_id, "New text", "low", None, "New title"), True, "update existing")
+    task = db.get_task(task_id)
+    expect((task.title, task.description, task.priority, task.due_date), ("New title", "New text", "low", None),
+           "updated fields")
+    expect((task.owner, task.assignees), ("o@example.com", ["a@example.com", "b@example.com"]),
+           "ownership left unchanged")
+    db.update_task(task_id, "New text", "low", owner=None, assignees=["c@example.com"])
+    expect((db.get_task(task_id).owner, db.get_task(task_id).assignees), (None, ["c@example.com"]),
+           "ownership replaced")
+    expect(db.mark_task(task_id, True), True, "mark existing")
+    expect(db.get_task(task_id).status, "completed", "status after mark")
+    expect(db.mark_task(task_id, False), True, "unmark existing")
+    expect(db.get_task(task_id).status, "pending", "status after unmark")
+    expect(db.delete_task(task_id), True, "delete existing")
+    expect(db.get_task(task_id), None, "deleted task")
+
+    missing = 10 ** 9
+    expect(db.update_task(missing, "x", "low"), False, "update missing")
+    expect(db.mark_task(missing, True), False, "mark missing")
+    expect(db.delete_task(missing), False, "delete missing")
+    expect(db.move_task(missing), None, "move missing")
+    expect(db.move_task(db.add_task("anchor test"), missing), None, "move after missing anchor")
+    expect(db.add_task("x" * 150).__class__, int, "add returns the id")
+    expect(db.get_task(db.add_task("  padded  ")).title, "padded", "default title is stripped")
+
+def check_ids_are_not_reused(db):
+    first = db.add_task("first")
+    db.delete_task(first)
+    expect(db.add_task("second") > first, True, "ids increase after a delete")
+
+def check_paging_and_filters(db):
+    ids = [db.add_task(f"task {i}", ("low", "medium", "high")[i % 3], owner="o@example.com" if i % 2 else None,
+                       assignees=["a@example.com"] if i % 4 == 0 else ())
+           for i in range(30)]
+    for task_id in ids[:10]:
+        db.mark_task(task_id, True)
+    expect(_ids(db.load_tasks_page(10)), ids[:10], "first page")
+    expect(_ids(db.load_tasks_page(10, after_id=ids[24])), ids[25:], "last page")
+    expect(_ids(db.load_tasks_page(100, completed=True)), ids[:10], "completed filter")
+    expect(_ids(db.load_tasks_page(100, completed=False)), ids[10:], "open filter")
+    expect(_ids(db.load_tasks_page(100, status="pending", priority="high")),
+           [i for n, i in enumerate(ids) if n >= 10 and n % 3 == 2], "status and priority")
+    expect(_ids(db.load_tasks_page(3, owner="o@example.com", after_id=ids[5])),
+           [ids[7], ids[9], ids[11]], "owner page")
+    expect(_ids(db.load_tasks_page(100, assignee="a@example.com", completed=False)),
+           [i for n, i in enumerate(ids) if n >= 10 and n % 4 == 0], "assignee filter")
+    expect(db.load_tasks_page(100, owner="nobody@example.com"), [], "unknown owner")
+    expect(_ids(db.load_tasks()), ids, "load_tasks")
+    expect(_ids(db.load_incomplete_tasks()), ids[10:], "incomplete tasks")
+    found = db.get_tasks_by_ids([ids[3], 10 ** 9, ids[1]])
+    expect(sorted(found), sorted([ids[1], ids[3]]), "get_tasks_by_ids")
+    expect(found[ids[3]].title, "task 3", "task from get_tasks_by_ids")
+
+def check_page_json(db):
+    db.add_task("Üñíçødé \"quoted\" \\ text\nnew line\t", "high", "2030-05-06T07:08", "Title é",
+                owner="o@example.com", assignees=["z@example.com", "a@example.com"])
+    db.add_task("plain")
+    db.mark_task(db.add_task("done"), True)
+    tasks = db.load_tasks_page(100)
+    rows = db.load_tasks_page_json(100)
+    expect([row[0] for row in rows], _ids(tasks), "json row ids")
+    for task, (_, text) in zip(tasks, rows):
+        expect(json.loads(text), task.to_dict(), f"json of task {task.id}")
+        expect(list(json.loads(text)), list(task.to_dict()), f"json key order of task {task.id}")
+    exported = [text for batch in db.iter_task_json(batch_size=2) for text in batch]
+    expect([json.loads(text) for text in exported], [t.to_dict() for t in tasks], "iter_task_json")
+    expect([t.to_dict() for t in db.iter_tasks(batch_size=2)], [t.to_dict() for t in tasks], "iter_tasks")
+
+def check_position_order(db):
+    a, b, c, d = (db.add_task(name) for name in ("a task", "b task", "c task", "d task"))
+    expect(_ids(db.load_tasks_page(10, order="position")), [a, b, c, d], "initial order")
+    db.move_task(d)
+    expect(_ids(db.load_tasks_page(10, order="position")), [d, a, b, c], "moved first")
+    db.move_task(a, c)
+    expect(_ids(db.load_tasks_page(10, order="position")), [d, b, c, a], "moved after")
+    cursor = db.get_task(b)
+    expect(_ids(db.load_tasks_page(2, order="position", after_id=b, after_position=cursor.position)), [c, a],
+           "position page")
+    db.delete_task(b)
+    expect(_ids(db.load_tasks_page(10, order="position", after_id=b, after_position=cursor.position)), [c, a],
+           "page after a deleted cursor task")
+    b = db.add_task("b task")
+    db.move_task(b, d)
+    expect(_ids(db.load_tasks()), [d, b, c, a], "load_tasks follows position")
+
+    # Repeated moves into the same gap run out of room and rebalance.
+    last_event = db.get_last_event_id()
+    for _ in range(20):
+        db.move_task(c, d)
+        db.move_task(b, d)
+    expect(_ids(db.load_tasks_page(10, order="position")), [d, b, c, a], "order after rebalancing")
+    positions = [t.position for t in db.load_tasks_page(10, order="position")]
+    expect(positions, sorted(set(positions)), "positions stay unique and ordered")
+    events = db.load_task_events(last_event, 100)
+    expect(("move", None) in [(op, task_id) for _, op, task_id in events], True, "rebalance event")
+
+def check_batch(db):
+    existing = db.add_task("existing")
+    results = db.apply_batch([
+        {"op": "create", "description": "made in batch", "priority": "low", "owner": "o@example.com",
+         "assignees": ["a@example.com"]},
+        {"op": "update", "id": existing, "description": "updated", "priority": "high", "title": "Updated"},
+        {"op": "complete", "id": existing},
+        {"op": "delete", "id": 10 ** 9},
+        {"op": "incomplete", "id": existing},
+        {"op": "delete", "id": existing},
+        {"op": "delete", "id": existing},
+    ])
+    created = results[0]["task_id"]
+    expect([r["status"] for r in results],
+           ["success", "success", "success", "error", "success", "success", "error"], "batch statuses")
+    expect(results[3], {"op": "delete", "id": 10 ** 9, "status": "error", "message": "Task not found"},
+           "missing id result")
+    expect(db.get_task(existing), None, "deleted in batch")
+    task = db.get_task(created)
+    expect((task.description, task.owner, task.assignees), ("made in batch", "o@example.com", ["a@example.com"]),
+           "created in batch")
+    results = db.apply_batch([{"op": "update", "id": created, "description": "again", "priority": "low",
+                               "assignees": []}])
+    expect(results, [{"op": "update", "id": created, "status": "success"}], "update result")
+    expect((db.get_task(created).owner, db.get_task(created).assignees), ("o@example.com", []),
+           "batch update ownership")
+
+def check_failed_batch_rolls_back(db):
+    existing = db.add_task("existing")
+    version, last_event, stats = db.get_tasks_version()[0], db.get_last_event_id(), db.get_task_stats()
+    try:
+        db.apply_batch([
+            {"op": "create", "description": "rolled back", "priority": "low"},
+            {"op": "complete", "id": existing},
+            {"op": "update", "id": existing, "priority": "high"},  # no description: raises KeyError
+        ])
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("a batch with a malformed operation succeeded")
+    expect(_ids(db.load_tasks()), [existing], "tasks after a failed batch")
+    expect(db.get_task(existing).status, "pending", "status after a failed batch")
+    expect((db.get_tasks_version()[0], db.get_last_event_id()), (version, last_event), "version and events")
+    expect(db.get_task_stats(), stats, "stats after a failed batch")
+    expect(db.search_tasks("rolled", 10), [], "search after a failed batch")
+    expect(db.add_task("after"), existing + 1, "id after a failed batch")
+
+def check_versions_and_events(db):
+    version, _ = db.get_tasks_version()
+    start = db.get_last_event_id()
+    seen = []
+    db.add_change_listener(seen.append)
+    try:
+        task_id = db.add_task("watched")
+        db.update_task(task_id, "watched", "low")
+        db.mark_task(task_id, True)
+        db.update_task(10 ** 9, "missing", "low")
+        db.delete_task(task_id)
+    finally:
+        db.remove_change_listener(seen.append)
+    expect(db.get_tasks_version()[0] > version, True, "version advances")
+    expected = [("create", task_id), ("update", task_id), ("complete", task_id), ("delete", task_id)]
+    expect([event for events in seen for event in events], expected, "listener events")
+    events = db.load_task_events(start, 100)
+    expect([(op, tid) for _, op, tid in events], expected, "logged events")
+    expect([event_id for event_id, _, _ in events], list(range(start + 1, start + 5)), "event ids")
+    expect(db.load_task_events(start + 2, 1), [events[2]], "event paging")
+    expect(db.get_last_event_id(), start + 4, "last event id")
+    version = db.get_tasks_version()[0]
+    db.update_task(10 ** 9, "missing", "low")
+    expect(db.get_tasks_version()[0], version, "no-op writes keep the version")
+
+def check_due_queries(db):
+    today = date.today()
+    day = lambda n: (today + timedelta(days=n)).isoformat()
+    late = db.add_task("late", due_date=day(-2))
+    soon = db.add_task("soon", due_date=day(1) + "T09:00")
+    later = db.add_task("later", due_date=day(20))
+    db.add_task("no date")
+    done = db.add_task("done", due_date=day(1))
+    db.mark_task(done, True)
+    now = datetime.now().isoformat(timespec="minutes")
+    expect(_ids(db.load_overdue_tasks(now)), [late], "overdue")
+    expect(_ids(db.load_tasks_due_between(today.isoformat(), day(7))), [soon], "due this week")
+    expect(_ids(db.load_tasks_due_between(None, None)), [late, soon, later], "all due, soonest first")
+    expect(_ids(db.load_tasks_due_between(None, None, 2)), [late, soon], "due with limit")
+    expect(_ids(db.load_upcoming_due_tasks(now)), [soon, later], "upcoming")
+    db.mark_task(done, False)
+    expect(_ids(db.load_tasks_due_between(today.isoformat(), day(7))), [done, soon], "reopened task is due")
+
+def check_digest_groups(db):
+    shared = db.add_task("shared")
+    owned = db.add_task("owned", owner="b@example.com")
+    both = db.add_task("both", owner="b@example.com", assignees=["a@example.com", "b@example.com"])
+    assigned = db.add_task("assigned", assignees=["a@example.com"])
+    closed = db.add_task("closed", owner="a@example.com")
+    db.mark_task(closed, True)
+    groups = [(recipient, _ids(tasks)) for recipient, tasks in db.iter_digest_groups(batch_size=2)]
+    expect(groups, [(None, [shared]), ("a@example.com", [both, assigned]), ("b@example.com", [owned, both])],
+           "digest groups")
+
+def check_search(db):
+    report = db.add_task("Quarterly report for the board", title="Board report")
+    db.add_task("Fix the login bug")
+    reports = db.add_task("Reporting pipeline: report, report, report")
+    expect(sorted(t.id for t, _ in db.search_tasks("report", 10)), sorted([report, reports]), "prefix matches")
+    expect([t.id for t, _ in db.search_tasks("board rep", 10)], [report], "every term must match")
+    expect(db.search_tasks("missing", 10), [], "no match")
+    expect(db.search_tasks("  !! ", 10), [], "no terms")
+    scores = [score for _, score in db.search_tasks("report", 10)]
+    expect(scores, sorted(scores, reverse=True), "best score first")
+    expect(len(db.search_tasks("report", 1, offset=1)), 1, "search offset")
+    db.mark_task(reports, True)
+    expect([t.id for t, _ in db.search_tasks("pipeline", 10)], [reports], "status changes keep the text searchable")
+    db.update_task(report, "Something else", "low", title="Renamed")
+    expect([t.id for t, _ in db.search_tasks("board", 10)], [], "search follows updates")
+    db.delete_task(reports)
+    expect(db.search_tasks("pipeline", 10), [], "search follows deletes")
+
+def check_insert_tasks(db):
+    from server.python.database.model import Task
+    count = db.insert_tasks([
+        Task(title="one", description="one", status="completed", owner="o@example.com",
+             assignees=["a@example.com"]),
+        Task(title="two", description="two", created_at="1 January 2030, 9:00am"),
+    ])
+    expect(count, 2, "inserted count")
+    tasks = db.load_tasks()
+    expect([(t.title, t.status, t.owner, t.assignees) for t in tasks],
+           [("one", "completed", "o@example.com", ["a@example.com"]), ("two", "pending", None, [])],
+           "inserted tasks")
+    expect(tasks[1].created_at, "1 January 2030, 9:00am", "created_at kept")
+    expect(tasks[0].position < tasks[1].position, True, "inserted in order")
+    expect(db.insert_tasks([]), 0, "empty insert")
+
+    kept = Task(id=tasks[0].id, title="one again", description="one", priority="high", status="pending",
+                assignees=["b@example.com"])
+    db.insert_tasks([kept, Task(id=500, title="fixed id", description="fixed")], keep_ids=True)
+    again = db.get_task(tasks[0].id)
+    expect((again.title, again.priority, again.status, again.owner, again.assignees, again.position),
+           ("one again", "high", "pending", None, ["b@example.com"], tasks[0].position), "overwritten by id")
+    expect(db.get_task(500).title, "fixed id", "inserted with its id")
+    expect(db.add_task("after import") > 500, True, "ids continue after imported ids")
+
+def check_reminders_and_ledger(db):
+    task_id = db.add_task("remind me", due_date="2030-01-01")
+    expect(db.get_sent_reminders([task_id]), {}, "no reminders yet")
+    db.record_reminder_sent(task_id, "2030-01-01")
+    db.record_reminder_sent(task_id, "2030-02-01")
+    expect(db.get_sent_reminders([task_id, 10 ** 9]), {task_id: "2030-02-01"}, "latest reminder")
+
+    expect(db.get_ledger_entries(["a@example.com"]), {}, "empty ledger")
+    db.record_deliveries([("a@example.com", "fp1", {"1": "h1"}), ("b@example.com", "fp2", {})])
+    db.record_deliveries([("a@example.com", "fp3", {"2": "h2"})])
+    db.record_deliveries([])
+    entries = db.get_ledger_entries(["a@example.com", "b@example.com", "c@example.com"])
+    expect(sorted(entries), ["a@example.com", "b@example.com"], "ledger recipients")
+    expect((entries["a@example.com"]["fingerprint"], entries["a@example.com"]["task_hashes"]),
+           ("fp3", {"2": "h2"}), "ledger upsert")
+    expect(isinstance(entries["a@example.com"]["sent_at"], float), True, "ledger sent_at")
+
+def check_archive(db):
+    keep = db.add_task("still open", owner="o@example.com")
+    old = [db.add_task(f"done {i}", owner="o@example.com" if i % 2 else None) for i in range(5)]
+    for task_id in old:
+        db.mark_task(task_id, True)
+    expect(db.get_archive_stats()["completed_live"], 5, "completed before archiving")
+    expect(db.archive_completed_tasks(1), 0, "nothing older than a day")
+    time.sleep(0.01)
+    start = db.get_last_event_id()
+    expect(db.archive_completed_tasks(0, batch_size=2), 5, "archived count")
+    expect(_ids(db.load_tasks()), [keep], "live tasks after archiving")
+    expect([(op, task_id) for _, op, task_id in db.load_task_events(start, 100)],
+           [("archive", task_id) for task_id in old], "archive events")
+    rows = db.load_archived_page_json(3)
+    expect([row[0] for row in rows], old[:3], "archived page")
+    first = json.loads(rows[0][1])
+    expect((first["title"], first["status"], first["completed"]), ("done 0", "completed", True), "archived json")
+    expect(all(first[key].endswith("Z") for key in ("completedAt", "archivedAt")), True, "archive timestamps")
+    expect([row[0] for row in db.load_archived_page_json(10, after_id=old[2])], old[3:], "archived after_id")
+    expect([row[0] for row in db.load_archived_page_json(10, owner="o@example.com")], [old[1], old[3]],
+           "archived by owner")
+    stats = db.get_archive_stats()
+    expect((stats["archived"], stats["completed_live"]), (5, 0), "archive stats")
+    expect(isinstance(db.incremental_vacuum(), int), True, "vacuum returns a count")
+    expect(db.add_task("new") > max(old), True, "archived ids are not reused")
+
+def check_stats(db):
+    from server.python.database.model import Task
+
+    def recount(label):
+        tasks = db.load_tasks()
+        stats = db.get_task_stats()
+        expect((stats["total"], stats["completed"], stats["open"]),
+               (len(tasks), sum(t.completed for t in tasks), sum(not t.completed for t in tasks)), label)
+        expect(stats["by_priority"], {p: sum(t.priority == p for t in tasks) for p in ("low", "medium", "high")},
+               f"{label} by priority")
+        expect(stats["by_status"],
+               {s: sum(t.status == s for t in tasks) for s in ("pending", "in_progress", "completed")},
+               f"{label} by status")
+
+    recount("empty")
+    ids = [db.add_task(f"task {i}", ("low", "medium", "high")[i % 3]) for i in range(6)]
+    recount("after adds")
+    db.update_task(ids[0], "task 0", "high")
+    db.update_task(ids[1], "task 1 renamed", "medium")
+    recount("after priority changes")
+    db.mark_task(ids[2], True)
+    db.mark_task(ids[3], True)
+    db.mark_task(ids[3], True)
+    recount("after completing")
+    db.delete_task(ids[4])
+    db.apply_batch([{"op": "create", "description": "batched", "priority": "high"},
+                    {"op": "complete", "id": ids[5]}, {"op": "delete", "id": ids[0]}])
+    recount("after a batch")
+    db.insert_tasks([Task(title="imported", description="imported", status="in_progress", priority="low")])
+    recount("after an import")
+    time.sleep(0.01)
+    db.archive_completed_tasks(0)
+    recount("after archiving")
+
+def check_notifier_runs(db):
+    expect(db.load_notifier_runs(), [], "no runs")
+    db.record_notifier_run("digest", 100.0, 0.5, True, "Email sent")
+    db.record_notifier_run("reminder", 200.0, 0.1, False, "RuntimeError: boom")
+    db.record_notifier_run("digest", 300.0, 0.2, 1)
+    runs = db.load_notifier_runs()
+    expect([(r["kind"], r["started_at"], r["ok"], r["detail"]) for r in runs],
+           [("digest", 300.0, True, ""), ("reminder", 200.0, False, "RuntimeError: boom"),
+            ("digest", 100.0, True, "Email sent")], "newest run first")
+    expect(runs[0]["id"] > runs[1]["id"] > runs[2]["id"], True, "run ids increase")
+    expect([r["started_at"] for r in db.load_notifier_runs(kind="digest", limit=1)], [300.0], "runs by kind")
+
+def check_reopen(db):
+    task_id = db.add_task("durable", owner="o@example.com", assignees=["a@example.com"])
+    moved = db.add_task("moved")
+    db.move_task(moved)
+    db.mark_task(task_id, True)
+    db.record_deliveries([("a@example.com", "fp", {"1": "x"})])
+    db.record_reminder_sent(task_id, "2030-01-01")
+    db.record_notifier_run("digest", 1.0, 0.25, True, "ok")
+    before = ([t.to_dict() for t in db.load_tasks()], db.get_tasks_version()[0], db.get_last_event_id())
+    db.close_connections()
+    db.init_db()
+    after = ([t.to_dict() for t in db.load_tasks()], db.get_tasks_version()[0], db.get_last_event_id())
+    expect(after, before, "state after reopening")
+    expect(db.get_ledger_entries(["a@example.com"])["a@example.com"]["fingerprint"], "fp", "ledger after reopening")
+    expect(db.get_sent_reminders([task_id]), {task_id: "2030-01-01"}, "reminders after reopening")
+    expect([(r["kind"], r["detail"]) for r in db.load_notifier_runs()], [("digest", "ok")], "runs after reopening")
+    expect(db.add_task("next") > moved, True, "ids continue after reopening")
+
+CHECKS = [
+    check_crud, check_ids_are_not_reused, check_paging_and_filters, check_page_json, check_position_order,
+    check_batch, check_failed_batch_rolls_back, check_versions_and_events, check_due_queries, check_digest_groups,
+    check_search, check_insert_tasks, check_reminders_and_ledger, check_archive, check_stats, check_notifier_runs,
+    check_reopen,
+]
+
+# --- Memory store specifics: recovery and single-process ownership ---
+
+def check_memory_log_replay(workdir):
+    from server.python.database.memory_store import MemoryStore
+    path = os.path.join(workdir, "replay")
+    store = MemoryStore(path)
+    task_id = store.add_task("logged only")
+    store.snapshot()
+    store.mark_task(task_id, True)
+    later = store.add_task("after the snapshot")
+    expected = [t.to_dict() for t in store.load_tasks()]
+    # A crash: no final snapshot, the lock goes away with the process.
+    store._log.close()
+    store._release_lock_file()
+    with open(path + ".log", "ab") as log:
+        log.write(b'{"lsn": 99, "ops": [["drop", ')
+    reopened = MemoryStore(path)
+    expect([t.to_dict() for t in reopened.load_tasks()], expected, "state rebuilt from snapshot and log")
+    expect(reopened.get_task(later).title, "after the snapshot", "write after the snapshot")
+    reopened.add_task("after the torn record")
+    reopened.close()
+    expect(len(MemoryStore(path).load_tasks()), 3, "torn record dropped, later writes kept")
+
+def check_memory_single_owner(workdir):
+    from server.python.database.memory_store import MemoryStore
+    path = os.path.join(workdir, "owner")
+    first = MemoryStore(path)
+    first.init_db()
+    try:
+        MemoryStore(path).init_db()
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("a second store opened the same files")
+    first.close()
+    second = MemoryStore(path)
+    second.init_db()
+    second.close()
+
+MEMORY_CHECKS = [check_memory_log_replay, check_memory_single_owner]
+
+def run_checks(verbose=False):
+    """Run every check against the configured backend; return the number of failures."""
+    from server.python.database import db_manager
+    workdir = tempfile.mkdtemp(prefix=f"task-conformance-{db_manager.STORAGE_BACKEND}-")
+    failures = 0
+    try:
+        checks = [(check, lambda check=check: check(db_manager)) for check in CHECKS]
+        if db_manager.STORAGE_BACKEND == "memory":
+            checks += [(check, lambda check=check: check(workdir)) for check in MEMORY_CHECKS]
+        for check, run in checks:
+            db_manager.close_connections()
+            db_manager.DB_PATH = os.path.join(workdir, f"{check.__name__}.db")
+            db_manager.init_db()
+            try:
+                run()
+            except Exception:
+                failures += 1
+                print(f"FAIL {db_manager.STORAGE_BACKEND} {check.__name__}")
+                print(traceback.format_exc() if verbose else f"     {traceback.format_exc().splitlines()[-1]}")
+            else:
+                if verbose:
+                    print(f"ok   {db_manager.STORAGE_BACKEND} {check.__name__}")
+        db_manager.close_connections()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check storage backends against the storage API")
+    parser.add_argument("--backends", type=lambda s: s.split(","), default=list(BACKENDS),
+                        help=f"Comma-separated backends (default: {','.join(BACKENDS)})")
+    parser.add_argument("--verbose", "-v", action="store_true", help="List passing checks and full tracebacks")
+    parser.add_argument("--in-process", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.in_process:
+        return 1 if run_checks(args.verbose) else 0
+    unknown = set(args.backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+
+    failed = []
+    for backend in args.backends:
+        env = dict(os.environ, STORAGE_BACKEND=backend)
+        env.pop("MEMORY_STORE_PATH", None)
+        command = [sys.executable, "-m", "server.python.database.conformance", "--in-process"]
+        if args.verbose:
+            command.append("--verbose")
+        if subprocess.run(command, env=env).returncode != 0:
+            failed.append(backend)
+        else:
+            print(f"{backend}: all {len(CHECKS) + (len(MEMORY_CHECKS) if backend == 'memory' else 0)} checks passed")
+    if failed:
+        print(f"Failed backends: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
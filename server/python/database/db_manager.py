@@ -1,55 +1,1398 @@
 import sqlite3
+import json
 import os
+import queue
+import re
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from itertools import groupby
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process init lock
+    fcntl = None
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "tasks.db")
+from server.python.database.cache import TaskCache
+from server.python.database.writer import GroupCommitWriter
+from server.python.metrics import DB_OPERATION_SECONDS, DB_OPERATION_ERRORS, CallbackMetric, timed
+from server.python.database.model import Task, TaskSchema, Priority, Status, ASSIGNEE_SEPARATOR, get_current_timestamp
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.getenv("TASKS_DB_PATH") or os.path.join(os.path.dirname(__file__), "tasks.db")
+
+# Applied to every pooled connection when it is opened. WAL lets readers run
+# alongside a writer; NORMAL sync is durable under WAL except on power loss.
+# auto_vacuum only takes effect on a new file, and only if it is set before
+# journal_mode; older files keep theirs until convert_to_incremental_vacuum().
+CONNECTION_PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+STATEMENT_CACHE_SIZE = 128
+# Keeps "IN (?, ?, ...)" lists under SQLite's bound-parameter limit.
+SQL_PARAM_CHUNK = 500
+# Rows kept in task_events; clients further behind than this get a reset.
+TASK_EVENT_RETENTION = int(os.getenv("TASK_EVENT_RETENTION", 10000))
+# Notifier runs (digests, reminders, jobs) kept for the run history.
+NOTIFIER_RUN_RETENTION = int(os.getenv("NOTIFIER_RUN_RETENTION", 1000))
+# Archiving moves this many tasks per write transaction, then pauses so
+# other writers get the lock; vacuuming frees this many pages per step.
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+ARCHIVE_BATCH_PAUSE_SECONDS = float(os.getenv("ARCHIVE_BATCH_PAUSE_SECONDS", 0.05))
+VACUUM_STEP_PAGES = int(os.getenv("VACUUM_STEP_PAGES", 1000))
+# Route mutations through one writer thread per process that commits
+# concurrent requests together (see GroupCommitWriter). The window is how
+# long it waits for more requests after the first; it is added to the
+# latency of a lone write.
+GROUP_COMMIT = os.getenv("GROUP_COMMIT", "true").lower() in ("true", "1", "yes")
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", 1))
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", 64))
+
+# Read-through cache for load_tasks/load_tasks_page; see get_cache_stats().
+task_cache = TaskCache(
+    max_entries=int(os.getenv("TASK_CACHE_MAX_ENTRIES", 256)),
+    max_rows=int(os.getenv("TASK_CACHE_MAX_ROWS", 50000)),
+)
+for _stat, _type in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                     ("invalidations", "counter"), ("entries", "gauge"), ("rows", "gauge")):
+    CallbackMetric(
+        f"task_cache_{_stat}" + ("_total" if _type == "counter" else ""),
+        f"Task query cache {_stat}.", _type,
+        lambda _stat=_stat: task_cache.stats()[_stat],
+    )
+
+def _timed(func):
+    """Record the operation's latency and failures under its function name."""
+    return timed(DB_OPERATION_SECONDS, DB_OPERATION_ERRORS, operation=func.__name__)(func)
+
+class ConnectionPool:
+    """Keeps idle SQLite connections around so requests skip the connect cost."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=5.0,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; the block runs as one transaction."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            with conn:
+                yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(path=None):
+    """Return the pool for path (default: the current DB_PATH), creating it on first use."""
+    path = path or DB_PATH
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = _pools[path] = ConnectionPool(path)
+    return pool
 
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    return get_pool().connection()
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_writer():
+    """Return the group-commit writer for the current DB_PATH, starting it on first use."""
+    writer = _writers.get(DB_PATH)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(DB_PATH)
+            if writer is None:
+                path = DB_PATH
+                writer = _writers[path] = GroupCommitWriter(
+                    lambda: get_pool(path).connection(), _bump_version, _after_write,
+                    window=GROUP_COMMIT_WINDOW_MS / 1000, max_batch=GROUP_COMMIT_MAX_BATCH,
+                )
+    return writer
+
+def close_connections():
+    """Stop the writer threads and close every idle pooled connection (e.g. before forking or at exit)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.stop()
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+def _forget_writers():
+    # Writer threads do not survive a fork; the child starts its own.
+    global _writers_lock
+    _writers_lock = threading.Lock()
+    _writers.clear()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_writers)
+
+# Legacy (pre-TaskSchema) rows are mapped onto the model's columns with these
+# expressions, shared by the bulk copy and the mirror triggers of _migrate_v2.
+_LEGACY_TITLE = "substr(trim({r}.description), 1, 100)"
+_LEGACY_PRIORITY = (
+    "CASE lower({r}.priority) WHEN 'low' THEN 'low' WHEN 'high' THEN 'high' ELSE 'medium' END"
+)
+_LEGACY_STATUS = "CASE WHEN {r}.completed THEN 'completed' ELSE 'pending' END"
+MIGRATION_BATCH_SIZE = 5000
+POSITION_GAP = TaskSchema.POSITION_GAP
+# Current time as Unix seconds, for timestamps written by triggers.
+_NOW_EPOCH = "((julianday('now') - 2440587.5) * 86400.0)"
+# Sort key for a new row: after every existing task.
+_NEXT_POSITION = f"(SELECT coalesce(max(position), 0) + {POSITION_GAP} FROM tasks)"
+
+@contextmanager
+def _init_lock():
+    """Serialize schema setup across processes (e.g. WSGI workers booting together)."""
+    if fcntl is None:
+        yield
+        return
+    with open(DB_PATH + ".init.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+# Database paths whose schema this process has already checked. Under
+# gunicorn a short-lived child process sets the schema up on start and on
+# HUP (gunicorn.conf.py); each worker then runs init_db() once when it
+# imports the app, which only re-checks the version under the init flock.
+_initialized = set()
+_initialized_lock = threading.Lock()
+
+@_timed
+def init_db(force=False):
+    """Create or upgrade the schema to TaskSchema.VERSION (PRAGMA user_version).
+
+    Runs once per database path per process; later calls return immediately
+    unless force is set.
+    """
+    if DB_PATH in _initialized and not force:
+        return
+    with _initialized_lock:
+        if DB_PATH in _initialized and not force:
+            return
+        with _init_lock():
+            _init_db()
+        _initialized.add(DB_PATH)
+
+def _init_db():
+    with get_connection() as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        has_tasks = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='tasks'"
+        ).fetchone()
+        if not has_tasks:
+            conn.execute(TaskSchema.create_tasks_table())
+            conn.execute(f"PRAGMA user_version = {TaskSchema.VERSION}")
+            version = TaskSchema.VERSION
+
+    if version < 2:
+        _migrate_v2()
+    if version < 3:
+        _migrate_v3()
+    if version < 4:
+        _migrate_v4()
+    if version < 5:
+        _migrate_v5()
 
-def init_db():
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.execute(TaskSchema.CREATE_TASK_ASSIGNEES_TABLE)
+        cursor.execute(TaskSchema.CREATE_TASKS_ARCHIVE_TABLE)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS tasks_assignees_ad AFTER DELETE ON tasks BEGIN
+                DELETE FROM task_assignees WHERE task_id = old.id;
+            END
+        """)
+        # completed_at follows status on every write path (API, batch, import).
+        cursor.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS tasks_completed_at_ai AFTER INSERT ON tasks
+            WHEN new.status = '{COMPLETED}' AND new.completed_at IS NULL BEGIN
+                UPDATE tasks SET completed_at = {_NOW_EPOCH} WHERE id = new.id;
+            END;
+            CREATE TRIGGER IF NOT EXISTS tasks_completed_at_au AFTER UPDATE OF status ON tasks
+            WHEN new.status IS NOT old.status BEGIN
+                UPDATE tasks SET completed_at = CASE WHEN new.status = '{COMPLETED}' THEN {_NOW_EPOCH} END
+                WHERE id = new.id;
+            END;
+        """)
+        for statement in TaskSchema.get_all_indexes():
+            cursor.execute(statement)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS table_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        cursor.execute(
+            "INSERT OR IGNORE INTO table_versions (name, version, updated_at) VALUES ('tasks', 0, ?)",
+            (time.time(),),
+        )
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS notification_ledger (
+                recipient TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                task_hashes TEXT NOT NULL,
+                sent_at REAL NOT NULL
+            )
+        """)
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                description TEXT NOT NULL,
-                priority TEXT DEFAULT 'Medium',
-                completed INTEGER DEFAULT 0
+            CREATE TABLE IF NOT EXISTS task_reminders (
+                task_id INTEGER PRIMARY KEY,
+                due_date TEXT NOT NULL,
+                sent_at REAL NOT NULL
             )
         """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_events (
+                id INTEGER PRIMARY KEY,
+                op TEXT NOT NULL,
+                task_id INTEGER,
+                created_at REAL NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS notifier_runs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                duration REAL NOT NULL,
+                ok INTEGER NOT NULL,
+                detail TEXT NOT NULL
+            )
+        """)
+        _init_search_index(cursor)
+        _init_task_counts(cursor)
         conn.commit()
 
+def _migrate_v2():
+    """Move the legacy tasks(description, priority, completed) table onto TaskSchema.
+
+    Runs online: rows are copied into tasks_v2 in short batched transactions
+    while triggers on the old table mirror concurrent writes, so other
+    connections keep reading and writing until the final swap. The swap
+    (drop, rename, user_version bump) is one short IMMEDIATE transaction.
+    """
+    created_at = get_current_timestamp()
+    with get_connection() as conn:
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(tasks)")}
+        due = "{r}.due_date" if "due_date" in columns else "NULL"
+        exprs = ", ".join(e.format(r="{r}") for e in (_LEGACY_TITLE, "{r}.description", due,
+                                                        _LEGACY_PRIORITY, _LEGACY_STATUS))
+        conn.execute(TaskSchema.create_tasks_table("tasks_v2"))
+        conn.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS migrate_tasks_ai AFTER INSERT ON tasks BEGIN
+                INSERT OR REPLACE INTO tasks_v2 (id, title, description, due_date, priority, status, created_at)
+                VALUES (new.id, {exprs.format(r='new')}, '{created_at}');
+            END;
+            CREATE TRIGGER IF NOT EXISTS migrate_tasks_au AFTER UPDATE ON tasks BEGIN
+                INSERT OR REPLACE INTO tasks_v2 (id, title, description, due_date, priority, status, created_at)
+                VALUES (new.id, {exprs.format(r='new')}, '{created_at}');
+            END;
+            CREATE TRIGGER IF NOT EXISTS migrate_tasks_ad AFTER DELETE ON tasks BEGIN
+                DELETE FROM tasks_v2 WHERE id = old.id;
+            END;
+        """)
+
+    copy_sql = (
+        "INSERT OR IGNORE INTO tasks_v2 (id, title, description, due_date, priority, status, created_at) "
+        f"SELECT t.id, {exprs.format(r='t')}, ? FROM tasks t WHERE t.id > ? ORDER BY t.id LIMIT ?"
+    )
+    last_id = 0
+    copied = 0
+    while True:
+        with get_connection() as conn:
+            batch_end = conn.execute(
+                "SELECT max(id), count(*) FROM (SELECT id FROM tasks WHERE id > ? ORDER BY id LIMIT ?)",
+                (last_id, MIGRATION_BATCH_SIZE),
+            ).fetchone()
+            if not batch_end[1]:
+                break
+            conn.execute(copy_sql, (created_at, last_id, MIGRATION_BATCH_SIZE))
+        last_id = batch_end[0]
+        copied += batch_end[1]
+
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name='tasks'").fetchone()
+        conn.execute("DROP TABLE IF EXISTS tasks_fts")
+        conn.execute("DROP TABLE tasks")
+        conn.execute("ALTER TABLE tasks_v2 RENAME TO tasks")
+        if seq:
+            conn.execute(
+                "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name='tasks'", (seq[0],)
+            )
+        conn.execute("PRAGMA user_version = 2")
+    logger.info("Migrated %d tasks to schema version 2", copied)
+
+def _migrate_v3():
+    """Add the drag-and-drop sort key (position) to an existing tasks table.
+
+    ADD COLUMN is a metadata-only change. Positions are then backfilled as
+    id * POSITION_GAP in short batches, newest rows first, so rows inserted
+    meanwhile (max(position) + gap) still sort after every existing row.
+    """
+    with get_connection() as conn:
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(tasks)")}
+        if "position" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN position INTEGER")
+        upper = conn.execute("SELECT coalesce(max(id), 0) FROM tasks").fetchone()[0]
+    while upper > 0:
+        with get_connection() as conn:
+            conn.execute(
+                "UPDATE tasks SET position = id * ? WHERE id > ? AND id <= ? AND position IS NULL",
+                (POSITION_GAP, upper - MIGRATION_BATCH_SIZE, upper),
+            )
+        upper -= MIGRATION_BATCH_SIZE
+    with get_connection() as conn:
+        conn.execute("PRAGMA user_version = 3")
+    logger.info("Migrated tasks to schema version 3")
+
+def _migrate_v4():
+    """Add the nullable owner column; assignees live in their own table (see _init_db)."""
+    with get_connection() as conn:
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(tasks)")}
+        if "owner" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN owner TEXT")
+        conn.execute("PRAGMA user_version = 4")
+    logger.info("Migrated tasks to schema version 4")
+
+def _migrate_v5():
+    """Add completed_at, used to pick tasks for archiving.
+
+    Completion times were never recorded, so existing completed tasks are
+    stamped with the migration time (in batches) and become eligible for
+    archiving once ARCHIVE_AFTER_DAYS have passed from now.
+    """
+    with get_connection() as conn:
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(tasks)")}
+        if "completed_at" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN completed_at REAL")
+        upper = conn.execute("SELECT coalesce(max(id), 0) FROM tasks").fetchone()[0]
+    now = time.time()
+    while upper > 0:
+        with get_connection() as conn:
+            conn.execute(
+                "UPDATE tasks SET completed_at = ? WHERE id > ? AND id <= ? AND status = ? AND completed_at IS NULL",
+                (now, upper - MIGRATION_BATCH_SIZE, upper, COMPLETED),
+            )
+        upper -= MIGRATION_BATCH_SIZE
+    with get_connection() as conn:
+        conn.execute("PRAGMA user_version = 5")
+    logger.info("Migrated tasks to schema version 5")
+
+def _init_search_index(cursor):
+    """Create the FTS5 index over tasks and the triggers that keep it in sync."""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='tasks_fts'"
+    ).fetchone()
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title,
+            description,
+            content='tasks',
+            content_rowid='id',
+            prefix='2 3'
+        )
+    """)
+    cursor.executescript("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END;
+    """)
+    if not exists:
+        # Index rows that predate the FTS table.
+        cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+def _init_task_counts(cursor):
+    """Create the task_counts table and the triggers that keep it in sync.
+
+    The triggers only update existing rows, so they are created before the
+    backfill: a write landing in between is counted by the backfill alone.
+    """
+    cursor.execute(TaskSchema.CREATE_TASK_COUNTS_TABLE)
+    cursor.executescript("""
+        CREATE TRIGGER IF NOT EXISTS task_counts_ai AFTER INSERT ON tasks BEGIN
+            UPDATE task_counts SET count = count + 1 WHERE priority = new.priority AND status = new.status;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_counts_ad AFTER DELETE ON tasks BEGIN
+            UPDATE task_counts SET count = count - 1 WHERE priority = old.priority AND status = old.status;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_counts_au AFTER UPDATE OF priority, status ON tasks
+        WHEN new.priority IS NOT old.priority OR new.status IS NOT old.status BEGIN
+            UPDATE task_counts SET count = count - 1 WHERE priority = old.priority AND status = old.status;
+            UPDATE task_counts SET count = count + 1 WHERE priority = new.priority AND status = new.status;
+        END;
+    """)
+    if cursor.execute("SELECT count(*) FROM task_counts").fetchone()[0] < len(Priority) * len(Status):
+        # One statement, so the counts are taken from a single snapshot.
+        pairs = ", ".join(f"('{p.value}', '{s.value}')" for p in Priority for s in Status)
+        cursor.execute(f"""
+            INSERT OR REPLACE INTO task_counts (priority, status, count)
+            SELECT p, s, (SELECT count(*) FROM tasks WHERE priority = p AND status = s)
+            FROM (SELECT column1 AS p, column2 AS s FROM (VALUES {pairs}))
+        """)
+
+def _bump_version(conn, events):
+    """Advance the tasks change version and log events inside the caller's transaction.
+
+    events has the same (op, task_id) shape that _after_write passes to
+    listeners. The task_events log gives them ids that survive restarts and
+    are visible to other processes, which the change feed resumes from.
+    """
+    now = time.time()
+    conn.execute(
+        "UPDATE table_versions SET version = version + 1, updated_at = ? WHERE name = 'tasks'",
+        (now,),
+    )
+    conn.executemany(
+        "INSERT INTO task_events (op, task_id, created_at) VALUES (?, ?, ?)",
+        [(op, task_id, now) for op, task_id in events],
+    )
+    conn.execute(
+        "DELETE FROM task_events WHERE id <= (SELECT max(id) FROM task_events) - ?",
+        (TASK_EVENT_RETENTION,),
+    )
+
+def summarize_task_counts(counts):
+    """Stats for GET /api/v1/tasks/stats from {(priority, status): count}."""
+    by_priority = {p.value: 0 for p in Priority}
+    by_status = {s.value: 0 for s in Status}
+    for (priority, status), count in counts.items():
+        by_priority[priority] += count
+        by_status[status] += count
+    total = sum(by_status.values())
+    return {
+        "total": total,
+        "completed": by_status[COMPLETED],
+        "open": total - by_status[COMPLETED],
+        "by_priority": by_priority,
+        "by_status": by_status,
+    }
+
+@_timed
+def get_task_stats():
+    """Live task totals (see summarize_task_counts) from the trigger-kept task_counts rows.
+
+    Reads at most one row per (priority, status) pair, whatever the table size.
+    """
+    with get_connection() as conn:
+        rows = conn.execute("SELECT priority, status, count FROM task_counts").fetchall()
+    return summarize_task_counts({(priority, status): count for priority, status, count in rows})
+
+@_timed
+def get_tasks_version():
+    """Return (version, updated_at) for the tasks table without reading it."""
+    with get_connection() as conn:
+        row = conn.execute("SELECT version, updated_at FROM table_versions WHERE name = 'tasks'").fetchone()
+    return tuple(row) if row else (0, 0.0)
+
+_change_listeners = []
+
+def add_change_listener(callback):
+    """Register callback(events), called after each committed write.
+
+    events is a list of (op, task_id) tuples. task_id is None when a bulk
+    write touched rows whose ids are not known individually.
+    """
+    _change_listeners.append(callback)
+
+def remove_change_listener(callback):
+    if callback in _change_listeners:
+        _change_listeners.remove(callback)
+
+def _after_write(events):
+    """Invalidate cached reads and notify listeners once a write has committed."""
+    task_cache.invalidate()
+    for callback in list(_change_listeners):
+        try:
+            callback(events)
+        except Exception:
+            logger.exception("Task change listener failed")
+
+def get_cache_stats():
+    return task_cache.stats()
+
+TASK_FIELDS = ("id", "title", "description", "due_date", "priority", "status", "created_at", "position", "owner")
+# One lookup on the task_assignees primary key, which also returns them sorted.
+_ASSIGNEES_COLUMN = (
+    f"(SELECT group_concat(assignee, char({ord(ASSIGNEE_SEPARATOR)})) FROM task_assignees "
+    "WHERE task_id = tasks.id) AS assignees"
+)
+TASK_COLUMNS = ", ".join(TASK_FIELDS) + ", " + _ASSIGNEES_COLUMN
+# For queries that join tasks with tables sharing its column names.
+QUALIFIED_TASK_COLUMNS = ", ".join(f"tasks.{c}" for c in TASK_FIELDS) + ", " + _ASSIGNEES_COLUMN
+# Task.to_dict() as a JSON1 expression, for encoding rows inside SQLite.
+TASK_JSON = (
+    "json_object('id', id, 'title', title, 'description', description, 'dueDate', due_date, "
+    "'priority', priority, 'status', status, "
+    "'completed', json(CASE WHEN status = 'completed' THEN 'true' ELSE 'false' END), "
+    "'createdAt', created_at, 'position', position, 'owner', owner, "
+    "'assignees', (SELECT json_group_array(assignee) FROM task_assignees WHERE task_id = tasks.id))"
+)
+OPEN_STATUSES = TaskSchema.OPEN_STATUSES
+COMPLETED = Status.COMPLETED.value
+
+def _status_clause(completed=None, status=None):
+    """SQL predicate and params for the completed/status filters, or (None, [])."""
+    if status is not None:
+        return "status = ?", [status]
+    if completed is True:
+        return "status = ?", [COMPLETED]
+    if completed is False:
+        return "status IN (?, ?)", list(OPEN_STATUSES)
+    return None, []
+
+def default_title(description):
+    """Title for tasks created without one: the description, cut to 100 chars."""
+    return (description or "").strip()[:100]
+
+def _sync_cache():
+    # One primary-key read; catches writes committed by other processes.
+    task_cache.sync((DB_PATH, get_tasks_version()[0]))
+
+@_timed
 def load_tasks():
+    key = (DB_PATH, "all")
+    _sync_cache()
+    tasks = task_cache.get(key)
+    if tasks is not None:
+        return tasks
+    generation = task_cache.generation()
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT id, description, priority, completed FROM tasks")
+        cursor.execute(f"SELECT {TASK_COLUMNS} FROM tasks ORDER BY position, id")
         rows = cursor.fetchall()
-        return [{"id": r[0], "description": r[1], "priority": r[2], "completed": bool(r[3])} for r in rows]
+        tasks = [Task.from_db_row(r) for r in rows]
+    task_cache.put(key, tasks, generation)
+    return tasks
 
-def add_task(description, priority="Medium"):
+def _page_query(columns, limit, after_id, completed, priority, status, order, owner, assignee, after_position):
+    if order == "position":
+        # The cursor is the last row's own (position, id), so a page still
+        # resumes in place after that task is moved, deleted or archived.
+        clauses = ["(position, id) > (?, ?)"] if after_position is not None else []
+        params = [after_position, after_id] if after_position is not None else []
+        order_by = "position, id"
+    else:
+        clauses = ["id > ?"]
+        params = [after_id]
+        order_by = "id"
+    status_sql, status_params = _status_clause(completed, status)
+    if status_sql:
+        clauses.append(status_sql)
+        params.extend(status_params)
+    if priority is not None:
+        clauses.append("priority = ?")
+        params.append(priority)
+    if owner is not None:
+        clauses.append("owner = ?")
+        params.append(owner)
+    if assignee is not None:
+        clauses.append("id IN (SELECT task_id FROM task_assignees WHERE assignee = ?)")
+        params.append(assignee)
+    params.append(limit)
+    query = (
+        f"SELECT {columns} FROM tasks"
+        + (" WHERE " + " AND ".join(clauses) if clauses else "")
+        + f" ORDER BY {order_by} LIMIT ?"
+    )
+    return query, params
+
+@_timed
+def load_tasks_page(limit, after_id=0, completed=None, priority=None, status=None, order="id",
+                    owner=None, assignee=None, after_position=None):
+    """Return up to `limit` tasks after after_id, optionally filtered.
+
+    order="id" pages in id order. order="position" pages in drag-and-drop
+    order, resuming after (after_position, after_id), the position and id
+    of the previous page's last task (no after_position starts from the
+    top). owner and assignee keep only tasks owned by, or assigned to, that
+    address.
+    """
+    key = (DB_PATH, "page", limit, after_id, completed, priority, status, order, owner, assignee, after_position)
+    _sync_cache()
+    tasks = task_cache.get(key)
+    if tasks is not None:
+        return tasks
+
+    query, params = _page_query(TASK_COLUMNS, limit, after_id, completed, priority, status, order, owner, assignee,
+                                after_position)
+    generation = task_cache.generation()
     with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO tasks (description, priority) VALUES (?, ?)", (description, priority))
-        conn.commit()
-        return cursor.lastrowid
+        tasks = [Task.from_db_row(r) for r in conn.execute(query, params)]
+    task_cache.put(key, tasks, generation)
+    return tasks
+
+@_timed
+def load_tasks_page_json(limit, after_id=0, completed=None, priority=None, status=None, order="id",
+                         owner=None, assignee=None, after_position=None):
+    """Like load_tasks_page, but return (id, JSON text) pairs encoded by SQLite.
 
-def update_task(task_id, description, priority):
+    Each JSON text equals Task.to_dict() serialized, so list endpoints can
+    join them into a response body without building a Task or dict per row.
+    """
+    key = (DB_PATH, "page_json", limit, after_id, completed, priority, status, order, owner, assignee,
+           after_position)
+    _sync_cache()
+    rows = task_cache.get(key)
+    if rows is not None:
+        return rows
+
+    query, params = _page_query(f"id, {TASK_JSON}", limit, after_id, completed, priority, status, order,
+                                owner, assignee, after_position)
+    generation = task_cache.generation()
     with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("UPDATE tasks SET description=?, priority=? WHERE id=?", (description, priority, task_id))
-        conn.commit()
-        return cursor.rowcount > 0
+        rows = conn.execute(query, params).fetchall()
+    rows = [tuple(r) for r in rows]
+    task_cache.put(key, rows, generation)
+    return rows
 
-def delete_task(task_id):
+@_timed
+def load_incomplete_tasks():
+    """Return open (pending or in progress) tasks in id order."""
     with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM tasks WHERE id=?", (task_id,))
-        conn.commit()
-        return cursor.rowcount > 0
+        rows = conn.execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE status IN (?, ?) ORDER BY id", OPEN_STATUSES
+        )
+        return [Task.from_db_row(r) for r in rows]
+
+# Every (recipient, open task) pair in one pass: owners and assignees get
+# their own tasks, and tasks with neither are shared (recipient NULL, which
+# sorts first). Each side of the UNION is an index scan, so the cost follows
+# the number of open tasks and assignments, not recipients times tasks.
+DIGEST_QUERY = f"""
+    SELECT r.recipient, {QUALIFIED_TASK_COLUMNS}
+    FROM (
+        SELECT NULL AS recipient, id AS task_id FROM tasks
+        WHERE status IN (?, ?) AND owner IS NULL
+          AND NOT EXISTS (SELECT 1 FROM task_assignees a WHERE a.task_id = tasks.id)
+        UNION
+        SELECT owner, id FROM tasks WHERE status IN (?, ?) AND owner IS NOT NULL
+        UNION
+        SELECT a.assignee, a.task_id FROM task_assignees a JOIN tasks t ON t.id = a.task_id
+        WHERE t.status IN (?, ?)
+    ) AS r JOIN tasks ON tasks.id = r.task_id
+    ORDER BY r.recipient, tasks.id
+"""
+
+def iter_digest_groups(batch_size=1000):
+    """Yield (recipient, [open Task, ...]) per recipient, from one streaming query.
+
+    The shared group (recipient None: open tasks with no owner or assignee)
+    comes first, then one group per owner or assignee in address order,
+    each task in id order.
+    """
+    def rows():
+        with get_connection() as conn:
+            cursor = conn.execute(DIGEST_QUERY, OPEN_STATUSES * 3)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    return
+                yield from batch
+
+    for recipient, group in groupby(rows(), key=lambda row: row["recipient"]):
+        yield recipient, [Task.from_db_row(row) for row in group]
+
+@_timed
+def load_tasks_due_between(start, end, limit=None):
+    """Open tasks with start <= due_date < end (ISO strings), soonest first.
+
+    Either bound may be None. Each open status is a range scan on the
+    (status, due_date) index.
+    """
+    clauses = ["status IN (?, ?)", "due_date IS NOT NULL"]
+    params = list(OPEN_STATUSES)
+    if start is not None:
+        clauses.append("due_date >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("due_date < ?")
+        params.append(end)
+    query = f"SELECT {TASK_COLUMNS} FROM tasks WHERE " + " AND ".join(clauses) + " ORDER BY due_date, id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    with get_connection() as conn:
+        return [Task.from_db_row(r) for r in conn.execute(query, params)]
+
+@_timed
+def load_overdue_tasks(now, limit=None):
+    """Open tasks whose due_date is before the ISO timestamp now."""
+    return load_tasks_due_between(None, now, limit)
+
+@_timed
+def get_task(task_id):
+    with get_connection() as conn:
+        row = conn.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE id=?", (task_id,)).fetchone()
+    return Task.from_db_row(row) if row else None
+
+@_timed
+def get_tasks_by_ids(task_ids):
+    """Return {id: Task} for the ids that still exist."""
+    task_ids = list(task_ids)
+    tasks = {}
+    with get_connection() as conn:
+        for start in range(0, len(task_ids), SQL_PARAM_CHUNK):
+            chunk = task_ids[start:start + SQL_PARAM_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for row in conn.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE id IN ({placeholders})", chunk):
+                tasks[row["id"]] = Task.from_db_row(row)
+    return tasks
+
+@_timed
+def load_upcoming_due_tasks(due_after):
+    """Return open tasks due at or after the ISO timestamp due_after, soonest first."""
+    return load_tasks_due_between(due_after, None)
+
+@_timed
+def get_last_event_id():
+    with get_connection() as conn:
+        return conn.execute("SELECT coalesce(max(id), 0) FROM task_events").fetchone()[0]
+
+@_timed
+def load_task_events(after_id, limit=500):
+    """Return up to limit (id, op, task_id) rows logged after after_id, oldest first."""
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT id, op, task_id FROM task_events WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        ).fetchall()
+    return [tuple(row) for row in rows]
+
+@_timed
+def get_sent_reminders(task_ids):
+    """Return {task_id: due_date} for tasks that already had a reminder sent."""
+    task_ids = list(task_ids)
+    sent = {}
+    with get_connection() as conn:
+        for start in range(0, len(task_ids), SQL_PARAM_CHUNK):
+            chunk = task_ids[start:start + SQL_PARAM_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT task_id, due_date FROM task_reminders WHERE task_id IN ({placeholders})", chunk
+            )
+            sent.update((r[0], r[1]) for r in rows)
+    return sent
+
+@_timed
+def record_reminder_sent(task_id, due_date):
+    with get_connection() as conn:
+        conn.execute(
+            "INSERT INTO task_reminders (task_id, due_date, sent_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(task_id) DO UPDATE SET due_date=excluded.due_date, sent_at=excluded.sent_at",
+            (task_id, due_date, time.time()),
+        )
+
+@_timed
+def get_ledger_entries(recipients):
+    """Return {recipient: {"fingerprint", "task_hashes", "sent_at"}} for known recipients."""
+    recipients = list(recipients)
+    entries = {}
+    with get_connection() as conn:
+        for start in range(0, len(recipients), SQL_PARAM_CHUNK):
+            chunk = recipients[start:start + SQL_PARAM_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT recipient, fingerprint, task_hashes, sent_at FROM notification_ledger "
+                f"WHERE recipient IN ({placeholders})",
+                chunk,
+            )
+            for r in rows:
+                entries[r[0]] = {"fingerprint": r[1], "task_hashes": json.loads(r[2]), "sent_at": r[3]}
+    return entries
+
+@_timed
+def record_deliveries(deliveries):
+    """Upsert ledger rows from (recipient, fingerprint, task_hashes) tuples."""
+    now = time.time()
+    params = [(recipient, fingerprint, json.dumps(hashes), now) for recipient, fingerprint, hashes in deliveries]
+    if not params:
+        return
+    with get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO notification_ledger (recipient, fingerprint, task_hashes, sent_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(recipient) DO UPDATE SET fingerprint=excluded.fingerprint, "
+            "task_hashes=excluded.task_hashes, sent_at=excluded.sent_at",
+            params,
+        )
+
+@_timed
+def record_notifier_run(kind, started_at, duration, ok, detail=""):
+    """Append one notifier run to the history, keeping the newest NOTIFIER_RUN_RETENTION."""
+    with get_connection() as conn:
+        conn.execute(
+            "INSERT INTO notifier_runs (kind, started_at, duration, ok, detail) VALUES (?, ?, ?, ?, ?)",
+            (kind, started_at, duration, int(bool(ok)), detail),
+        )
+        conn.execute(
+            "DELETE FROM notifier_runs WHERE id <= (SELECT max(id) FROM notifier_runs) - ?",
+            (NOTIFIER_RUN_RETENTION,),
+        )
+
+@_timed
+def load_notifier_runs(limit=50, kind=None):
+    """Return the newest notifier runs first, as dicts, optionally only those of one kind."""
+    query = "SELECT id, kind, started_at, duration, ok, detail FROM notifier_runs"
+    params = []
+    if kind is not None:
+        query += " WHERE kind = ?"
+        params.append(kind)
+    params.append(limit)
+    with get_connection() as conn:
+        rows = conn.execute(query + " ORDER BY id DESC LIMIT ?", params).fetchall()
+    return [{"id": r[0], "kind": r[1], "started_at": r[2], "duration": r[3], "ok": bool(r[4]), "detail": r[5]}
+            for r in rows]
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query of quoted prefix terms, or None."""
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+@_timed
+def search_tasks(text, limit, offset=0):
+    """Return (task, score) pairs matching every term of text, best bm25 rank first."""
+    match = build_match_query(text)
+    if match is None:
+        return []
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {QUALIFIED_TASK_COLUMNS}, tasks_fts.rank AS rank
+            FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid
+            WHERE tasks_fts MATCH ?
+            ORDER BY tasks_fts.rank
+            LIMIT ? OFFSET ?
+            """,
+            (match, limit, offset),
+        ).fetchall()
+    return [(Task.from_db_row(r), -r["rank"]) for r in rows]
+
+def iter_tasks(batch_size=1000):
+    """Yield every task in id order, holding at most batch_size rows at once."""
+    with get_connection() as conn:
+        cursor = conn.execute(f"SELECT {TASK_COLUMNS} FROM tasks ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for r in rows:
+                yield Task.from_db_row(r)
+
+def iter_task_json(batch_size=1000):
+    """Yield every task as JSON text (see TASK_JSON) in id order, batch_size rows at a time."""
+    with get_connection() as conn:
+        cursor = conn.execute(f"SELECT {TASK_JSON} FROM tasks ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [r[0] for r in rows]
+
+@_timed
+def insert_tasks(tasks, keep_ids=False):
+    """Insert already-validated Task objects in one transaction.
+
+    With keep_ids, each task's id is kept and an existing row with that id
+    is overwritten; otherwise SQLite assigns new ids. Returns the row count.
+    """
+    tasks = list(tasks)
+    now = get_current_timestamp()
+    params = [
+        (t.id, t.title, t.description, t.due_date, t.priority, t.status, t.created_at or now, t.owner)
+        for t in tasks
+    ]
+    if not params:
+        return 0
+    if keep_ids:
+        query = (
+            "INSERT INTO tasks (id, title, description, due_date, priority, status, created_at, owner, position) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, {_NEXT_POSITION}) "
+            "ON CONFLICT(id) DO UPDATE SET title=excluded.title, description=excluded.description, "
+            "due_date=excluded.due_date, priority=excluded.priority, status=excluded.status, "
+            "created_at=excluded.created_at, owner=excluded.owner"
+        )
+    else:
+        query = (
+            "INSERT INTO tasks (title, description, due_date, priority, status, created_at, owner, position) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?, {_NEXT_POSITION})"
+        )
+        params = [p[1:] for p in params]
+    with get_connection() as conn:
+        if keep_ids:
+            conn.executemany(query, params)
+            conn.executemany("DELETE FROM task_assignees WHERE task_id = ?", [(t.id,) for t in tasks])
+            _insert_assignees(conn, [(t.id, t.assignees) for t in tasks])
+        else:
+            conn.executemany(query, params)
+            # AUTOINCREMENT hands out seq + 1 for each row and this transaction
+            # holds the write lock, so the rows got the last len(tasks) ids in order.
+            last_id = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()[0]
+            first_id = last_id - len(tasks) + 1
+            _insert_assignees(conn, [(first_id + i, t.assignees) for i, t in enumerate(tasks) if t.assignees])
+        _bump_version(conn, [("import", None)])
+    _after_write([("import", None)])
+    return len(params)
+
+def _insert_assignees(conn, pairs):
+    """Add (task_id, [assignee, ...]) pairs; existing rows are kept."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO task_assignees (task_id, assignee) VALUES (?, ?)",
+        [(task_id, assignee) for task_id, assignees in pairs for assignee in assignees],
+    )
+
+def _set_assignees(conn, task_id, assignees):
+    """Replace the assignees of one task."""
+    conn.execute("DELETE FROM task_assignees WHERE task_id = ?", (task_id,))
+    _insert_assignees(conn, [(task_id, assignees)])
+
+# Passed as owner or assignees to leave them as they are.
+UNCHANGED = object()
+
+def _write(work, *args):
+    """Run work(conn, *args) -> (result, events) as one committed write and return result.
 
+    The version bump and task_events rows for events are written in the
+    same transaction, and _after_write runs only once it has committed, so
+    a reader can never repopulate the cache from the pre-write snapshot and
+    listeners see the change. With GROUP_COMMIT the transaction may be
+    shared with other concurrent writes; each still succeeds or fails alone.
+    """
+    if GROUP_COMMIT:
+        return get_writer().submit(work, *args)
+    with get_connection() as conn:
+        result, events = work(conn, *args)
+        if events:
+            _bump_version(conn, events)
+    if events:
+        _after_write(events)
+    return result
+
+def _add_task(conn, description, priority, due_date, title, owner, assignees):
+    cursor = conn.execute(
+        "INSERT INTO tasks (title, description, due_date, priority, created_at, owner, position) "
+        f"VALUES (?, ?, ?, ?, ?, ?, {_NEXT_POSITION})",
+        (title or default_title(description), description, due_date, priority, get_current_timestamp(), owner),
+    )
+    _insert_assignees(conn, [(cursor.lastrowid, assignees)])
+    return cursor.lastrowid, [("create", cursor.lastrowid)]
+
+@_timed
+def add_task(description, priority="medium", due_date=None, title=None, owner=None, assignees=()):
+    return _write(_add_task, description, priority, due_date, title, owner, assignees)
+
+def _update_task(conn, task_id, description, priority, due_date, title, owner, assignees):
+    cursor = conn.execute(
+        "UPDATE tasks SET title=?, description=?, priority=?, due_date=? WHERE id=?",
+        (title or default_title(description), description, priority, due_date, task_id),
+    )
+    if cursor.rowcount == 0:
+        return False, []
+    if owner is not UNCHANGED:
+        conn.execute("UPDATE tasks SET owner=? WHERE id=?", (owner, task_id))
+    if assignees is not UNCHANGED:
+        _set_assignees(conn, task_id, assignees)
+    return True, [("update", task_id)]
+
+@_timed
+def update_task(task_id, description, priority, due_date=None, title=None, owner=UNCHANGED, assignees=UNCHANGED):
+    """Replace a task's fields; owner and assignees are only written when passed."""
+    return _write(_update_task, task_id, description, priority, due_date, title, owner, assignees)
+
+def _delete_task(conn, task_id):
+    cursor = conn.execute("DELETE FROM tasks WHERE id=?", (task_id,))
+    if cursor.rowcount == 0:
+        return False, []
+    return True, [("delete", task_id)]
+
+@_timed
+def delete_task(task_id):
+    return _write(_delete_task, task_id)
+
+def _mark_task(conn, task_id, completed):
+    status = COMPLETED if completed else Status.PENDING.value
+    cursor = conn.execute("UPDATE tasks SET status=? WHERE id=?", (status, task_id))
+    if cursor.rowcount == 0:
+        return False, []
+    return True, [("complete" if completed else "incomplete", task_id)]
+
+@_timed
 def mark_task(task_id, completed: bool):
+    return _write(_mark_task, task_id, completed)
+
+def _position_between(before, after):
+    """Integer strictly between two sort keys (None = open end), or None if there is no room."""
+    if before is None and after is None:
+        return POSITION_GAP
+    if before is None:
+        return after - POSITION_GAP
+    if after is None:
+        return before + POSITION_GAP
+    if after - before < 2:
+        return None
+    return (before + after) // 2
+
+def _rebalance_positions(conn):
+    """Respace every sort key POSITION_GAP apart, keeping the current order."""
+    conn.execute(
+        "UPDATE tasks SET position = ranked.n * ? FROM "
+        "(SELECT id, row_number() OVER (ORDER BY position, id) AS n FROM tasks) AS ranked "
+        "WHERE tasks.id = ranked.id",
+        (POSITION_GAP,),
+    )
+    logger.info("Rebalanced task positions")
+
+def _move_task(conn, task_id, after_id):
+    if conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task_id,)).fetchone() is None:
+        return None, []
+    events = [("move", task_id)]
+    for attempt in range(2):
+        if after_id is None:
+            before = None
+            row = conn.execute(
+                "SELECT position FROM tasks WHERE id != ? ORDER BY position, id LIMIT 1", (task_id,)
+            ).fetchone()
+        else:
+            anchor = conn.execute("SELECT position FROM tasks WHERE id = ?", (after_id,)).fetchone()
+            if anchor is None:
+                return None, []
+            before = anchor[0]
+            row = conn.execute(
+                "SELECT position FROM tasks WHERE (position, id) > (?, ?) AND id != ? "
+                "ORDER BY position, id LIMIT 1",
+                (before, after_id, task_id),
+            ).fetchone()
+        position = _position_between(before, row[0] if row else None)
+        if position is not None:
+            break
+        _rebalance_positions(conn)
+        events = [("move", None)]
+    conn.execute("UPDATE tasks SET position = ? WHERE id = ?", (position, task_id))
+    return position, events
+
+@_timed
+def move_task(task_id, after_id=None):
+    """Place task_id directly after after_id, or first when after_id is None.
+
+    Writes only the moved row. When its neighbours' keys are adjacent, all
+    keys are respaced first and listeners get a bulk event (task_id None)
+    because every position changed. Returns the new position, or None if
+    either task does not exist.
+    """
+    return _write(_move_task, task_id, after_id)
+
+# Statements for the id-addressed batch operations; run with executemany.
+BATCH_SQL = {
+    "update": "UPDATE tasks SET title=?, description=?, priority=?, due_date=? WHERE id=?",
+    "complete": "UPDATE tasks SET status='completed' WHERE id=?",
+    "incomplete": "UPDATE tasks SET status='pending' WHERE id=?",
+    "delete": "DELETE FROM tasks WHERE id=?",
+}
+
+def _existing_ids(conn, ids):
+    ids = list(ids)
+    found = set()
+    for start in range(0, len(ids), SQL_PARAM_CHUNK):
+        chunk = ids[start:start + SQL_PARAM_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(f"SELECT id FROM tasks WHERE id IN ({placeholders})", chunk)
+        found.update(r[0] for r in rows)
+    return found
+
+def _apply_batch(conn, operations):
+    results = [None] * len(operations)
+    for op, run in groupby(enumerate(operations), key=lambda item: item[1]["op"]):
+        run = list(run)
+        if op == "create":
+            for index, item in run:
+                cursor = conn.execute(
+                    "INSERT INTO tasks (title, description, due_date, priority, created_at, owner, position) "
+                    f"VALUES (?, ?, ?, ?, ?, ?, {_NEXT_POSITION})",
+                    (item.get("title") or default_title(item["description"]), item["description"],
+                     item.get("due_date"), item["priority"], get_current_timestamp(), item.get("owner")),
+                )
+                _insert_assignees(conn, [(cursor.lastrowid, item.get("assignees", ()))])
+                results[index] = {"op": op, "status": "success", "task_id": cursor.lastrowid}
+            continue
+
+        existing = _existing_ids(conn, {item["id"] for _, item in run})
+        params = []
+        for index, item in run:
+            task_id = item["id"]
+            if task_id not in existing:
+                results[index] = {"op": op, "id": task_id, "status": "error", "message": "Task not found"}
+                continue
+            if op == "update":
+                params.append((item.get("title") or default_title(item["description"]),
+                               item["description"], item["priority"], item.get("due_date"), task_id))
+            else:
+                params.append((task_id,))
+            if op == "delete":
+                existing.discard(task_id)
+            results[index] = {"op": op, "id": task_id, "status": "success"}
+        if params:
+            conn.executemany(BATCH_SQL[op], params)
+        if op == "update":
+            updated = [item for index, item in run if results[index]["status"] == "success"]
+            conn.executemany("UPDATE tasks SET owner=? WHERE id=?",
+                             [(item["owner"], item["id"]) for item in updated if "owner" in item])
+            for item in updated:
+                if "assignees" in item:
+                    _set_assignees(conn, item["id"], item["assignees"])
+    events = [
+        (r["op"], r.get("id", r.get("task_id")))
+        for r in results if r["status"] == "success"
+    ]
+    return results, events
+
+@_timed
+def apply_batch(operations):
+    """Apply already-validated operations in a single transaction.
+
+    Each operation is a dict with "op" (create, update, complete, incomplete
+    or delete) plus the "id", "title", "description", "priority" and
+    "due_date" keys it needs. Creates and updates may also carry "owner"
+    and "assignees"; updates leave them unchanged when the key is absent.
+    Consecutive operations of the same kind are applied together with
+    executemany. Returns one result dict per operation, in order.
+    """
+    return _write(_apply_batch, operations)
+
+_ARCHIVED_FIELDS = ("id", "title", "description", "due_date", "priority", "status", "created_at", "position", "owner")
+# Archived rows as JSON: Task.to_dict() plus completedAt/archivedAt (UTC, ISO 8601).
+ARCHIVE_JSON = (
+    "json_object('id', id, 'title', title, 'description', description, 'dueDate', due_date, "
+    "'priority', priority, 'status', status, "
+    "'completed', json(CASE WHEN status = 'completed' THEN 'true' ELSE 'false' END), "
+    "'createdAt', created_at, 'position', position, 'owner', owner, 'assignees', json(assignees), "
+    "'completedAt', strftime('%Y-%m-%dT%H:%M:%SZ', completed_at, 'unixepoch'), "
+    "'archivedAt', strftime('%Y-%m-%dT%H:%M:%SZ', archived_at, 'unixepoch'))"
+)
+
+def _archive_batch(cutoff, batch_size):
+    """Move up to batch_size tasks completed before cutoff in one short write transaction."""
     with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("UPDATE tasks SET completed=? WHERE id=?", (1 if completed else 0, task_id))
-        conn.commit()
-        return cursor.rowcount > 0
+        conn.execute("BEGIN IMMEDIATE")
+        ids = [r[0] for r in conn.execute(
+            "SELECT id FROM tasks WHERE completed_at IS NOT NULL AND completed_at < ? AND status = ? "
+            "ORDER BY completed_at LIMIT ?",
+            (cutoff, COMPLETED, min(batch_size, SQL_PARAM_CHUNK)),
+        )]
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        fields = ", ".join(_ARCHIVED_FIELDS)
+        conn.execute(
+            f"INSERT OR REPLACE INTO tasks_archive ({fields}, assignees, completed_at, archived_at) "
+            f"SELECT {fields}, (SELECT json_group_array(assignee) FROM task_assignees WHERE task_id = tasks.id), "
+            f"completed_at, ? FROM tasks WHERE id IN ({placeholders})",
+            [time.time()] + ids,
+        )
+        conn.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", ids)
+        events = [("archive", task_id) for task_id in ids]
+        _bump_version(conn, events)
+    _after_write(events)
+    return ids
+
+@_timed
+def archive_completed_tasks(older_than_days, batch_size=ARCHIVE_BATCH_SIZE, vacuum=True):
+    """Move tasks completed more than older_than_days ago into tasks_archive.
+
+    Works in batches of batch_size, each its own transaction, pausing
+    between them so the write lock is never held for long. Then frees the
+    emptied pages with incremental_vacuum(). Returns the number archived.
+    """
+    cutoff = time.time() - older_than_days * 86400
+    archived = 0
+    while True:
+        ids = _archive_batch(cutoff, batch_size)
+        archived += len(ids)
+        if len(ids) < min(batch_size, SQL_PARAM_CHUNK):
+            break
+        time.sleep(ARCHIVE_BATCH_PAUSE_SECONDS)
+    if archived:
+        logger.info("Archived %d completed tasks", archived)
+        if vacuum:
+            incremental_vacuum()
+    return archived
+
+@_timed
+def incremental_vacuum(step_pages=VACUUM_STEP_PAGES):
+    """Return free pages to the filesystem, step_pages per transaction.
+
+    Only works when the file uses auto_vacuum=INCREMENTAL (new databases do;
+    see convert_to_incremental_vacuum). Returns the number of pages freed.
+    """
+    freed = 0
+    with get_connection() as conn:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            logger.info("Skipping incremental vacuum: database is not in auto_vacuum=INCREMENTAL mode")
+            return 0
+    while True:
+        with get_connection() as conn:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not before:
+                break
+            # executescript steps the pragma to completion; execute() frees only one page.
+            conn.executescript(f"PRAGMA incremental_vacuum({int(step_pages)})")
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        freed += before - after
+        if after >= before:
+            break
+    with get_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return freed
+
+def convert_to_incremental_vacuum():
+    """Switch an existing database to auto_vacuum=INCREMENTAL.
+
+    Needs a full VACUUM, which rewrites the file under an exclusive lock:
+    run it once, offline or in a quiet period.
+    """
+    with get_connection() as conn:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+@_timed
+def load_archived_page_json(limit, after_id=0, owner=None):
+    """Return up to limit (id, JSON text) archived tasks after after_id, in id order."""
+    clauses = ["id > ?"]
+    params = [after_id]
+    if owner is not None:
+        clauses.append("owner = ?")
+        params.append(owner)
+    params.append(limit)
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"SELECT id, {ARCHIVE_JSON} FROM tasks_archive WHERE " + " AND ".join(clauses) + " ORDER BY id LIMIT ?",
+            params,
+        ).fetchall()
+    return [tuple(r) for r in rows]
+
+@_timed
+def get_archive_stats():
+    with get_connection() as conn:
+        archived = conn.execute("SELECT count(*) FROM tasks_archive").fetchone()[0]
+        pending = conn.execute(
+            "SELECT count(*) FROM tasks WHERE completed_at IS NOT NULL"
+        ).fetchone()[0]
+        free_pages, page_size, pages = (conn.execute(f"PRAGMA {p}").fetchone()[0]
+                                        for p in ("freelist_count", "page_size", "page_count"))
+    return {"archived": archived, "completed_live": pending, "db_bytes": page_size * pages,
+            "free_bytes": page_size * free_pages}
+
+# --- Storage backends ---
+
+# The public functions above that the rest of the app calls. With
+# STORAGE_BACKEND=memory they are replaced by the same methods of a
+# MemoryStore (memory_store.py), so callers keep importing them from here.
+STORAGE_API = (
+    "init_db", "close_connections", "get_tasks_version", "get_task_stats", "load_tasks", "load_tasks_page",
+    "load_tasks_page_json", "load_incomplete_tasks", "iter_digest_groups", "load_tasks_due_between",
+    "load_overdue_tasks", "get_task", "get_tasks_by_ids", "load_upcoming_due_tasks", "get_last_event_id",
+    "load_task_events", "get_sent_reminders", "record_reminder_sent", "get_ledger_entries", "record_deliveries",
+    "record_notifier_run", "load_notifier_runs", "search_tasks", "iter_tasks", "iter_task_json", "insert_tasks",
+    "add_task", "update_task", "delete_task", "mark_task", "move_task", "apply_batch", "archive_completed_tasks",
+    "incremental_vacuum", "convert_to_incremental_vacuum", "load_archived_page_json", "get_archive_stats",
+)
+# Generators and lifecycle calls are not timed, as above.
+_UNTIMED_API = {"init_db", "close_connections", "iter_digest_groups", "iter_tasks", "iter_task_json"}
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite").lower()
+# File prefix of the memory store's snapshot, log and lock; defaults to
+# DB_PATH without its extension. An empty value keeps nothing on disk.
+MEMORY_STORE_PATH = os.getenv("MEMORY_STORE_PATH")
+
+_memory_stores = {}
+_memory_stores_lock = threading.Lock()
+
+def get_memory_store():
+    """Return the memory store for the current DB_PATH, creating it on first use."""
+    store = _memory_stores.get(DB_PATH)
+    if store is None:
+        from server.python.database.memory_store import MemoryStore
+        with _memory_stores_lock:
+            store = _memory_stores.get(DB_PATH)
+            if store is None:
+                path = MEMORY_STORE_PATH if MEMORY_STORE_PATH is not None else os.path.splitext(DB_PATH)[0]
+                store = _memory_stores[DB_PATH] = MemoryStore(path or None, after_write=_after_write)
+    return store
+
+def close_memory_stores():
+    """Snapshot and close every memory store; the next call reopens from disk."""
+    with _memory_stores_lock:
+        stores = list(_memory_stores.values())
+        _memory_stores.clear()
+    for store in stores:
+        store.close()
+
+def _memory_api(name):
+    def call(*args, **kwargs):
+        return getattr(get_memory_store(), name)(*args, **kwargs)
+    call.__name__ = call.__qualname__ = name
+    return call if name in _UNTIMED_API else _timed(call)
+
+if STORAGE_BACKEND == "memory":
+    globals().update({name: _memory_api(name) for name in STORAGE_API})
+    close_connections = close_memory_stores
+elif STORAGE_BACKEND != "sqlite":
+    raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}; expected sqlite or memory")
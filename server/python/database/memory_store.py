@@ -0,0 +1,1026 @@
+"""
+In-memory storage backend: the db_manager storage API served from dicts and
+sorted indexes, for latency-critical single-process deployments and for
+tests and benchmarks.
+
+Every write is appended to a log file before the call returns, and a
+background thread periodically writes a snapshot of the whole state and
+drops the log records it covers. Opening a store loads the snapshot and
+replays the rest of the log, so a restart (or crash) loses nothing that was
+acknowledged. A lock file stops a second process from opening the same
+store: the data lives in one process, so the server must run a single
+worker. Selected with STORAGE_BACKEND=memory (see db_manager).
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from heapq import merge, nsmallest
+try:
+    import fcntl
+except ImportError:  # Windows: a second process is not kept out
+    fcntl = None
+
+from server.python.database.db_manager import (
+    UNCHANGED,
+    OPEN_STATUSES,
+    COMPLETED,
+    POSITION_GAP,
+    TASK_EVENT_RETENTION,
+    NOTIFIER_RUN_RETENTION,
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_BATCH_PAUSE_SECONDS,
+    default_title,
+    summarize_task_counts,
+    _position_between
+)
+from server.python.database.model import Task, Status, get_current_timestamp
+
+logger = logging.getLogger(__name__)
+
+# A snapshot is written this often while there are unsnapshotted writes, and
+# as soon as the log grows past MEMORY_LOG_MAX_BYTES.
+MEMORY_SNAPSHOT_SECONDS = float(os.getenv("MEMORY_SNAPSHOT_SECONDS", 300))
+MEMORY_LOG_MAX_BYTES = int(os.getenv("MEMORY_LOG_MAX_BYTES", 64 * 1024 * 1024))
+# Log records are always handed to the OS before a write returns, which
+# survives a process crash. fsync also survives power loss, at the cost of
+# a disk flush per write.
+MEMORY_LOG_FSYNC = os.getenv("MEMORY_LOG_FSYNC", "false").lower() in ("true", "1", "yes")
+
+SNAPSHOT_FORMAT = 1
+# bm25 parameters, the same defaults as SQLite FTS5.
+BM25_K1 = 1.2
+BM25_B = 0.75
+_TOKEN = re.compile(r"[^\W_]+")
+
+def _tokens(text):
+    """Lower-cased words without diacritics, like the FTS5 unicode61 tokenizer."""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    return _TOKEN.findall("".join(c for c in text if not unicodedata.combining(c)))
+
+def _tail(sorted_list, start):
+    # Indexing jumps straight to start; islice() would step through the skipped items.
+    return (sorted_list[i] for i in range(start, len(sorted_list)))
+
+def _remove(sorted_list, key):
+    index = bisect_left(sorted_list, key)
+    if index < len(sorted_list) and sorted_list[index] == key:
+        del sorted_list[index]
+
+def _restore_entry(mapping, key, value):
+    if value is None:
+        mapping.pop(key, None)
+    else:
+        mapping[key] = value
+
+def _copy(task):
+    # Stored tasks are never modified in place; callers get their own copy.
+    return Task(task.id, task.title, task.description, task.due_date, task.priority, task.status,
+                task.created_at, task.position, task.owner, list(task.assignees))
+
+def _record(task, completed_at):
+    return [task.id, task.title, task.description, task.due_date, task.priority, task.status,
+            task.created_at, task.position, task.owner, task.assignees, completed_at]
+
+def _from_record(record):
+    return Task(*record[:9], assignees=list(record[9])), record[10]
+
+def _iso_utc(timestamp):
+    return None if timestamp is None else time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+def _to_json(data):
+    # Byte-for-byte what SQLite's json_object() produces for the same dict.
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+_stores = weakref.WeakSet()
+
+class MemoryStore:
+    """The db_manager storage API over in-process data structures.
+
+    path is the file prefix for the snapshot (path + ".snapshot"), the log
+    (path + ".log") and the lock file (path + ".lock"); None keeps nothing
+    on disk. after_write(events) is called after every write, outside the
+    store's lock, like db_manager._after_write.
+    """
+
+    def __init__(self, path=None, after_write=None, snapshot_interval=MEMORY_SNAPSHOT_SECONDS,
+                 log_max_bytes=MEMORY_LOG_MAX_BYTES, fsync=MEMORY_LOG_FSYNC):
+        self.path = path
+        self.after_write = after_write or (lambda events: None)
+        self.snapshot_interval = snapshot_interval
+        self.log_max_bytes = log_max_bytes
+        self.fsync = fsync
+        self._init_sync()
+        self._opened = False
+        self._log = None
+        self._lock_file = None
+        self._thread = None
+        self._reset()
+        _stores.add(self)
+
+    def _init_sync(self):
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def _reset(self):
+        self._tasks = {}
+        self._completed_at = {}
+        self._json = {}
+        self._ids = []
+        self._positions = []
+        self._by_status = {}
+        self._by_priority = {}
+        self._by_owner = {}
+        self._by_assignee = {}
+        self._due = []
+        self._counts = {}
+        self._postings = {}
+        self._vocabulary = []
+        self._doc_terms = {}
+        self._doc_length = {}
+        self._total_terms = 0
+        self._archive = {}
+        self._archive_ids = []
+        self._events = []
+        self._last_event_id = 0
+        self._reminders = {}
+        self._ledger = {}
+        self._runs = []
+        self._version = 0
+        self._updated_at = time.time()
+        self._next_id = 1
+        self._lsn = 0
+        self._snapshot_lsn = 0
+        self._pending = []
+        # Inside a write: (func, *args) steps that undo its changes, newest last.
+        self._undo = None
+
+    # --- Opening, persistence and shutdown ---
+
+    def _file(self, suffix):
+        return self.path + suffix
+
+    def init_db(self, force=False):
+        """Open the store: take the lock, load the snapshot and replay the log."""
+        with self._lock:
+            if self._opened:
+                return
+            if self.path is not None:
+                self._acquire_lock_file()
+                try:
+                    self._load()
+                except Exception:
+                    self._release_lock_file()
+                    raise
+                self._thread = threading.Thread(target=self._snapshot_loop, name="memory-store-snapshot",
+                                                daemon=True)
+                self._thread.start()
+            self._opened = True
+
+    _open = init_db
+
+    def _acquire_lock_file(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock_file = open(self._file(".lock"), "a")
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise RuntimeError(f"Memory store {self.path} is already open in another process")
+
+    def _release_lock_file(self):
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _load(self):
+        self._reset()
+        started = time.perf_counter()
+        try:
+            with open(self._file(".snapshot"), encoding="utf-8") as f:
+                self._load_snapshot(json.load(f))
+        except FileNotFoundError:
+            pass
+        replayed = self._replay_log()
+        self._log = open(self._file(".log"), "ab")
+        logger.info("Opened memory store %s: %d tasks, %d log records replayed in %.3fs",
+                    self.path, len(self._tasks), replayed, time.perf_counter() - started)
+
+    def _load_snapshot(self, data):
+        if data.get("format") != SNAPSHOT_FORMAT:
+            raise RuntimeError(f"Unsupported memory store snapshot format: {data.get('format')}")
+        for record in data["tasks"]:
+            self._put(*_from_record(record))
+        for record, archived_at in data["archive"]:
+            task, completed_at = _from_record(record)
+            self._archive[task.id] = (task, completed_at, archived_at)
+            insort(self._archive_ids, task.id)
+        self._events = [tuple(event) for event in data["events"]]
+        self._reminders = {task_id: (due_date, sent_at) for task_id, due_date, sent_at in data["reminders"]}
+        self._ledger = {recipient: (fingerprint, hashes, sent_at)
+                        for recipient, fingerprint, hashes, sent_at in data["ledger"]}
+        self._runs = [tuple(run) for run in data.get("runs", [])]
+        self._version = data["version"]
+        self._updated_at = data["updated_at"]
+        self._next_id = max(self._next_id, data["next_id"])
+        self._last_event_id = data["last_event_id"]
+        self._lsn = self._snapshot_lsn = data["lsn"]
+        self._pending = []
+
+    def _replay_log(self):
+        """Apply log records newer than the snapshot; cut off a torn last line."""
+        try:
+            f = open(self._file(".log"), "rb+")
+        except FileNotFoundError:
+            return 0
+        replayed = 0
+        with f:
+            good_end = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning("Discarding a torn record at the end of %s", self._file(".log"))
+                    f.truncate(good_end)
+                    break
+                good_end += len(line)
+                if entry["lsn"] <= self._lsn:
+                    continue
+                for op in entry["ops"]:
+                    self._apply(op)
+                self._lsn = entry["lsn"]
+                replayed += 1
+        self._pending = []
+        return replayed
+
+    def _apply(self, op):
+        kind = op[0]
+        if kind == "put":
+            self._put(*_from_record(op[1]))
+        elif kind == "drop":
+            self._drop(op[1])
+        elif kind == "rebalance":
+            self._rebalance()
+        elif kind == "archive":
+            self._move_to_archive(op[1], op[2])
+        elif kind == "events":
+            self._log_events(op[1], op[2])
+        elif kind == "reminder":
+            self._set_reminder(*op[1:])
+        elif kind == "ledger":
+            self._set_ledger(*op[1:])
+        elif kind == "run":
+            self._add_run(*op[1:])
+        else:
+            raise RuntimeError(f"Unknown memory store log record: {kind}")
+
+    def _on_rollback(self, *undo):
+        """Inside a write, have a rollback call undo[0](*undo[1:])."""
+        if self._undo is not None:
+            self._undo.append(undo)
+
+    def _restore_task(self, task_id, task, completed_at):
+        current = self._tasks.get(task_id)
+        if current is not None:
+            self._unindex(current)
+        if task is not None:
+            self._index(task, completed_at)
+
+    def _save_task(self, task_id):
+        """Have a failed write put task_id back the way it is now."""
+        self._on_rollback(self._restore_task, task_id, self._tasks.get(task_id), self._completed_at.get(task_id))
+
+    def _rollback(self, next_id, lsn):
+        undo, self._undo = self._undo, None
+        for func, *args in reversed(undo):
+            func(*args)
+        self._next_id = next_id
+        self._lsn = lsn
+        self._pending = []
+
+    def _commit(self, events):
+        """Log the operations of the current write as one record."""
+        if events:
+            self._log_events(events, time.time())
+        if not self._pending:
+            return
+        ops, self._pending = self._pending, []
+        self._lsn += 1
+        if self._log is None:
+            return
+        self._log.write(_to_json({"lsn": self._lsn, "ops": ops}).encode("utf-8") + b"\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        if self._log.tell() > self.log_max_bytes:
+            self._wake.set()
+
+    @contextmanager
+    def _write(self):
+        """Run a write under the lock; the block appends its (op, task_id) events to the yielded list.
+
+        If the block (or logging it) raises, every change it made is undone,
+        like a rolled back SQLite transaction.
+        """
+        events = []
+        with self._lock:
+            self._open()
+            self._undo = []
+            next_id, lsn = self._next_id, self._lsn
+            try:
+                yield events
+                self._commit(events)
+            except BaseException:
+                self._rollback(next_id, lsn)
+                raise
+            self._undo = None
+        if events:
+            self.after_write(events)
+
+    @contextmanager
+    def _read(self):
+        with self._lock:
+            self._open()
+            yield
+
+    def snapshot(self):
+        """Write the whole state to the snapshot file and drop the log records it covers."""
+        if self.path is None:
+            return False
+        with self._snapshot_lock:
+            with self._lock:
+                if not self._opened or self._lsn == self._snapshot_lsn:
+                    return False
+                # Stored objects are never modified, so shallow copies are a
+                # consistent view that can be encoded outside the lock.
+                lsn, tasks, completed_at = self._lsn, dict(self._tasks), dict(self._completed_at)
+                state = {
+                    "format": SNAPSHOT_FORMAT, "lsn": lsn, "version": self._version,
+                    "updated_at": self._updated_at, "next_id": self._next_id,
+                    "last_event_id": self._last_event_id, "events": list(self._events),
+                    "archive": [[_record(task, done), archived_at]
+                                for task, done, archived_at in self._archive.values()],
+                    "reminders": [[task_id, due_date, sent_at]
+                                  for task_id, (due_date, sent_at) in self._reminders.items()],
+                    "ledger": [[recipient, *entry] for recipient, entry in self._ledger.items()],
+                    "runs": list(self._runs),
+                }
+                log_offset = self._log.tell()
+            state["tasks"] = [_record(task, completed_at.get(task_id)) for task_id, task in tasks.items()]
+
+            tmp = self._file(".snapshot.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._file(".snapshot"))
+
+            with self._lock:
+                # Keep only the records written while the snapshot was encoded.
+                self._log.close()
+                with open(self._file(".log"), "rb") as f:
+                    f.seek(log_offset)
+                    tail = f.read()
+                with open(self._file(".log.tmp"), "wb") as f:
+                    f.write(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(self._file(".log.tmp"), self._file(".log"))
+                self._log = open(self._file(".log"), "ab")
+                self._snapshot_lsn = lsn
+        logger.info("Wrote memory store snapshot %s at lsn %d", self.path, lsn)
+        return True
+
+    def _snapshot_loop(self):
+        while True:
+            self._wake.wait(self.snapshot_interval)
+            self._wake.clear()
+            if not self._opened:
+                return
+            try:
+                self.snapshot()
+            except Exception:
+                logger.exception("Memory store snapshot failed")
+
+    def close(self):
+        """Snapshot, then release the files; the next call reopens the store from disk."""
+        with self._lock:
+            if not self._opened:
+                return
+        if self.path is not None:
+            self.snapshot()
+        with self._lock:
+            self._opened = False
+            self._wake.set()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            self._release_lock_file()
+            self._reset()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    close_connections = close
+
+    def _abandon_after_fork(self):
+        # The parent still owns the files and the flock; only drop this
+        # process's copies (an explicit unlock would release the parent's).
+        self._init_sync()
+        for handle in (self._log, self._lock_file):
+            if handle is not None:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+        self._log = self._lock_file = self._thread = None
+        self._opened = False
+        self._reset()
+
+    # --- Indexes ---
+
+    def _index(self, task, completed_at, text=True):
+        task_id = task.id
+        self._tasks[task_id] = task
+        if completed_at is not None:
+            self._completed_at[task_id] = completed_at
+        insort(self._ids, task_id)
+        insort(self._positions, (task.position, task_id))
+        insort(self._by_status.setdefault(task.status, []), task_id)
+        insort(self._by_priority.setdefault(task.priority, []), task_id)
+        if task.owner is not None:
+            insort(self._by_owner.setdefault(task.owner, []), task_id)
+        for assignee in task.assignees:
+            insort(self._by_assignee.setdefault(assignee, []), task_id)
+        if task.due_date is not None and task.status in OPEN_STATUSES:
+            insort(self._due, (task.due_date, task_id))
+        key = (task.priority, task.status)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        if not text:
+            return
+        terms = {}
+        for token in _tokens(task.title) + _tokens(task.description):
+            terms[token] = terms.get(token, 0) + 1
+        for token, count in terms.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[task_id] = count
+        self._doc_terms[task_id] = terms
+        self._doc_length[task_id] = length = sum(terms.values())
+        self._total_terms += length
+
+    def _unindex(self, task, text=True):
+        task_id = task.id
+        del self._tasks[task_id]
+        self._completed_at.pop(task_id, None)
+        self._json.pop(task_id, None)
+        _remove(self._ids, task_id)
+        _remove(self._positions, (task.position, task_id))
+        _remove(self._by_status[task.status], task_id)
+        _remove(self._by_priority[task.priority], task_id)
+        if task.owner is not None:
+            _remove(self._by_owner[task.owner], task_id)
+        for assignee in task.assignees:
+            _remove(self._by_assignee[assignee], task_id)
+        if task.due_date is not None and task.status in OPEN_STATUSES:
+            _remove(self._due, (task.due_date, task_id))
+        self._counts[(task.priority, task.status)] -= 1
+        if not text:
+            return
+        terms = self._doc_terms.pop(task_id)
+        for token in terms:
+            postings = self._postings[token]
+            del postings[task_id]
+            if not postings:
+                del self._postings[token]
+                _remove(self._vocabulary, token)
+        self._total_terms -= self._doc_length.pop(task_id)
+
+    def _put(self, task, completed_at):
+        """Insert or replace a task (with its completed_at) and log it."""
+        self._save_task(task.id)
+        old = self._tasks.get(task.id)
+        # The search postings only depend on the text; keep them when it is unchanged.
+        text = old is None or (old.title, old.description) != (task.title, task.description)
+        if old is not None:
+            self._unindex(old, text)
+        self._index(task, completed_at, text)
+        self._next_id = max(self._next_id, task.id + 1)
+        self._pending.append(["put", _record(task, completed_at)])
+
+    def _drop(self, task_id):
+        self._save_task(task_id)
+        self._unindex(self._tasks[task_id])
+        self._pending.append(["drop", task_id])
+
+    def _change(self, task, **changes):
+        """Store a copy of task with changes applied; completed_at follows status like the SQLite triggers."""
+        completed_at = self._completed_at.get(task.id)
+        status = changes.get("status", task.status)
+        if status != task.status:
+            completed_at = time.time() if status == COMPLETED else None
+        fields = {name: getattr(task, name) for name in
+                  ("id", "title", "description", "due_date", "priority", "status", "created_at",
+                   "position", "owner", "assignees")}
+        fields.update(changes)
+        self._put(Task(**fields), completed_at)
+
+    def _log_events(self, events, now):
+        first = self._last_event_id + 1
+        self._events.extend((first + i, op, task_id) for i, (op, task_id) in enumerate(events))
+        trimmed = self._events[:max(0, len(self._events) - TASK_EVENT_RETENTION)]
+        del self._events[:len(trimmed)]
+        self._on_rollback(self._unlog_events, len(events), trimmed, self._last_event_id,
+                          self._version, self._updated_at)
+        self._last_event_id += len(events)
+        self._version += 1
+        self._updated_at = now
+        self._pending.append(["events", [list(event) for event in events], now])
+
+    def _unlog_events(self, count, trimmed, last_event_id, version, updated_at):
+        del self._events[len(self._events) - count:]
+        self._events[:0] = trimmed
+        self._last_event_id, self._version, self._updated_at = last_event_id, version, updated_at
+
+    def _next_position(self):
+        return (self._positions[-1][0] if self._positions else 0) + POSITION_GAP
+
+    def _new_task(self, task, completed_at=None):
+        """Give task the next id and the last position, and store it."""
+        task.id = self._next_id
+        task.position = self._next_position()
+        self._put(task, completed_at if task.status == COMPLETED else None)
+        return task.id
+
+    def _task_json(self, task_id):
+        text = self._json.get(task_id)
+        if text is None:
+            text = self._json[task_id] = _to_json(self._tasks[task_id].to_dict())
+        return text
+
+    # --- Reads ---
+
+    def get_tasks_version(self):
+        with self._read():
+            return self._version, self._updated_at
+
+    def get_task_stats(self):
+        with self._read():
+            return summarize_task_counts(self._counts)
+
+    def load_tasks(self):
+        with self._read():
+            return [_copy(self._tasks[task_id]) for _, task_id in self._positions]
+
+    def _candidates(self, after_id, statuses, priority, owner, assignee):
+        """Ids after after_id in id order, from the smallest index that covers a filter."""
+        options = [[self._ids]]
+        if statuses is not None:
+            options.append([self._by_status.get(status, []) for status in statuses])
+        if priority is not None:
+            options.append([self._by_priority.get(priority, [])])
+        if owner is not None:
+            options.append([self._by_owner.get(owner, [])])
+        if assignee is not None:
+            options.append([self._by_assignee.get(assignee, [])])
+        lists = min(options, key=lambda lists: sum(map(len, lists)))
+        tails = [_tail(ids, bisect_right(ids, after_id)) for ids in lists]
+        return tails[0] if len(tails) == 1 else merge(*tails)
+
+    def _page(self, limit, after_id, completed, priority, status, order, owner, assignee, after_position):
+        if status is not None:
+            statuses = (status,)
+        elif completed is True:
+            statuses = (COMPLETED,)
+        elif completed is False:
+            statuses = OPEN_STATUSES
+        else:
+            statuses = None
+        if order == "position":
+            start = 0 if after_position is None else bisect_right(self._positions, (after_position, after_id))
+            ids = (task_id for _, task_id in _tail(self._positions, start))
+        else:
+            ids = self._candidates(after_id, statuses, priority, owner, assignee)
+        page = []
+        for task_id in ids:
+            task = self._tasks[task_id]
+            if ((statuses is None or task.status in statuses)
+                    and (priority is None or task.priority == priority)
+                    and (owner is None or task.owner == owner)
+                    and (assignee is None or assignee in task.assignees)):
+                page.append(task)
+                if len(page) >= limit:
+                    break
+        return page
+
+    def load_tasks_page(self, limit, after_id=0, completed=None, priority=None, status=None, order="id",
+                        owner=None, assignee=None, after_position=None):
+        with self._read():
+            return [_copy(t) for t in self._page(limit, after_id, completed, priority, status, order,
+                                                 owner, assignee, after_position)]
+
+    def load_tasks_page_json(self, limit, after_id=0, completed=None, priority=None, status=None, order="id",
+                             owner=None, assignee=None, after_position=None):
+        with self._read():
+            return [(t.id, self._task_json(t.id)) for t in self._page(limit, after_id, completed, priority, status,
+                                                                      order, owner, assignee, after_position)]
+
+    def load_incomplete_tasks(self):
+        with self._read():
+            return [_copy(self._tasks[task_id]) for task_id in self._candidates(0, OPEN_STATUSES, None, None, None)]
+
+    def iter_digest_groups(self, batch_size=1000):
+        with self._read():
+            shared = []
+            by_recipient = {}
+            for task_id in self._candidates(0, OPEN_STATUSES, None, None, None):
+                task = self._tasks[task_id]
+                recipients = set(task.assignees)
+                if task.owner is not None:
+                    recipients.add(task.owner)
+                if not recipients:
+                    shared.append(_copy(task))
+                for recipient in recipients:
+                    by_recipient.setdefault(recipient, []).append(task)
+            groups = [(recipient, [_copy(t) for t in by_recipient[recipient]]) for recipient in sorted(by_recipient)]
+        if shared:
+            yield None, shared
+        yield from groups
+
+    def load_tasks_due_between(self, start, end, limit=None):
+        with self._read():
+            first = bisect_left(self._due, (start,)) if start is not None else 0
+            last = bisect_left(self._due, (end,)) if end is not None else len(self._due)
+            if limit is not None:
+                last = min(last, first + limit)
+            return [_copy(self._tasks[task_id]) for _, task_id in self._due[first:last]]
+
+    def load_overdue_tasks(self, now, limit=None):
+        return self.load_tasks_due_between(None, now, limit)
+
+    def load_upcoming_due_tasks(self, due_after):
+        return self.load_tasks_due_between(due_after, None)
+
+    def get_task(self, task_id):
+        with self._read():
+            task = self._tasks.get(task_id)
+            return _copy(task) if task else None
+
+    def get_tasks_by_ids(self, task_ids):
+        with self._read():
+            return {task_id: _copy(self._tasks[task_id]) for task_id in task_ids if task_id in self._tasks}
+
+    def get_last_event_id(self):
+        with self._read():
+            return self._last_event_id
+
+    def load_task_events(self, after_id, limit=500):
+        with self._read():
+            if not self._events:
+                return []
+            start = max(0, after_id - self._events[0][0] + 1)
+            return list(self._events[start:start + limit])
+
+    def search_tasks(self, text, limit, offset=0):
+        """(task, score) pairs with every term of text as a word prefix, best bm25 score first."""
+        with self._read():
+            terms = _tokens(text)
+            if not terms or not self._tasks:
+                return []
+            total = len(self._tasks)
+            average_length = self._total_terms / total or 1
+            scores = None
+            for term in terms:
+                frequencies = {}
+                first = bisect_left(self._vocabulary, term)
+                for token in _tail(self._vocabulary, first):
+                    if not token.startswith(term):
+                        break
+                    for task_id, count in self._postings[token].items():
+                        if scores is None or task_id in scores:
+                            frequencies[task_id] = frequencies.get(task_id, 0) + count
+                if not frequencies:
+                    return []
+                idf = max(math.log((total - len(frequencies) + 0.5) / (len(frequencies) + 0.5)), 1e-6)
+                norm = BM25_K1 * (1 - BM25_B)
+                scale = BM25_K1 * BM25_B / average_length
+                lengths = self._doc_length
+                term_scores = {task_id: idf * count * (BM25_K1 + 1) / (count + norm + scale * lengths[task_id])
+                               for task_id, count in frequencies.items()}
+                if scores is not None:
+                    term_scores = {task_id: score + scores[task_id] for task_id, score in term_scores.items()}
+                scores = term_scores
+            ranked = nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))[offset:]
+            return [(_copy(self._tasks[task_id]), score) for task_id, score in ranked]
+
+    def iter_tasks(self, batch_size=1000):
+        with self._read():
+            ids = list(self._ids)
+        for start in range(0, len(ids), batch_size):
+            with self._read():
+                batch = [_copy(self._tasks[task_id]) for task_id in ids[start:start + batch_size]
+                         if task_id in self._tasks]
+            yield from batch
+
+    def iter_task_json(self, batch_size=1000):
+        with self._read():
+            ids = list(self._ids)
+        for start in range(0, len(ids), batch_size):
+            with self._read():
+                batch = [self._task_json(task_id) for task_id in ids[start:start + batch_size]
+                         if task_id in self._tasks]
+            if batch:
+                yield batch
+
+    def get_sent_reminders(self, task_ids):
+        with self._read():
+            return {task_id: self._reminders[task_id][0] for task_id in task_ids if task_id in self._reminders}
+
+    def get_ledger_entries(self, recipients):
+        with self._read():
+            return {
+                recipient: {"fingerprint": entry[0], "task_hashes": json.loads(entry[1]), "sent_at": entry[2]}
+                for recipient in recipients
+                for entry in [self._ledger.get(recipient)] if entry is not None
+            }
+
+    # --- Writes ---
+
+    def insert_tasks(self, tasks, keep_ids=False):
+        tasks = list(tasks)
+        if not tasks:
+            return 0
+        now = get_current_timestamp()
+        with self._write() as events:
+            for t in tasks:
+                task = Task(t.id, t.title, t.description, t.due_date, t.priority, t.status, t.created_at or now,
+                            None, t.owner, sorted(set(t.assignees)))
+                existing = self._tasks.get(t.id) if keep_ids else None
+                if existing is not None:
+                    self._change(existing, title=task.title, description=task.description, due_date=task.due_date,
+                                 priority=task.priority, status=task.status, created_at=task.created_at,
+                                 owner=task.owner, assignees=task.assignees)
+                elif keep_ids and t.id is not None:
+                    task.position = self._next_position()
+                    self._put(task, time.time() if task.status == COMPLETED else None)
+                else:
+                    self._new_task(task, time.time())
+            events.append(("import", None))
+        return len(tasks)
+
+    def add_task(self, description, priority="medium", due_date=None, title=None, owner=None, assignees=()):
+        with self._write() as events:
+            task_id = self._new_task(Task(
+                title=title or default_title(description), description=description, due_date=due_date,
+                priority=priority, created_at=get_current_timestamp(), owner=owner,
+                assignees=sorted(set(assignees)),
+            ))
+            events.append(("create", task_id))
+        return task_id
+
+    def update_task(self, task_id, description, priority, due_date=None, title=None, owner=UNCHANGED,
+                    assignees=UNCHANGED):
+        with self._write() as events:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return False
+            changes = {"title": title or default_title(description), "description": description,
+                       "priority": priority, "due_date": due_date}
+            if owner is not UNCHANGED:
+                changes["owner"] = owner
+            if assignees is not UNCHANGED:
+                changes["assignees"] = sorted(set(assignees))
+            self._change(task, **changes)
+            events.append(("update", task_id))
+        return True
+
+    def delete_task(self, task_id):
+        with self._write() as events:
+            if task_id not in self._tasks:
+                return False
+            self._drop(task_id)
+            events.append(("delete", task_id))
+        return True
+
+    def mark_task(self, task_id, completed):
+        with self._write() as events:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return False
+            self._change(task, status=COMPLETED if completed else Status.PENDING.value)
+            events.append(("complete" if completed else "incomplete", task_id))
+        return True
+
+    def _rebalance(self):
+        order = [task_id for _, task_id in self._positions]
+        for n, task_id in enumerate(order, start=1):
+            task = self._tasks[task_id]
+            if task.position != n * POSITION_GAP:
+                self._save_task(task_id)
+                self._unindex(task)
+                self._index(Task(task.id, task.title, task.description, task.due_date, task.priority,
+                                 task.status, task.created_at, n * POSITION_GAP, task.owner, task.assignees),
+                            self._completed_at.get(task_id))
+        self._pending.append(["rebalance"])
+        logger.info("Rebalanced task positions")
+
+    def move_task(self, task_id, after_id=None):
+        with self._write() as events:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            moved = [("move", task_id)]
+            for attempt in range(2):
+                task = self._tasks[task_id]
+                if after_id is None:
+                    before = None
+                    following = (key for key in self._positions if key[1] != task_id)
+                else:
+                    anchor = self._tasks.get(after_id)
+                    if anchor is None:
+                        return None
+                    before = anchor.position
+                    start = bisect_right(self._positions, (before, after_id))
+                    following = (key for key in _tail(self._positions, start) if key[1] != task_id)
+                after = next(following, None)
+                position = _position_between(before, after[0] if after else None)
+                if position is not None:
+                    break
+                self._rebalance()
+                moved = [("move", None)]
+            self._change(self._tasks[task_id], position=position)
+            events.extend(moved)
+        return position
+
+    def apply_batch(self, operations):
+        results = [None] * len(operations)
+        with self._write() as events:
+            for index, item in enumerate(operations):
+                op = item["op"]
+                if op == "create":
+                    task_id = self._new_task(Task(
+                        title=item.get("title") or default_title(item["description"]),
+                        description=item["description"], due_date=item.get("due_date"),
+                        priority=item["priority"], created_at=get_current_timestamp(), owner=item.get("owner"),
+                        assignees=sorted(set(item.get("assignees", ()))),
+                    ))
+                    results[index] = {"op": op, "status": "success", "task_id": task_id}
+                    events.append((op, task_id))
+                    continue
+                task_id = item["id"]
+                task = self._tasks.get(task_id)
+                if task is None:
+                    results[index] = {"op": op, "id": task_id, "status": "error", "message": "Task not found"}
+                    continue
+                if op == "update":
+                    changes = {"title": item.get("title") or default_title(item["description"]),
+                               "description": item["description"], "priority": item["priority"],
+                               "due_date": item.get("due_date")}
+                    if "owner" in item:
+                        changes["owner"] = item["owner"]
+                    if "assignees" in item:
+                        changes["assignees"] = sorted(set(item["assignees"]))
+                    self._change(task, **changes)
+                elif op in ("complete", "incomplete"):
+                    self._change(task, status=COMPLETED if op == "complete" else Status.PENDING.value)
+                else:
+                    self._drop(task_id)
+                results[index] = {"op": op, "id": task_id, "status": "success"}
+                events.append((op, task_id))
+        return results
+
+    def _set_reminder(self, task_id, due_date, sent_at):
+        self._on_rollback(_restore_entry, self._reminders, task_id, self._reminders.get(task_id))
+        self._reminders[task_id] = (due_date, sent_at)
+        self._pending.append(["reminder", task_id, due_date, sent_at])
+
+    def record_reminder_sent(self, task_id, due_date):
+        with self._write():
+            self._set_reminder(task_id, due_date, time.time())
+
+    def _set_ledger(self, recipient, fingerprint, hashes, sent_at):
+        self._on_rollback(_restore_entry, self._ledger, recipient, self._ledger.get(recipient))
+        self._ledger[recipient] = (fingerprint, hashes, sent_at)
+        self._pending.append(["ledger", recipient, fingerprint, hashes, sent_at])
+
+    def record_deliveries(self, deliveries):
+        now = time.time()
+        with self._write():
+            for recipient, fingerprint, hashes in deliveries:
+                # Stored as JSON text, so readers get what the SQLite ledger returns.
+                self._set_ledger(recipient, fingerprint, json.dumps(hashes), now)
+
+    def _add_run(self, run_id, kind, started_at, duration, ok, detail):
+        self._on_rollback(setattr, self, "_runs", list(self._runs))
+        self._runs.append((run_id, kind, started_at, duration, ok, detail))
+        if len(self._runs) > NOTIFIER_RUN_RETENTION:
+            del self._runs[:len(self._runs) - NOTIFIER_RUN_RETENTION]
+        self._pending.append(["run", run_id, kind, started_at, duration, ok, detail])
+
+    def record_notifier_run(self, kind, started_at, duration, ok, detail=""):
+        with self._write():
+            run_id = self._runs[-1][0] + 1 if self._runs else 1
+            self._add_run(run_id, kind, started_at, duration, bool(ok), detail)
+
+    def load_notifier_runs(self, limit=50, kind=None):
+        with self._read():
+            runs = [run for run in reversed(self._runs) if kind is None or run[1] == kind][:limit]
+        return [{"id": run_id, "kind": run_kind, "started_at": started_at, "duration": duration, "ok": ok,
+                 "detail": detail} for run_id, run_kind, started_at, duration, ok, detail in runs]
+
+    # --- Archive ---
+
+    def _move_to_archive(self, task_id, archived_at):
+        self._save_task(task_id)
+        self._on_rollback(self._unarchive, task_id)
+        task = self._tasks[task_id]
+        completed_at = self._completed_at.get(task_id)
+        self._unindex(task)
+        self._archive[task_id] = (task, completed_at, archived_at)
+        insort(self._archive_ids, task_id)
+        self._pending.append(["archive", task_id, archived_at])
+
+    def _unarchive(self, task_id):
+        del self._archive[task_id]
+        _remove(self._archive_ids, task_id)
+
+    def archive_completed_tasks(self, older_than_days, batch_size=ARCHIVE_BATCH_SIZE, vacuum=True):
+        cutoff = time.time() - older_than_days * 86400
+        archived = 0
+        while True:
+            with self._write() as events:
+                due = sorted((done, task_id) for task_id, done in self._completed_at.items()
+                             if done < cutoff and self._tasks[task_id].status == COMPLETED)[:batch_size]
+                now = time.time()
+                for _, task_id in due:
+                    self._move_to_archive(task_id, now)
+                    events.append(("archive", task_id))
+            archived += len(due)
+            if len(due) < batch_size:
+                break
+            time.sleep(ARCHIVE_BATCH_PAUSE_SECONDS)
+        if archived:
+            logger.info("Archived %d completed tasks", archived)
+            if vacuum:
+                self.incremental_vacuum()
+        return archived
+
+    def incremental_vacuum(self, step_pages=None):
+        """Compact the log into a snapshot; there are no free pages to return."""
+        with self._read():
+            pass
+        self.snapshot()
+        return 0
+
+    def convert_to_incremental_vacuum(self):
+        return True
+
+    def load_archived_page_json(self, limit, after_id=0, owner=None):
+        with self._read():
+            rows = []
+            for task_id in _tail(self._archive_ids, bisect_right(self._archive_ids, after_id)):
+                task, completed_at, archived_at = self._archive[task_id]
+                if owner is not None and task.owner != owner:
+                    continue
+                data = task.to_dict()
+                data["completedAt"] = _iso_utc(completed_at)
+                data["archivedAt"] = _iso_utc(archived_at)
+                rows.append((task_id, _to_json(data)))
+                if len(rows) >= limit:
+                    break
+            return rows
+
+    def get_archive_stats(self):
+        with self._read():
+            on_disk = 0
+            if self.path is not None:
+                for suffix in (".snapshot", ".log"):
+                    try:
+                        on_disk += os.path.getsize(self._file(suffix))
+                    except OSError:
+                        pass
+            return {"archived": len(self._archive), "completed_live": len(self._completed_at),
+                    "db_bytes": on_disk, "free_bytes": 0}
+
+def _after_fork_in_child():
+    for store in list(_stores):
+        store._abandon_after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -2,8 +2,8 @@
 Database models and schema definitions for Task Reminder System.
 """
 
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, date
 from typing import Optional, List
 from enum import Enum
 
@@ -19,6 +19,9 @@ class Status(Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
 
+# Joins assignee addresses in the single "assignees" column of task queries.
+ASSIGNEE_SEPARATOR = "\x1f"
+
 @dataclass
 class Task:
     """Task model representing a single task."""
@@ -29,6 +32,13 @@ class Task:
     priority: str = "medium"
     status: str = "pending"
     created_at: str = ""
+    position: Optional[int] = None
+    owner: Optional[str] = None
+    assignees: List[str] = field(default_factory=list)
+
+    @property
+    def completed(self) -> bool:
+        return self.status == Status.COMPLETED.value
 
     def to_dict(self) -> dict:
         """Convert task to dictionary."""
@@ -39,7 +49,11 @@ class Task:
             'dueDate': self.due_date,
             'priority': self.priority,
             'status': self.status,
-            'createdAt': self.created_at
+            'completed': self.completed,
+            'createdAt': self.created_at,
+            'position': self.position,
+            'owner': self.owner,
+            'assignees': self.assignees
         }
     
     @classmethod
@@ -64,7 +78,9 @@ class Task:
             due_date=data.get('dueDate'),
             priority=priority,
             status=status,
-            created_at=data.get('createdAt', '')
+            created_at=data.get('createdAt', ''),
+            owner=data.get('owner'),
+            assignees=list(data.get('assignees') or [])
         )
     
     @classmethod
@@ -85,28 +101,109 @@ class Task:
             due_date=row['due_date'],
             priority=priority,
             status=status,
-            created_at=row['created_at']
+            created_at=row['created_at'],
+            position=row['position'],
+            owner=row['owner'],
+            assignees=sorted(row['assignees'].split(ASSIGNEE_SEPARATOR)) if row['assignees'] else []
         )
 
 class TaskSchema:
     """Database schema definitions."""
     
+    VERSION = 5
+
+    # Spacing between drag-and-drop sort keys; a move takes the midpoint of
+    # its neighbours, so about 16 moves fit between two keys before a rebalance.
+    POSITION_GAP = 65536
+
+    # Statuses that still need attention; "completed" is the only closed one.
+    OPEN_STATUSES = (Status.PENDING.value, Status.IN_PROGRESS.value)
+
+    MAX_ASSIGNEES = 50
+
     CREATE_TASKS_TABLE = '''
-        CREATE TABLE IF NOT EXISTS tasks (
+        CREATE TABLE IF NOT EXISTS {table} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             title TEXT NOT NULL,
             description TEXT,
             due_date TEXT,
             priority TEXT NOT NULL CHECK(priority IN ('low','medium','high')) DEFAULT 'medium',
             status TEXT NOT NULL CHECK(status IN ('pending','in_progress','completed')) DEFAULT 'pending',
-            created_at TEXT NOT NULL
+            created_at TEXT NOT NULL,
+            position INTEGER,
+            owner TEXT,
+            completed_at REAL
         )
     '''
+
+    # Rows go away with their task through the tasks_assignees_ad trigger.
+    CREATE_TASK_ASSIGNEES_TABLE = '''
+        CREATE TABLE IF NOT EXISTS task_assignees (
+            task_id INTEGER NOT NULL,
+            assignee TEXT NOT NULL,
+            PRIMARY KEY (task_id, assignee)
+        ) WITHOUT ROWID
+    '''
     
+    # Live task counts per (priority, status), kept by triggers on tasks so
+    # totals never need a table scan. Every pair has a row, seeded at init.
+    CREATE_TASK_COUNTS_TABLE = '''
+        CREATE TABLE IF NOT EXISTS task_counts (
+            priority TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (priority, status)
+        ) WITHOUT ROWID
+    '''
+
+    # Completed tasks moved out of tasks by the archiver. assignees is a JSON
+    # array, since task_assignees only holds live tasks.
+    CREATE_TASKS_ARCHIVE_TABLE = '''
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            due_date TEXT,
+            priority TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            position INTEGER,
+            owner TEXT,
+            assignees TEXT NOT NULL DEFAULT '[]',
+            completed_at REAL,
+            archived_at REAL NOT NULL
+        )
+    '''
+
+    # Trailing id columns let keyset pages walk each filter in id order.
+    CREATE_TASKS_INDEXES = [
+        'CREATE INDEX IF NOT EXISTS idx_tasks_status_id ON tasks (status, id)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_priority_id ON tasks (priority, id)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_priority_status ON tasks (priority, status, id)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks (status, due_date)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_position ON tasks (position, id)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_owner ON tasks (owner, id)',
+        'CREATE INDEX IF NOT EXISTS idx_task_assignees_assignee ON task_assignees (assignee, task_id)',
+        # Only completed rows carry completed_at, so this stays as small as the archive backlog.
+        'CREATE INDEX IF NOT EXISTS idx_tasks_completed_at ON tasks (completed_at) WHERE completed_at IS NOT NULL',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_archive_owner ON tasks_archive (owner, id)',
+    ]
+
+    @classmethod
+    def create_tasks_table(cls, table: str = 'tasks') -> str:
+        """CREATE TABLE statement for the tasks schema under the given name."""
+        return cls.CREATE_TASKS_TABLE.format(table=table)
+
     @classmethod
     def get_all_schemas(cls) -> List[str]:
         """Get all CREATE TABLE statements."""
-        return [cls.CREATE_TASKS_TABLE]
+        return [cls.create_tasks_table(), cls.CREATE_TASK_ASSIGNEES_TABLE, cls.CREATE_TASK_COUNTS_TABLE,
+                cls.CREATE_TASKS_ARCHIVE_TABLE]
+
+    @classmethod
+    def get_all_indexes(cls) -> List[str]:
+        """Get all CREATE INDEX statements."""
+        return list(cls.CREATE_TASKS_INDEXES)
 
 # Utility functions
 def format_datetime(dt: datetime) -> str:
@@ -149,3 +246,60 @@ def validate_task_title(title: str) -> tuple[bool, str]:
     if len(title.strip()) > 100:
         return False, "Task title must be less than 100 characters"
     return True, ""
+
+
+def normalize_due_date(value) -> Optional[str]:
+    """
+    Return due_date as 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM', or None if empty.
+    Raises ValueError for anything that is not an ISO 8601 date or datetime.
+    """
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        raise ValueError("Due date must be an ISO 8601 string")
+    value = value.strip()
+    if len(value) == 10:
+        return date.fromisoformat(value).isoformat()
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt.isoformat(timespec='minutes')
+
+def normalize_email(value) -> Optional[str]:
+    """
+    Return a trimmed email address, or None if empty.
+    Raises ValueError for anything that does not look like an address.
+    """
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        raise ValueError("Email address must be a string")
+    value = value.strip()
+    local, at, domain = value.rpartition('@')
+    if not at or not local or '.' not in domain or len(value) > 254 or any(c.isspace() for c in value):
+        raise ValueError(f"Invalid email address: {value}")
+    return value
+
+def normalize_assignees(value) -> List[str]:
+    """
+    Return a de-duplicated list of assignee addresses, in the given order.
+    Raises ValueError if value is not a list of addresses or is too long.
+    """
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError("Assignees must be a list of email addresses")
+    assignees = []
+    for item in value:
+        email = normalize_email(item)
+        if email and email not in assignees:
+            assignees.append(email)
+    if len(assignees) > TaskSchema.MAX_ASSIGNEES:
+        raise ValueError(f"A task can have at most {TaskSchema.MAX_ASSIGNEES} assignees")
+    return assignees
+
+def due_datetime(due_date: str, day_start_hour: int = 9) -> datetime:
+    """Parse a normalized due date; date-only values fall due at day_start_hour."""
+    if len(due_date) == 10:
+        return datetime.combine(date.fromisoformat(due_date), datetime.min.time()).replace(hour=day_start_hour)
+    return datetime.fromisoformat(due_date)
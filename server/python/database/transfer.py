@@ -0,0 +1,235 @@
+"""
+Streaming NDJSON export and bulk import of tasks.
+
+Import accepts NDJSON (one object per line) as well as the legacy
+server/data/tasks.json array format, parsed incrementally in both cases.
+
+Usage:
+    python -m server.python.database.transfer export [FILE]
+    python -m server.python.database.transfer import FILE [--keep-ids]
+"""
+
+import argparse
+import codecs
+import itertools
+import json
+import sys
+
+from server.python.database.db_manager import init_db, iter_task_json, insert_tasks, default_title
+from server.python.database.model import (
+    Task,
+    validate_task_description,
+    validate_task_title,
+    validate_priority,
+    validate_status,
+    normalize_due_date,
+    normalize_email,
+    normalize_assignees
+)
+
+READ_CHUNK_SIZE = 64 * 1024
+# Longest single record accepted; a longer NDJSON line is skipped as invalid,
+# and a JSON array element still incomplete after this many characters aborts.
+MAX_RECORD_SIZE = 1024 * 1024
+IMPORT_BATCH_SIZE = 5000
+_decoder = json.JSONDecoder()
+_SEPARATORS = " \t\r\n,[]"
+# Yielded by iter_json_objects in place of a record that is not valid JSON.
+MALFORMED = object()
+
+class ImportAborted(ValueError):
+    """The input stopped being parseable; result holds what was imported before that."""
+
+    def __init__(self, message, result):
+        super().__init__(message)
+        self.result = result
+
+def export_ndjson(batch_size=1000):
+    """Yield NDJSON in chunks of batch_size lines, encoded by SQLite straight from the cursor."""
+    for lines in iter_task_json(batch_size):
+        yield "\n".join(lines) + "\n"
+
+def _chunks(read, chunk_size):
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        chunk = read(chunk_size)
+        if isinstance(chunk, bytes):
+            chunk = utf8.decode(chunk, final=not chunk)
+        if not chunk:
+            return
+        yield chunk
+
+def iter_json_objects(read, chunk_size=READ_CHUNK_SIZE):
+    """Yield top-level values from NDJSON or a JSON array.
+
+    read(n) returns the next str or bytes chunk ('' / b'' at EOF). Only the
+    current chunk plus at most one record of up to MAX_RECORD_SIZE is held
+    in memory. An NDJSON line that is not valid JSON (or is too long) is
+    yielded as MALFORMED and parsing goes on with the next line. A JSON
+    array has no such resync point, so a bad element raises ValueError.
+    """
+    chunks = _chunks(read, chunk_size)
+    buffer = ""
+    for chunk in chunks:
+        buffer = chunk.lstrip()
+        if buffer:
+            break
+    if buffer.startswith("["):
+        yield from _iter_array(buffer, chunks)
+    elif buffer:
+        yield from _iter_lines(buffer, chunks)
+
+def _iter_lines(buffer, chunks):
+    skipping = False  # inside an over-long line, dropping input up to its newline
+    for chunk in itertools.chain([""], chunks):
+        buffer += chunk
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line) if len(line) <= MAX_RECORD_SIZE else MALFORMED
+            except ValueError:
+                yield MALFORMED
+        if len(buffer) > MAX_RECORD_SIZE:
+            if not skipping:
+                yield MALFORMED
+            skipping = True
+            buffer = ""
+    if buffer.strip() and not skipping:
+        try:
+            yield json.loads(buffer)
+        except ValueError:
+            yield MALFORMED
+
+def _iter_array(buffer, chunks):
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+            pos += 1
+        if pos < len(buffer):
+            try:
+                obj, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # Usually an element split across chunks; read more, up to the cap.
+                if eof or len(buffer) - pos > MAX_RECORD_SIZE:
+                    raise ValueError(f"Malformed JSON array element: {e.msg}") from None
+            else:
+                yield obj
+                pos = end
+                continue
+        elif eof:
+            return
+        chunk = next(chunks, "")
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+def normalize_task(obj):
+    """Map an NDJSON, API-shaped or legacy tasks.json record to a Task, or None."""
+    description = obj.get("description")
+    if not isinstance(description, str) or not validate_task_description(description):
+        return None
+    title = obj.get("title")
+    if title is None:
+        title = default_title(description)
+    elif not isinstance(title, str) or not validate_task_title(title)[0]:
+        return None
+    priority = obj.get("priority", "medium")
+    if isinstance(priority, str):
+        priority = priority.lower()
+    if not validate_priority(priority):
+        return None
+    status = obj.get("status")
+    if status is None:
+        status = "completed" if obj.get("completed") else "pending"
+    if not validate_status(status):
+        return None
+    try:
+        due_date = normalize_due_date(obj.get("dueDate", obj.get("due_date")))
+        owner = normalize_email(obj.get("owner"))
+        assignees = normalize_assignees(obj.get("assignees"))
+    except ValueError:
+        return None
+    task_id = obj.get("id")
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        task_id = None
+    created_at = obj.get("createdAt", obj.get("created_at"))
+    return Task(
+        id=task_id,
+        title=title.strip(),
+        description=description,
+        due_date=due_date,
+        priority=priority,
+        status=status,
+        created_at=created_at if isinstance(created_at, str) else "",
+        owner=owner,
+        assignees=assignees,
+    )
+
+def import_tasks(read, keep_ids=False, batch_size=IMPORT_BATCH_SIZE):
+    """Stream records from read() into the database in batched transactions.
+
+    Returns {"imported": n, "skipped": n, "errors": [...]} where errors lists
+    the zero-based index of the first skipped records. Raises ImportAborted
+    if a JSON array stops parsing; batches committed before that stay.
+    """
+    imported = 0
+    skipped = 0
+    errors = []
+    batch = []
+    try:
+        for index, obj in enumerate(iter_json_objects(read)):
+            task = normalize_task(obj) if isinstance(obj, dict) else None
+            if task is None or (keep_ids and task.id is None):
+                skipped += 1
+                if len(errors) < 100:
+                    errors.append({"index": index,
+                                   "message": "Malformed JSON" if obj is MALFORMED else "Invalid task record"})
+                continue
+            batch.append(task)
+            if len(batch) >= batch_size:
+                imported += insert_tasks(batch, keep_ids=keep_ids)
+                batch = []
+    except ValueError as e:
+        raise ImportAborted(str(e), {"imported": imported, "skipped": skipped, "errors": errors}) from e
+    imported += insert_tasks(batch, keep_ids=keep_ids)
+    return {"imported": imported, "skipped": skipped, "errors": errors}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import tasks as NDJSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_cmd = sub.add_parser("export", help="Write all tasks as NDJSON")
+    export_cmd.add_argument("file", nargs="?", help="Output file (default: stdout)")
+    import_cmd = sub.add_parser("import", help="Load NDJSON or a legacy tasks.json array")
+    import_cmd.add_argument("file", help="Input file ('-' for stdin)")
+    import_cmd.add_argument("--keep-ids", action="store_true", help="Keep record ids, overwriting existing tasks")
+    args = parser.parse_args(argv)
+
+    init_db()
+    if args.command == "export":
+        out = open(args.file, "w", encoding="utf-8") if args.file else sys.stdout
+        try:
+            out.writelines(export_ndjson())
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    else:
+        src = sys.stdin.buffer if args.file == "-" else open(args.file, "rb")
+        try:
+            result = import_tasks(src.read, keep_ids=args.keep_ids)
+        except ImportAborted as e:
+            result = dict(e.result, aborted=str(e))
+        finally:
+            if src is not sys.stdin.buffer:
+                src.close()
+        print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Group commit: one writer thread applies concurrent write requests in a
+shared transaction, so a burst of writes pays for one lock acquisition and
+one WAL sync instead of one each.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from server.python.metrics import DB_WRITE_GROUP_SIZE
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class GroupCommitWriter:
+    """Runs write requests on a single thread, committing them in groups.
+
+    submit(work, *args) queues work(conn, *args), which must return
+    (result, events) and must not commit, then blocks until the group it
+    joined has committed and returns result. The writer takes the first
+    waiting request, keeps collecting for up to `window` seconds or until
+    `max_batch` requests, and applies them in one BEGIN IMMEDIATE
+    transaction, each inside its own savepoint: a request that raises is
+    rolled back alone and its caller gets the exception, the others still
+    commit. before_commit(conn, events) runs once per group inside the
+    transaction and after_commit(events) once it has committed, both with
+    the events of every successful request in order.
+    """
+
+    def __init__(self, connection, before_commit, after_commit, window=0.001, max_batch=64):
+        self.connection = connection
+        self.before_commit = before_commit
+        self.after_commit = after_commit
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._loop, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, work, *args):
+        if threading.current_thread() is self._thread:
+            # A write made from an after_commit listener would wait on itself.
+            return self._run_alone(work, args)
+        future = Future()
+        self._queue.put((work, args, future))
+        return future.result()
+
+    def stop(self):
+        """Commit what is already queued, then end the writer thread."""
+        self._queue.put(_STOP)
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def _run_alone(self, work, args):
+        with self.connection() as conn:
+            result, events = work(conn, *args)
+            if events:
+                self.before_commit(conn, events)
+        if events:
+            self.after_commit(events)
+        return result
+
+    def _collect(self, first):
+        group = [first]
+        deadline = time.monotonic() + self.window
+        while len(group) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return group, True
+            group.append(item)
+        return group, False
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            group, stopping = self._collect(first)
+            self._commit(group)
+
+    def _commit(self, group):
+        outcomes = []
+        events = []
+        try:
+            with self.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for work, args, future in group:
+                    conn.execute("SAVEPOINT request")
+                    try:
+                        result, request_events = work(conn, *args)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO request")
+                        conn.execute("RELEASE request")
+                        outcomes.append((future, None, e))
+                        continue
+                    conn.execute("RELEASE request")
+                    events.extend(request_events)
+                    outcomes.append((future, result, None))
+                if events:
+                    self.before_commit(conn, events)
+        except Exception as e:
+            # The transaction itself failed (locked, disk full, ...): nothing
+            # in the group was written.
+            logger.warning("Group commit of %d writes failed: %s", len(group), e)
+            for _, _, future in group:
+                future.set_exception(e)
+            return
+        DB_WRITE_GROUP_SIZE.observe(len(group))
+        if events:
+            try:
+                self.after_commit(events)
+            except Exception:
+                logger.exception("after_commit failed")
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
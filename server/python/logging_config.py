@@ -0,0 +1,182 @@
+"""
+Logging setup shared by the web server, the runners and the notifier.
+
+Loggers only put records on an in-memory queue; a single listener thread
+per process formats them and does the file and console I/O, so request
+threads never wait on disk. The log file may be written by several
+processes (gunicorn workers, the notifier); rotation is serialized with a
+lock file and each process reopens the file once another one has rotated it.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+try:
+    import fcntl
+except ImportError:  # Windows: rotation is not coordinated between processes
+    fcntl = None
+
+from server.python.metrics import LOG_RECORDS_DROPPED
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "text" or "json" (one object per line)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# An empty LOG_FILE logs to stderr only.
+LOG_FILE = os.getenv("LOG_FILE", os.path.join(project_root, "logs", "task_reminder.log"))
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+LOG_TO_STDERR = os.getenv("LOG_TO_STDERR", "true").lower() in ("true", "1", "yes")
+# Records beyond this many pending are dropped (and counted) rather than
+# blocking the caller.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, process, thread and exc_info."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that is safe when several processes append to one file.
+
+    The size check and rollover run under an exclusive lock on LOG_FILE.lock,
+    and a process whose open file was rotated away by another one reopens
+    the new file instead of writing to the renamed backup.
+    """
+
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, mode="a", **kwargs)
+        self._lock_path = self.baseFilename + ".lock"
+        self._lock_file = None
+        self._lock_pid = None
+
+    def _process_lock(self):
+        # flock() locks belong to the open file, so a forked child must open
+        # its own or it would share the parent's lock.
+        if self._lock_pid != os.getpid():
+            self._lock_file = open(self._lock_path, "a")
+            self._lock_pid = os.getpid()
+        return self._lock_file
+
+    def _reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self.stream.close()
+            self.stream = self._open()
+
+    def emit(self, record):
+        if fcntl is None:
+            return super().emit(record)
+        try:
+            lock_file = self._process_lock()
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._reopen_if_rotated()
+                if self.shouldRollover(record):
+                    self.doRollover()
+                logging.FileHandler.emit(self, record)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        if self._lock_file is not None and self._lock_pid == os.getpid():
+            self._lock_file.close()
+        self._lock_file = self._lock_pid = None
+        super().close()
+
+class _DroppingQueueHandler(QueueHandler):
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+_listener = None
+_handlers = []
+_configure_lock = threading.Lock()
+
+def _build_handlers():
+    formatter = JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = []
+    if LOG_FILE:
+        os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
+        handlers.append(SharedRotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT))
+    if LOG_TO_STDERR or not handlers:
+        handlers.append(logging.StreamHandler(sys.stderr))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+def _start_listener():
+    global _listener
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, _DroppingQueueHandler)]:
+        root.removeHandler(handler)
+    root.addHandler(_DroppingQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
+
+def configure_logging():
+    """Route all logging through a queue to the shared file and stderr handlers.
+
+    Safe to call from every entry point: only the first call in a process
+    does anything.
+    """
+    if _listener is not None:
+        return
+    with _configure_lock:
+        if _listener is not None:
+            return
+        _handlers.extend(_build_handlers())
+        logging.getLogger().setLevel(LOG_LEVEL)
+        _start_listener()
+        atexit.register(stop_logging)
+
+def stop_logging():
+    """Write out queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def _after_fork_in_child():
+    # The listener thread does not survive a fork; give the child its own
+    # queue and thread over the inherited handlers.
+    global _configure_lock
+    _configure_lock = threading.Lock()
+    if _listener is not None:
+        _start_listener()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
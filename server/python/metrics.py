@@ -0,0 +1,305 @@
+"""
+Low-overhead in-process metrics rendered in the Prometheus text format.
+
+Counters and histograms are plain Python objects guarded by a lock; an
+observation costs a dict lookup and a bisect. Under gunicorn each worker
+has its own values, so when METRICS_DIR is set every process also writes
+a snapshot there and /metrics merges them. Files left by exited workers
+are folded into an archive so counters stay monotonic.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+try:
+    import fcntl
+except ImportError:  # Windows: snapshots are merged without a lock
+    fcntl = None
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", 5))
+_ARCHIVE = "archive.json"
+
+_registry = []
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self):
+        with self._lock:
+            samples = [[list(key), self._export(value)] for key, value in self._values.items()]
+        return {"type": self.type, "help": self.help, "labels": list(self.labels), "samples": samples}
+
+    def _export(self, value):
+        return value
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        _ensure_flusher()
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        _ensure_flusher()
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+    def _export(self, value):
+        return {"counts": list(value[0]), "sum": value[1]}
+
+class CallbackMetric(_Metric):
+    """A counter or gauge whose value is read from collect() at scrape time."""
+
+    def __init__(self, name, help, type, collect):
+        super().__init__(name, help)
+        self.type = type
+        self.collect = collect
+
+    def snapshot(self):
+        return {"type": self.type, "help": self.help, "labels": [], "samples": [[[], self.collect()]]}
+
+def timed(histogram, errors=None, **labels):
+    """Decorator recording each call's duration, and raised exceptions in `errors`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc(**labels)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+def snapshot():
+    return {metric.name: metric.snapshot() for metric in _registry}
+
+# --- Cross-process aggregation (METRICS_DIR) ---
+
+def _merge_into(merged, snap, include_gauges=True):
+    for name, data in snap.items():
+        if data["type"] == "gauge" and not include_gauges:
+            continue
+        target = merged.setdefault(name, dict(data, samples={}))
+        for key, value in data["samples"]:
+            key = tuple(key)
+            current = target["samples"].get(key)
+            if current is None:
+                target["samples"][key] = json.loads(json.dumps(value))
+            elif data["type"] == "histogram":
+                current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                current["sum"] += value["sum"]
+            else:
+                target["samples"][key] = current + value
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+@contextmanager
+def _dir_lock():
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(METRICS_DIR, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+def flush():
+    """Write this process's snapshot and archive snapshots of exited processes."""
+    if not METRICS_DIR:
+        return
+    with _dir_lock():
+        _write_json(os.path.join(METRICS_DIR, f"{os.getpid()}.json"), snapshot())
+        archive = None
+        for filename in os.listdir(METRICS_DIR):
+            pid = filename[:-5]
+            if not (filename.endswith(".json") and pid.isdigit()) or _pid_alive(int(pid)):
+                continue
+            if archive is None:
+                archive = {}
+                _merge_into(archive, _read_json(os.path.join(METRICS_DIR, _ARCHIVE)) or {})
+            _merge_into(archive, _read_json(os.path.join(METRICS_DIR, filename)) or {}, include_gauges=False)
+            os.remove(os.path.join(METRICS_DIR, filename))
+        if archive is not None:
+            _write_json(os.path.join(METRICS_DIR, _ARCHIVE), {
+                name: dict(data, samples=[[list(k), v] for k, v in data["samples"].items()])
+                for name, data in archive.items()
+            })
+
+def collect():
+    """Merged metrics of this process and, with METRICS_DIR, all sibling processes."""
+    merged = {}
+    if not METRICS_DIR:
+        _merge_into(merged, snapshot())
+        return merged
+    flush()
+    for filename in sorted(os.listdir(METRICS_DIR)):
+        if filename.endswith(".json"):
+            _merge_into(merged, _read_json(os.path.join(METRICS_DIR, filename)) or {})
+    return merged
+
+_flusher_started = False
+_flusher_lock = threading.Lock()
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            flush()
+        except OSError:
+            pass
+
+def _ensure_flusher():
+    global _flusher_started
+    if _flusher_started or not METRICS_DIR:
+        return
+    with _flusher_lock:
+        if not _flusher_started:
+            _flusher_started = True
+            threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+def _after_fork_in_child():
+    # A forked worker starts from zero and needs its own flush thread.
+    global _flusher_started, _flusher_lock
+    _flusher_started = False
+    _flusher_lock = threading.Lock()
+    for metric in _registry:
+        metric._lock = threading.Lock()
+        metric.reset()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+# --- Text exposition ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render():
+    """Return all metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, data in sorted(collect().items()):
+        lines.append(f"# HELP {name} {data['help']}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        names = data["labels"]
+        for key, value in sorted(data["samples"].items()):
+            if data["type"] == "histogram":
+                cumulative = 0
+                bounds = list(data["buckets"]) + [float("inf")]
+                for bound, count in zip(bounds, value["counts"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(names, key, [('le', _number(bound))])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(names, key)} {_number(value['sum'])}")
+                lines.append(f"{name}_count{_labels(names, key)} {cumulative}")
+            else:
+                lines.append(f"{name}{_labels(names, key)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+# --- Metrics shared across the app ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Flask request latency, excluding streamed bodies.",
+    labels=("endpoint", "method", "status"),
+)
+DB_OPERATION_SECONDS = Histogram(
+    "db_operation_duration_seconds", "Latency of db_manager operations, including cache hits.",
+    labels=("operation",),
+)
+DB_OPERATION_ERRORS = Counter(
+    "db_operation_errors_total", "db_manager operations that raised.", labels=("operation",),
+)
+SES_SEND_SECONDS = Histogram(
+    "ses_send_duration_seconds", "Latency of individual SES send_email calls.", labels=("outcome",),
+)
+SES_ERRORS = Counter(
+    "ses_errors_total", "SES send_email errors by error code.", labels=("code",),
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total", "Log records discarded because the logging queue was full.",
+)
+DB_WRITE_GROUP_SIZE = Histogram(
+    "db_write_group_size", "Write requests committed together in one group-commit transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
@@ -0,0 +1,101 @@
+"""
+Response encoding: an optional orjson-backed JSON provider and negotiated
+gzip/brotli compression for large bodies.
+"""
+
+import gzip
+import os
+import zlib
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+# Bodies below this many bytes are sent as-is: compressing them costs more
+# CPU than the bytes saved on the wire.
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 5))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+COMPRESSIBLE_TYPES = {"application/json", "text/html", "text/css", "text/plain", "text/javascript",
+                      "application/javascript", "application/x-ndjson"}
+# Streamed bodies are compressed chunk by chunk; SSE is left alone so each
+# event reaches the client as soon as it is written.
+STREAM_COMPRESSIBLE_TYPES = {"application/x-ndjson"}
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() through orjson, keeping Flask's sorted keys and type fallbacks."""
+
+    _options = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS \
+        if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def _negotiate(streamed):
+    accepted = request.accept_encodings
+    candidates = ["gzip"] if streamed or brotli is None else ["br", "gzip"]
+    return accepted.best_match(candidates)
+
+def _gzip_stream(chunks):
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def compress_response(response):
+    """after_request hook: compress large compressible bodies the client accepts."""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    streamed = response.is_streamed
+    if streamed and response.mimetype not in STREAM_COMPRESSIBLE_TYPES:
+        return response
+    if not streamed and (response.content_length or 0) < COMPRESS_MIN_BYTES:
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = _negotiate(streamed)
+    if not encoding:
+        return response
+
+    if streamed:
+        response.response = _gzip_stream(response.response)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if encoding == "br":
+            response.set_data(brotli.compress(body, quality=BROTLI_QUALITY))
+        else:
+            response.set_data(gzip.compress(body, GZIP_LEVEL, mtime=0))
+    response.headers["Content-Encoding"] = encoding
+    # The bytes now differ per encoding, so a strong validator would lie.
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def register_responses(app):
+    if orjson is not None:
+        app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
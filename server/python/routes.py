@@ -1,25 +1,280 @@
-from flask import request, jsonify
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import g, request, jsonify, Response, stream_with_context
 
 # OR to be more explicit:
 # CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
 
 from server.python.database.db_manager import (
-    load_tasks,
+    load_tasks_page_json,
+    load_archived_page_json,
+    apply_batch,
+    get_tasks_version,
+    get_task_stats,
+    get_last_event_id,
+    search_tasks,
+    load_tasks_due_between,
     add_task,
     update_task,
     delete_task,
-    mark_task
+    mark_task,
+    move_task
 )
+from server.python.database.transfer import export_ndjson, import_tasks, ImportAborted
+from server.python.change_feed import event_stream
+from server.python.metrics import HTTP_REQUEST_SECONDS, render as render_metrics
 from server.python.database.model import (
     validate_task_description,
-    validate_priority
+    validate_priority,
+    validate_status,
+    validate_task_title,
+    normalize_due_date,
+    normalize_email,
+    normalize_assignees
 )
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Each open event stream holds a server thread, so cap them per process.
+SSE_MAX_STREAMS = int(os.getenv("SSE_MAX_STREAMS", 4))
+_sse_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+def _parse_bool(value):
+    value = value.strip().lower()
+    if value in ("true", "1", "yes"):
+        return True
+    if value in ("false", "0", "no"):
+        return False
+    raise ValueError(value)
+
+def parse_task_filters(args):
+    """Parse list query params; raises ValueError with a client-facing message."""
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        after_id = int(args.get("after_id", 0))
+    except ValueError:
+        raise ValueError("limit and after_id must be integers")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    if after_id < 0:
+        raise ValueError("after_id must not be negative")
+
+    completed = args.get("completed")
+    if completed is not None:
+        try:
+            completed = _parse_bool(completed)
+        except ValueError:
+            raise ValueError("completed must be true or false")
+
+    priority = args.get("priority")
+    if priority is not None and not validate_priority(priority):
+        raise ValueError("Invalid priority")
+
+    status = args.get("status")
+    if status is not None and not validate_status(status):
+        raise ValueError("Invalid status")
+
+    order = args.get("order", "id")
+    if order not in ("id", "position"):
+        raise ValueError("order must be id or position")
+
+    # order=position pages by the previous page's last (position, id), which
+    # the client gets back as next_after_position / next_after_id.
+    after_position = args.get("after_position")
+    if after_position is not None:
+        if order != "position":
+            raise ValueError("after_position requires order=position")
+        try:
+            after_position = int(after_position)
+        except ValueError:
+            raise ValueError("after_position must be an integer")
+    elif order == "position" and after_id:
+        raise ValueError("after_id with order=position also needs after_position")
+
+    owner = normalize_email(args.get("owner"))
+    assignee = normalize_email(args.get("assignee"))
+
+    return {"limit": limit, "after_id": after_id, "completed": completed, "priority": priority,
+            "status": status, "order": order, "owner": owner, "assignee": assignee, "after_position": after_position}
+
+ARCHIVE_QUERY_PARAMS = ("limit", "after_id", "owner")
+
+def parse_archive_filters(args):
+    """Parse archive list params; other list filters are rejected, not ignored."""
+    unsupported = sorted(set(args) - set(ARCHIVE_QUERY_PARAMS))
+    if unsupported:
+        raise ValueError(f"Unsupported parameter for archived tasks: {', '.join(unsupported)}")
+    filters = parse_task_filters(args)
+    return {key: filters[key] for key in ARCHIVE_QUERY_PARAMS}
+
+def parse_title(data):
+    """Return (title, error). A missing title is allowed and derived from the description."""
+    title = data.get("title")
+    if title is None:
+        return None, None
+    if not isinstance(title, str):
+        return None, "Task title must be a string"
+    valid, message = validate_task_title(title)
+    return (title.strip(), None) if valid else (None, message)
+
+def parse_ownership(data):
+    """Return ({"owner", "assignees"} for the keys present in data, None) or (None, message)."""
+    fields = {}
+    try:
+        if "owner" in data:
+            fields["owner"] = normalize_email(data["owner"])
+        if "assignees" in data:
+            fields["assignees"] = normalize_assignees(data["assignees"])
+    except ValueError as e:
+        return None, str(e)
+    return fields, None
+
+BATCH_OPS = ("create", "update", "complete", "incomplete", "delete")
+MAX_BATCH_SIZE = 1000
+
+def validate_batch_operation(item):
+    """Return (operation, None) for a valid batch item or (None, message)."""
+    if not isinstance(item, dict):
+        return None, "Operation must be an object"
+    op = item.get("op")
+    if op not in BATCH_OPS:
+        return None, f"op must be one of {', '.join(BATCH_OPS)}"
+
+    operation = {"op": op}
+    if op != "create":
+        task_id = item.get("id")
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            return None, "id must be an integer"
+        operation["id"] = task_id
+
+    if op in ("create", "update"):
+        description = item.get("description")
+        priority = item.get("priority", "low" if op == "create" else "medium")
+        if not validate_task_description(description):
+            return None, "Invalid task description"
+        if not validate_priority(priority):
+            return None, "Invalid priority"
+        try:
+            operation["due_date"] = normalize_due_date(item.get("due_date", item.get("dueDate")))
+        except ValueError:
+            return None, "Invalid due date"
+        title, message = parse_title(item)
+        if message:
+            return None, message
+        ownership, message = parse_ownership(item)
+        if message:
+            return None, message
+        operation["title"] = title
+        operation["description"] = description
+        operation["priority"] = priority
+        operation.update(ownership)
+    return operation, None
+
 def register_routes(app):
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_latency(response):
+        start = g.pop("request_start", None)
+        if start is not None:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                endpoint=request.endpoint or "unmatched",
+                method=request.method,
+                status=response.status_code,
+            )
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
     @app.route("/api/v1/tasks", methods=["GET"])
     def get_tasks():
-        tasks = load_tasks()
-        return jsonify(tasks)
+        try:
+            filters = parse_task_filters(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+        # The change version is read before the rows, so a concurrent write
+        # can only make the ETag stale-low and force a refetch next poll.
+        version, updated_at = get_tasks_version()
+        # Each filter, order, limit and cursor is a different page, so the tag covers them too.
+        query_hash = hashlib.sha1(json.dumps(filters, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        etag = f"tasks-v{version}-{query_hash}"
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        limit = filters.pop("limit")
+        # Fetch one extra row to learn whether another page exists. Rows come
+        # back already JSON-encoded by SQLite, so the body is one join.
+        rows = load_tasks_page_json(limit + 1, **filters)
+        next_after_id = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after_id = rows[-1][0]
+        body = '{"tasks":[' + ",".join(row[1] for row in rows) + '],"next_after_id":' + json.dumps(next_after_id)
+        if filters["order"] == "position":
+            next_after_position = json.loads(rows[-1][1])["position"] if next_after_id is not None else None
+            body += ',"next_after_position":' + json.dumps(next_after_position)
+        body += "}\n"
+        response = app.response_class(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.last_modified = updated_at
+        response.cache_control.no_cache = True
+        return response
+
+    @app.route("/api/v1/tasks/stats", methods=["GET"])
+    def task_stats():
+        """Task totals by priority and status, from counters kept by the database."""
+        response = jsonify(get_task_stats())
+        response.cache_control.no_cache = True
+        return response
+
+    @app.route("/api/v1/tasks/archive", methods=["GET"])
+    def get_archived_tasks():
+        """Archived (completed, moved out of the live table) tasks, paged by id."""
+        try:
+            filters = parse_archive_filters(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+        limit = filters["limit"]
+        rows = load_archived_page_json(limit + 1, after_id=filters["after_id"], owner=filters["owner"])
+        next_after_id = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after_id = rows[-1][0]
+        body = '{"tasks":[' + ",".join(row[1] for row in rows) + '],"next_after_id":' + json.dumps(next_after_id) + "}\n"
+        return app.response_class(body, mimetype="application/json")
+
+    @app.route("/api/v1/tasks/events", methods=["GET"])
+    def task_events():
+        """SSE change feed; resumes after Last-Event-ID, otherwise starts from now."""
+        last_id = request.headers.get("Last-Event-ID", request.args.get("last_event_id"))
+        try:
+            last_id = int(last_id) if last_id else get_last_event_id()
+        except ValueError:
+            return jsonify({"status": "error", "message": "Last-Event-ID must be an integer"}), 400
+        if not _sse_slots.acquire(blocking=False):
+            response = jsonify({"status": "error", "message": "Too many event streams"})
+            response.status_code = 503
+            response.headers["Retry-After"] = "5"
+            return response
+
+        response = Response(event_stream(last_id), mimetype="text/event-stream")
+        response.call_on_close(_sse_slots.release)
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
 
     @app.route("/api/v1/add/tasks", methods=["POST"])
     def add():
@@ -33,14 +288,27 @@ def register_routes(app):
         if not validate_priority(priority):
             return jsonify({"status": "error", "message": "Invalid priority"}), 400
 
-        task_id = add_task(description, priority)
+        try:
+            due_date = normalize_due_date(data.get("due_date", data.get("dueDate")))
+        except ValueError:
+            return jsonify({"status": "error", "message": "Invalid due date"}), 400
+
+        title, message = parse_title(data)
+        if message:
+            return jsonify({"status": "error", "message": message}), 400
+
+        ownership, message = parse_ownership(data)
+        if message:
+            return jsonify({"status": "error", "message": message}), 400
+
+        task_id = add_task(description, priority, due_date, title, **ownership)
         return jsonify({"status": "success", "task_id": task_id})
 
     @app.route("/api/v1/update/<int:task_id>", methods=["PUT"])
     def update(task_id):
         data = request.json
         description = data.get("description")
-        priority = data.get("priority", "Medium")
+        priority = data.get("priority", "medium")
 
         if not validate_task_description(description):
             return jsonify({"status": "error", "message": "Invalid task description"}), 400
@@ -48,7 +316,21 @@ def register_routes(app):
         if not validate_priority(priority):
             return jsonify({"status": "error", "message": "Invalid priority"}), 400
 
-        updated = update_task(task_id, description, priority)
+        try:
+            due_date = normalize_due_date(data.get("due_date", data.get("dueDate")))
+        except ValueError:
+            return jsonify({"status": "error", "message": "Invalid due date"}), 400
+
+        title, message = parse_title(data)
+        if message:
+            return jsonify({"status": "error", "message": message}), 400
+
+        # Omitted owner/assignees keep their current values.
+        ownership, message = parse_ownership(data)
+        if message:
+            return jsonify({"status": "error", "message": message}), 400
+
+        updated = update_task(task_id, description, priority, due_date, title, **ownership)
         if updated:
             return jsonify({"status": "success"})
         return jsonify({"status": "error", "message": "Task not found"}), 404
@@ -73,3 +355,99 @@ def register_routes(app):
         if marked:
             return jsonify({"status": "success"})
         return jsonify({"status": "error", "message": "Task not found"}), 404
+
+    @app.route("/api/v1/reorder/<int:task_id>", methods=["PUT"])
+    def reorder(task_id):
+        """Move one task directly after {"after_id": id}; null or missing moves it to the top."""
+        data = request.get_json(silent=True) or {}
+        after_id = data.get("after_id")
+        if after_id is not None and (not isinstance(after_id, int) or isinstance(after_id, bool)):
+            return jsonify({"status": "error", "message": "after_id must be an integer or null"}), 400
+        if after_id == task_id:
+            return jsonify({"status": "error", "message": "A task cannot be moved after itself"}), 400
+
+        position = move_task(task_id, after_id)
+        if position is None:
+            return jsonify({"status": "error", "message": "Task not found"}), 404
+        return jsonify({"status": "success", "position": position})
+
+    @app.route("/api/v1/tasks/batch", methods=["POST"])
+    def batch():
+        data = request.get_json(silent=True) or {}
+        items = data.get("operations")
+        if not isinstance(items, list) or not items:
+            return jsonify({"status": "error", "message": "operations must be a non-empty list"}), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({"status": "error", "message": f"At most {MAX_BATCH_SIZE} operations per batch"}), 400
+
+        operations = []
+        errors = []
+        for index, item in enumerate(items):
+            operation, message = validate_batch_operation(item)
+            if message:
+                errors.append({"index": index, "message": message})
+            operations.append(operation)
+        if errors:
+            return jsonify({"status": "error", "message": "Invalid batch", "errors": errors}), 400
+
+        results = apply_batch(operations)
+        return jsonify({"status": "success", "results": results})
+
+    @app.route("/api/v1/tasks/export", methods=["GET"])
+    def export_tasks():
+        return Response(stream_with_context(export_ndjson()), mimetype="application/x-ndjson")
+
+    @app.route("/api/v1/tasks/import", methods=["POST"])
+    def import_():
+        keep_ids = request.args.get("keep_ids", "false").lower() in ("true", "1", "yes")
+        try:
+            result = import_tasks(request.stream.read, keep_ids=keep_ids)
+        except ImportAborted as e:
+            # Batches before the bad element are already committed; say how many.
+            return jsonify({"status": "error", "message": f"Malformed import body: {e}", **e.result}), 400
+        return jsonify({"status": "success", **result})
+
+    @app.route("/api/v1/tasks/search", methods=["GET"])
+    def search():
+        query = request.args.get("q", "").strip()
+        try:
+            limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+            offset = int(request.args.get("offset", 0))
+        except ValueError:
+            return jsonify({"status": "error", "message": "limit and offset must be integers"}), 400
+        if not query:
+            return jsonify({"status": "error", "message": "q is required"}), 400
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({"status": "error", "message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+        if offset < 0:
+            return jsonify({"status": "error", "message": "offset must not be negative"}), 400
+
+        matches = search_tasks(query, limit + 1, offset)
+        next_offset = None
+        if len(matches) > limit:
+            matches = matches[:limit]
+            next_offset = offset + limit
+        tasks = [dict(task.to_dict(), score=score) for task, score in matches]
+        return jsonify({"tasks": tasks, "next_offset": next_offset})
+
+    @app.route("/api/v1/tasks/due", methods=["GET"])
+    def due_tasks():
+        """Open tasks by due date: ?overdue=true, or ?days=N for the next N days."""
+        now = datetime.now()
+        try:
+            limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+            days = int(request.args.get("days", 7))
+        except ValueError:
+            return jsonify({"status": "error", "message": "limit and days must be integers"}), 400
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({"status": "error", "message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+        if days < 0:
+            return jsonify({"status": "error", "message": "days must not be negative"}), 400
+
+        if request.args.get("overdue", "false").lower() in ("true", "1", "yes"):
+            start, end = None, now.isoformat(timespec='minutes')
+        else:
+            start = now.date().isoformat()
+            end = (now + timedelta(days=days)).isoformat(timespec='minutes')
+        tasks = load_tasks_due_between(start, end, limit)
+        return jsonify({"tasks": [task.to_dict() for task in tasks]})
@@ -1,10 +1,11 @@
 import os
 import logging
-from logging.handlers import RotatingFileHandler
 from flask import Flask
 from flask_cors import CORS
 from server.python.database.db_manager import init_db
+from server.python.logging_config import configure_logging
 from server.python.routes import register_routes
+from server.python.responses import register_responses
 
 # Define project root
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..','..'))
@@ -18,20 +19,8 @@ app.secret_key = os.getenv('FLASK_SECRET_KEY', 'supersecretkey')
 # Enable CORS for all API routes
 CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}}, supports_credentials=True)
 
-# Setup logging
-LOGS_DIR = os.path.join(project_root, 'logs')
-LOG_FILE = os.path.join(LOGS_DIR, 'task_reminder.log')
-if not os.path.exists(LOGS_DIR):
-    os.makedirs(LOGS_DIR)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        RotatingFileHandler(LOG_FILE, maxBytes=10*1024*1024, backupCount=5),
-        logging.StreamHandler()
-    ]
-)
+# Setup logging (queued; file and console I/O happen on a background thread)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize database
@@ -44,9 +33,12 @@ except Exception as e:
 
 # Register routes
 register_routes(app)
+# After register_routes, so its after_request hooks see the compressed response
+register_responses(app)
 
 # Flask Port 
 port=os.getenv('PORT', 7000)
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=int(port))
+    # Development server only; production uses gunicorn (see gunicorn.conf.py).
+    app.run(debug=os.getenv('FLASK_DEBUG', 'false').lower() in ('true', '1', 'yes'), host='0.0.0.0', port=int(port))
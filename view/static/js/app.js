@@ -79,7 +79,8 @@ function handleFormSubmit(event, action) {
                     form.reset();
                     toggleAddTask();
                 }
-                setTimeout(() => location.reload(), 1000);
+                // The change feed patches the card; reload only without it
+                if (!eventFeedConnected) setTimeout(() => location.reload(), 1000);
             }
         })
         .catch(error => {
@@ -114,7 +115,7 @@ function handleAction(event, action, taskId) {
         })
         .then(data => {
             showToast(data.message, data.status);
-            if (data.status === 'success') {
+            if (data.status === 'success' && !eventFeedConnected) {
                 setTimeout(() => location.reload(), 1000);
             }
         })
@@ -124,6 +125,160 @@ function handleAction(event, action, taskId) {
         });
 }
 
+// Live updates: /api/v1/tasks/events streams row-level changes (SSE)
+let eventFeedConnected = false;
+
+function capitalize(text) {
+    return text ? text.charAt(0).toUpperCase() + text.slice(1) : '';
+}
+
+function renderTaskCard(task) {
+    const priority = (task.priority || 'medium').toLowerCase();
+    const border = { high: 'red-500', medium: 'yellow-500' }[priority] || 'green-500';
+    const badge = {
+        high: 'bg-red-100 text-red-800',
+        medium: 'bg-yellow-100 text-yellow-800'
+    }[priority] || 'bg-green-100 text-green-800';
+    const toggle = task.completed
+        ? { action: 'incomplete', hover: 'hover:text-gray-600', path: 'M9 5l7 7-7 7' }
+        : { action: 'complete', hover: 'hover:text-green-600', path: 'M5 13l4 4L19 7' };
+    const option = value => `<option value="${value}" ${capitalize(priority) === value ? 'selected' : ''}>${value}</option>`;
+
+    const template = document.createElement('template');
+    template.innerHTML = `
+        <div class="task-card bg-white border-l-4 border-${border} p-4 rounded-lg flex items-center justify-between hover:shadow-md transition duration-200" data-task-id="${task.id}" data-completed="${task.completed}" data-priority="${priority}" data-position="${task.position ?? ''}" draggable="true">
+            <div class="flex items-center space-x-4 flex-1">
+                <span class="text-sm font-medium text-gray-500">${task.id}</span>
+                <div class="flex-1">
+                    <h3 class="text-base font-medium ${task.completed ? 'line-through text-gray-500' : 'text-gray-800'}">${escapeHtml(task.description)}</h3>
+                    <p class="text-xs text-gray-500">Created: ${escapeHtml(task.createdAt || '')}</p>
+                </div>
+                <span class="text-xs font-medium px-2 py-1 rounded ${badge}">${capitalize(priority)}</span>
+            </div>
+            <div class="flex items-center space-x-2">
+                <button onclick="toggleEdit(${task.id})" class="action-btn edit text-gray-500 hover:text-blue-600 transition duration-200">
+                    <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                        <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M11 5H6a2 2 0 00-2 2v11a2 2 0 002 2h11a2 2 0 002-2v-5m-1.414-9.414a2 2 0 112.828 2.828L11.828 15H9v-2.828l8.586-8.586z"></path>
+                    </svg>
+                </button>
+                <a href="/api/v1/${toggle.action}/${task.id}" onclick="handleAction(event, '${toggle.action}', ${task.id})" class="action-btn ${toggle.action} text-gray-500 ${toggle.hover} transition duration-200">
+                    <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                        <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="${toggle.path}"></path>
+                    </svg>
+                </a>
+                <a href="/api/v1/delete/${task.id}" onclick="handleAction(event, 'delete', ${task.id})" class="action-btn delete text-gray-500 hover:text-red-600 transition duration-200">
+                    <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                        <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"></path>
+                    </svg>
+                </a>
+            </div>
+            <div id="edit-form-${task.id}" class="hidden edit-form mt-2">
+                <form method="POST" action="/api/v1/update/${task.id}" class="flex gap-2" onsubmit="handleFormSubmit(event, 'update')">
+                    <input type="text" name="description" value="${escapeHtml(task.description)}" class="flex-1 p-2 border rounded-lg text-gray-700 focus:outline-none focus:ring-2 focus:ring-blue-500">
+                    <select name="priority" class="p-2 border rounded-lg text-gray-700 focus:outline-none focus:ring-2 focus:ring-blue-500">
+                        ${option('Low')}${option('Medium')}${option('High')}
+                    </select>
+                    <button type="submit" class="bg-blue-600 text-white px-4 py-2 rounded-lg hover:bg-blue-700 transition duration-200">Update</button>
+                    <button type="button" onclick="toggleEdit(${task.id})" class="bg-gray-200 text-gray-700 px-4 py-2 rounded-lg hover:bg-gray-300 transition duration-200">Cancel</button>
+                </form>
+            </div>
+        </div>`;
+    return template.content.firstElementChild;
+}
+
+// Search results are fetched a page at a time and shown in place of the task list
+const SEARCH_PAGE_SIZE = 50;
+
+// Result cards keep the normal actions but are not part of the drag-and-drop order
+function renderSearchResult(task) {
+    const card = renderTaskCard(task);
+    card.draggable = false;
+    return card;
+}
+
+// Insert, replace or remove the one card an event refers to
+function applyTaskEvent(change) {
+    const result = document.querySelector(`#search-results .task-card[data-task-id="${change.id}"]`);
+    if (result) {
+        if (change.task) {
+            result.replaceWith(renderSearchResult(change.task));
+        } else {
+            result.remove();
+        }
+    }
+
+    const existing = document.querySelector(`#task-list .task-card[data-task-id="${change.id}"]`);
+    if (!change.task) {
+        if (existing) existing.remove();
+    } else {
+        const card = renderTaskCard(change.task);
+        if (existing && change.op !== 'move') {
+            card.style.display = existing.style.display;
+            existing.replaceWith(card);
+        } else {
+            if (existing) {
+                card.style.display = existing.style.display;
+                existing.remove();
+            }
+            let taskList = document.getElementById('task-list');
+            if (!taskList) {
+                const container = document.getElementById('task-container');
+                if (!container) return;
+                // Replace the empty-list message, keeping any search results
+                const results = document.getElementById('search-results');
+                Array.from(container.children).forEach(child => {
+                    if (child !== results) child.remove();
+                });
+                taskList = document.createElement('div');
+                taskList.id = 'task-list';
+                taskList.className = 'space-y-4';
+                if (results) taskList.style.display = 'none';
+                container.appendChild(taskList);
+            }
+            card.classList.add('fade-in');
+            // Cards are kept in drag-and-drop order (position, then id)
+            const key = card => [Number(card.dataset.position), Number(card.dataset.taskId)];
+            const [position, id] = key(card);
+            const next = Array.from(taskList.querySelectorAll('.task-card')).find(other => {
+                const [otherPosition, otherId] = key(other);
+                return otherPosition > position || (otherPosition === position && otherId > id);
+            });
+            taskList.insertBefore(card, next || null);
+        }
+    }
+    updateStats();
+}
+
+function initEventFeed() {
+    if (!window.EventSource) return;
+
+    let retryDelay = 1000;
+    let lastEventId = null;
+    const connect = () => {
+        const query = lastEventId ? `?last_event_id=${encodeURIComponent(lastEventId)}` : '';
+        const source = new EventSource(`/api/v1/tasks/events${query}`);
+        source.onopen = () => {
+            eventFeedConnected = true;
+            retryDelay = 1000;
+        };
+        source.addEventListener('task', event => {
+            lastEventId = event.lastEventId;
+            applyTaskEvent(JSON.parse(event.data));
+        });
+        source.addEventListener('reset', () => location.reload());
+        source.onerror = () => {
+            // EventSource retries dropped streams itself (resuming from the
+            // last event id), but gives up after an error status such as 503
+            if (source.readyState === EventSource.CLOSED) {
+                eventFeedConnected = false;
+                setTimeout(connect, retryDelay);
+                retryDelay = Math.min(retryDelay * 2, 30000);
+            }
+        };
+    };
+    connect();
+}
+
 // Toggle edit form
 function toggleEdit(taskId) {
     const editForm = document.getElementById(`edit-form-${taskId}`);
@@ -173,61 +328,153 @@ function filterTasks(filter) {
         }
     });
 
-    updateStats();
     showToast(`Showing ${filter.charAt(0).toUpperCase() + filter.slice(1)} Tasks (${visibleCount})`, 'info');
 }
 
-// Update stats
+// Update stats: totals come from /api/v1/tasks/stats (counters kept by the
+// database), so they cover every task, not just the cards on this page
+let statsTimer = null;
+let statsController = null;
+
 function updateStats() {
-    const allTasks = document.querySelectorAll('.task-card');
-    const completed = document.querySelectorAll('.task-card[data-completed="true"]').length;
-    const pending = allTasks.length - completed;
-    const highPriority = document.querySelectorAll('.task-card[data-priority="high"]').length;
-
-    animateNumber('total-tasks', allTasks.length);
-    animateNumber('completed-tasks', completed);
-    animateNumber('pending-tasks', pending);
-    animateNumber('high-priority-tasks', highPriority);
+    // Bursts of change events collapse into one request
+    clearTimeout(statsTimer);
+    statsTimer = setTimeout(() => {
+        if (statsController) statsController.abort();
+        statsController = new AbortController();
+
+        fetch('/api/v1/tasks/stats', {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' },
+            signal: statsController.signal
+        })
+            .then(response => {
+                if (!response.ok) throw new Error('Network response was not ok');
+                return response.json();
+            })
+            .then(stats => {
+                animateNumber('total-tasks', stats.total);
+                animateNumber('completed-tasks', stats.completed);
+                animateNumber('pending-tasks', stats.open);
+                animateNumber('high-priority-tasks', stats.by_priority.high);
+            })
+            .catch(error => {
+                if (error.name === 'AbortError') return;
+                console.error('Error loading stats:', error);
+            });
+    }, 100);
 }
 
-// Animate number changes
+// Animate number changes over a fixed duration, however far apart the values
+const numberAnimations = {};
+
 function animateNumber(elementId, targetNumber) {
     const element = document.getElementById(elementId);
     if (!element) return;
 
-    const currentNumber = parseInt(element.textContent) || 0;
-    if (currentNumber === targetNumber) return;
-
-    const increment = targetNumber > currentNumber ? 1 : -1;
-    let current = currentNumber;
-
-    const interval = setInterval(() => {
-        current += increment;
-        element.textContent = current;
-        if (current === targetNumber) clearInterval(interval);
-    }, 50);
+    cancelAnimationFrame(numberAnimations[elementId]);
+    const startNumber = parseInt(element.textContent) || 0;
+    if (startNumber === targetNumber) return;
+
+    const duration = 400;
+    const start = performance.now();
+    const step = now => {
+        const progress = Math.min((now - start) / duration, 1);
+        element.textContent = Math.round(startNumber + (targetNumber - startNumber) * progress);
+        if (progress < 1) numberAnimations[elementId] = requestAnimationFrame(step);
+    };
+    numberAnimations[elementId] = requestAnimationFrame(step);
 }
 
-// Real-time search
+// Server-side search (FTS index), rendered from the ranked matches
 function initSearch() {
     const searchInput = document.getElementById('search-tasks');
-    if (searchInput) {
-        searchInput.addEventListener('input', () => {
-            const query = searchInput.value.toLowerCase();
-            const tasks = document.querySelectorAll('.task-card');
-            let visibleCount = 0;
-
-            tasks.forEach(task => {
-                const description = task.querySelector('h3').textContent.toLowerCase();
-                const show = description.includes(query);
-                task.style.display = show ? 'flex' : 'none';
-                if (show) visibleCount++;
-            });
+    const container = document.getElementById('task-container');
+    if (!searchInput || !container) return;
+
+    let debounceTimer = null;
+    let controller = null;
+    let results = null;
 
-            updateStats();
-            showToast(`Found ${visibleCount} tasks`, 'info');
+    // While a query is active its results replace the rest of the container
+    const showTaskList = visible => {
+        Array.from(container.children).forEach(child => {
+            if (child !== results) child.style.display = visible ? '' : 'none';
         });
-    }
+    };
+
+    const clearResults = () => {
+        if (controller) controller.abort();
+        if (results) results.remove();
+        results = null;
+        showTaskList(true);
+    };
+
+    const loadPage = (query, offset) => {
+        if (controller) controller.abort();
+        controller = new AbortController();
+
+        fetch(`/api/v1/tasks/search?q=${encodeURIComponent(query)}&limit=${SEARCH_PAGE_SIZE}&offset=${offset}`, {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' },
+            signal: controller.signal
+        })
+            .then(response => {
+                if (!response.ok) throw new Error('Network response was not ok');
+                return response.json();
+            })
+            .then(data => {
+                if (offset === 0) {
+                    if (results) results.remove();
+                    results = document.createElement('div');
+                    results.id = 'search-results';
+                    results.className = 'space-y-4';
+                    container.prepend(results);
+                    showTaskList(false);
+                } else {
+                    results.querySelector('.load-more')?.remove();
+                }
+
+                // Best match first, as ranked by the server
+                data.tasks.forEach(task => results.appendChild(renderSearchResult(task)));
+                if (offset === 0 && !data.tasks.length) {
+                    results.innerHTML = '<p class="text-center text-gray-500">No tasks match your search.</p>';
+                }
+                if (data.next_offset !== null) {
+                    const more = document.createElement('button');
+                    more.type = 'button';
+                    more.className = 'load-more w-full bg-gray-200 text-gray-700 px-4 py-2 rounded-lg hover:bg-gray-300 transition duration-200';
+                    more.textContent = 'Load more';
+                    more.addEventListener('click', () => {
+                        more.disabled = true;
+                        loadPage(query, data.next_offset);
+                    });
+                    results.appendChild(more);
+                }
+                if (offset === 0) {
+                    showToast(data.next_offset === null
+                        ? `Found ${data.tasks.length} tasks`
+                        : `Showing the first ${data.tasks.length} matches`, 'info');
+                }
+            })
+            .catch(error => {
+                if (error.name === 'AbortError') return;
+                console.error('Error during search:', query, error);
+                showToast('Search failed.', 'error');
+                const more = results && results.querySelector('.load-more');
+                if (more) more.disabled = false;
+            });
+    };
+
+    searchInput.addEventListener('input', () => {
+        clearTimeout(debounceTimer);
+        debounceTimer = setTimeout(() => {
+            const query = searchInput.value.trim();
+            if (query) {
+                loadPage(query, 0);
+            } else {
+                clearResults();
+            }
+        }, 250);
+    });
 }
 
 // Drag-and-drop functionality
@@ -273,18 +520,26 @@ function initDragAndDrop() {
             taskList.insertBefore(draggedItem, dropTarget);
         }
 
-        // Placeholder for backend reorder (requires endpoint)
-        const taskIds = Array.from(taskList.querySelectorAll('.task-card')).map(task => task.dataset.taskId);
-        fetch('/reorder', {
-            method: 'POST',
+        // Only the moved task is sent: it goes directly after its new predecessor
+        const previous = draggedItem.previousElementSibling;
+        const afterId = previous && previous.classList.contains('task-card') ? Number(previous.dataset.taskId) : null;
+        const movedCard = draggedItem;
+        fetch(`/api/v1/reorder/${movedCard.dataset.taskId}`, {
+            method: 'PUT',
             headers: {
                 'Content-Type': 'application/json',
                 'X-Requested-With': 'XMLHttpRequest'
             },
-            body: JSON.stringify({ taskIds })
+            body: JSON.stringify({ after_id: afterId })
         })
             .then(response => response.json())
-            .then(data => showToast(data.message, data.status))
+            .then(data => {
+                if (data.status === 'success') {
+                    movedCard.dataset.position = data.position;
+                } else {
+                    showToast(data.message, data.status);
+                }
+            })
             .catch(() => showToast('Failed to reorder tasks', 'error'));
     });
 }
@@ -355,6 +610,7 @@ document.addEventListener('DOMContentLoaded', () => {
     initDragAndDrop();
     initKeyboardShortcuts();
     initSidebarToggle(); // Added sidebar toggle initialization
+    initEventFeed();
     document.querySelectorAll('.task-card').forEach((card, index) => {
         card.style.animationDelay = `${index * 50}ms`;
         card.classList.add('fade-in');
@@ -0,0 +1,3 @@
+"""WSGI entrypoint: gunicorn -c gunicorn.conf.py wsgi:app"""
+
+from server.python.scripts.app import app